@@ -0,0 +1,104 @@
+import numpy as np
+from weibull import Fit_Weibull
+from rcov import Grouped_Robust_CoV
+
+#Constants and Global Variables
+HOURS_PER_YEAR = 8760 # The Prepared Data Sets are hourly, without the 29th of February
+CALENDAR_YEAR = '2019' # Any year without a 29th of February gives the hours of the Prepared Data Sets
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+SEASONS = {'DJF': [12, 1, 2], 'MAM': [3, 4, 5], 'JJA': [6, 7, 8], 'SON': [9, 10, 11]} # Season -> Months, the DJF of a year is its own January, February and December
+RESOLUTIONS = ['YEAR', 'SEASON', 'MONTH', 'DAY', 'HOUR', 'MONTH_HOUR'] # HOUR is the hour of the day (diurnal cycle)
+STATISTICS = ['MEAN', 'MIN', 'MAX', 'STD', 'COUNT', 'WEIBULL_K', 'WEIBULL_C', 'RCOV'] # The Weibull shape k and scale c are fitted by weibull.py, the Robust CoV (%) by rcov.py
+Calendar_Indexes = {}
+
+def Calendar_Index(Resolution):
+    """
+    Get the precomputed index of a Resolution over the hours of a year. The hours are sorted by group once, so
+    every group is a contiguous segment that is reduced in a single call
+    :param Resolution: (string) One of RESOLUTIONS
+    :return: (dict) 'Labels': (list) the name of every group, 'Order': (array) the hours sorted by group,
+             'Starts': (array) the position of the first hour of every group in Order, 'Groups': (array) the group of every hour
+    """
+
+    if Resolution in Calendar_Indexes:
+        return Calendar_Indexes[Resolution]
+
+    if Resolution not in RESOLUTIONS:
+        raise ValueError(f"Unknown Resolution '{Resolution}', expected one of {RESOLUTIONS}")
+
+    Hours = np.arange(f'{CALENDAR_YEAR}-01-01T00', f'{int(CALENDAR_YEAR) + 1}-01-01T00', dtype='datetime64[h]')
+    Month = Hours.astype('datetime64[M]').astype(int) % 12 # 0 -> JAN
+    Day = (Hours.astype('datetime64[D]') - Hours[0].astype('datetime64[D]')).astype(int)
+    Hour = (Hours - Hours.astype('datetime64[D]')).astype(int)
+    Days = np.arange(f'{CALENDAR_YEAR}-01-01', f'{int(CALENDAR_YEAR) + 1}-01-01', dtype='datetime64[D]')
+
+    if Resolution == 'YEAR':
+        Groups, Labels = np.zeros(HOURS_PER_YEAR, dtype=int), ['Annual']
+    elif Resolution == 'SEASON':
+        Season_Of_Month = np.empty(12, dtype=int)
+        for Index, Season_Months in enumerate(SEASONS.values()):
+            Season_Of_Month[np.array(Season_Months) - 1] = Index
+        Groups, Labels = Season_Of_Month[Month], list(SEASONS)
+    elif Resolution == 'MONTH':
+        Groups, Labels = Month, list(MONTHS)
+    elif Resolution == 'DAY':
+        Groups = Day
+        Labels = [f"{MONTHS[int(str(Date)[5:7]) - 1]} {str(Date)[8:10]}" for Date in Days]
+    elif Resolution == 'HOUR':
+        Groups, Labels = Hour, [f"{H:02d}:00" for H in range(24)]
+    else:
+        Groups = Month * 24 + Hour
+        Labels = [f"{Name} {H:02d}:00" for Name in MONTHS for H in range(24)]
+
+    Order = np.argsort(Groups, kind='stable')
+    Starts = np.searchsorted(Groups[Order], np.arange(len(Labels)))
+    Calendar_Indexes[Resolution] = {'Labels': Labels, 'Order': Order, 'Starts': Starts, 'Groups': Groups}
+    return Calendar_Indexes[Resolution]
+
+def Aggregate(Values, Resolution, Statistics = ('MEAN',)):
+    """
+    Reduce the hourly Values of one year to the groups of a Resolution, all the columns at once. Missing (NaN)
+    values are left out of every statistic
+    :param Values: (array) The hourly Values of a year, of shape (8760, Columns), e.g. the Variables of many Files
+    :param Resolution: (string) One of RESOLUTIONS
+    :param Statistics: (iterable) The statistics to compute, from STATISTICS
+    :return: (dict) Statistic -> (array) of shape (Groups, Columns)
+    """
+
+    Values = np.asarray(Values, dtype=float)
+    if Values.shape[0] != HOURS_PER_YEAR:
+        raise ValueError(f"Expected {HOURS_PER_YEAR} hourly values, got {Values.shape[0]}")
+
+    Unknown = [Statistic for Statistic in Statistics if Statistic not in STATISTICS]
+    if len(Unknown) > 0:
+        raise ValueError(f"Unknown Statistics {Unknown}, expected some of {STATISTICS}")
+
+    Index = Calendar_Index(Resolution)
+    Sorted = Values[Index['Order']]
+    Valid = ~np.isnan(Sorted)
+    Starts = Index['Starts']
+
+    Count = np.add.reduceat(Valid, Starts, axis=0)
+    Results = {}
+    if 'COUNT' in Statistics:
+        Results['COUNT'] = Count
+
+    if 'MEAN' in Statistics or 'STD' in Statistics:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            Mean = np.add.reduceat(np.where(Valid, Sorted, 0), Starts, axis=0) / Count
+            if 'MEAN' in Statistics:
+                Results['MEAN'] = Mean
+            if 'STD' in Statistics:
+                Deviation = np.where(Valid, Sorted - np.repeat(Mean, np.diff(np.append(Starts, len(Sorted))), axis=0), 0)
+                Results['STD'] = np.sqrt(np.add.reduceat(Deviation ** 2, Starts, axis=0) / (Count - 1)) # Sample standard deviation, as pandas
+
+    if 'MIN' in Statistics:
+        Results['MIN'] = np.fmin.reduceat(Sorted, Starts, axis=0)
+    if 'MAX' in Statistics:
+        Results['MAX'] = np.fmax.reduceat(Sorted, Starts, axis=0)
+    if 'WEIBULL_K' in Statistics or 'WEIBULL_C' in Statistics:
+        Results['WEIBULL_K'], Results['WEIBULL_C'] = Fit_Weibull(Sorted, Starts)
+    if 'RCOV' in Statistics:
+        Results['RCOV'] = Grouped_Robust_CoV(Sorted, Starts)
+
+    return Results
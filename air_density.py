@@ -0,0 +1,41 @@
+import numpy as np
+
+#Constants and Global Variables
+R_DRY_AIR = 287.05 # Specific gas constant of dry air J/(kg.K)
+PASCALS_PER_ATM = 101325
+
+def Air_Density(Temperature, Pressure, R_Dry_Air = R_DRY_AIR):
+    """
+    :param Temperature: (array) The Temperature T2M (°C)
+    :param Pressure: (array) The Pressure PS (atm)
+    :param R_Dry_Air: (float) The specific gas constant of dry air J/(kg.K)
+    :return: (array) The Air density rho = P / (R_DRY_AIR * T) (kg/m3)
+    """
+
+    return (Pressure * PASCALS_PER_ATM)/(R_Dry_Air * (Temperature + 273.15))
+
+def Air_And_Power_Density(Temperature, Pressure, Wind_Speed, R_Dry_Air = R_DRY_AIR, Out = None):
+    """
+    Compute the Air density and the Wind power density of every hour in a single pass over the Temperature, Pressure
+    and Wind speed. Both are written in place into the two output arrays, without any other temporary array. The
+    Air density is the same as Air_Density()
+    :param Temperature: (array) The Temperature T2M (°C)
+    :param Pressure: (array) The Pressure PS (atm)
+    :param Wind_Speed: (array) The Wind speed at the Hub Height (m/s)
+    :param R_Dry_Air: (float) The specific gas constant of dry air J/(kg.K)
+    :param Out: (tuple) The two arrays of the shape of the inputs the results are written to, e.g. columns of a
+                larger array, None allocates them
+    :return: (tuple) (Air density rho (kg/m3), Wind power density 1/2 rho v^3 (W/m2))
+    """
+
+    Rho, Power = (np.empty(np.shape(Temperature)), np.empty(np.shape(Temperature))) if Out is None else Out
+
+    np.add(Temperature, 273.15, out=Power) # The absolute temperature, the Power array is used as the temporary
+    np.multiply(Power, R_Dry_Air, out=Power)
+    np.multiply(Pressure, PASCALS_PER_ATM, out=Rho)
+    np.divide(Rho, Power, out=Rho)
+
+    np.power(Wind_Speed, 3, out=Power)
+    np.multiply(Power, Rho, out=Power)
+    np.multiply(Power, 0.5, out=Power)
+    return Rho, Power
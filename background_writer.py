@@ -0,0 +1,156 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+#Constants and Global Variables
+BACKGROUND_WRITES = True # Write the output files in background threads, False writes them in the calling thread (still atomically)
+WRITER_THREADS = 4 # Threads writing the output files at the same time
+MAX_PENDING_WRITES = 16 # Files queued or being written at most, Submit_Write() waits for a free slot so the Data of the queue stays bounded
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024 # Buffer of each file written
+TEMPORARY_SUFFIX = '.{PROCESS}-{THREAD}.tmp' # Added to the path of a file while it is written, it is renamed when complete
+Writer_Lock = threading.Lock()
+Writer = {'Process': None, 'Executor': None, 'Slots': None, 'Pending': {}} # The writer threads of this process, see Start_Writer()
+Failed_Paths = set() # The files whose last write failed, they keep their previous content and are not recorded in the Manifest
+
+def Write_File(File_Path, Data):
+    """
+    Write a file atomically: the Data is written to a temporary file in the same folder, which then replaces the file,
+    so a reader never sees a partial file. When the write fails only the temporary file is removed, the previous file
+    is left as it was, and the file is kept in Failed_Paths so the Manifest does not record it (see manifest.Record_Build())
+    :param File_Path: (string) The path of the file
+    :param Data: (bytes) The content written as it is, or (string / list of strings) the text, written in text mode
+    :return: None
+    """
+
+    Temporary_Path = File_Path + TEMPORARY_SUFFIX.format(PROCESS = os.getpid(), THREAD = threading.get_ident())
+    try:
+        if isinstance(Data, bytes):
+            with open(Temporary_Path, 'wb', buffering=WRITE_BUFFER_SIZE) as File:
+                File.write(Data)
+        else:
+            with open(Temporary_Path, 'w', buffering=WRITE_BUFFER_SIZE) as File:
+                File.writelines([Data] if isinstance(Data, str) else Data)
+        os.replace(Temporary_Path, File_Path)
+
+    except BaseException:
+        if os.path.exists(Temporary_Path):
+            os.remove(Temporary_Path)
+        Mark_Failed([File_Path])
+        raise
+
+    with Writer_Lock:
+        Failed_Paths.discard(File_Path)
+
+def Mark_Failed(File_Paths):
+    """
+    Keep the files whose write failed, e.g. in a worker process, in Failed_Paths
+    :param File_Paths: (list) The paths of the files
+    :return: None
+    """
+
+    with Writer_Lock:
+        Failed_Paths.update(File_Paths)
+
+def Write_Failed(File_Path):
+    """
+    :param File_Path: (string) The path of a file
+    :return: (bool) True if the last write of the file failed, its content is not the output of this run
+    """
+
+    with Writer_Lock:
+        return File_Path in Failed_Paths
+
+def Data_Size(Data):
+    """
+    :param Data: (bytes, string or list of strings) The content of a file, see Write_File()
+    :return: (int) The size of the content in bytes, the text as UTF-8
+    """
+
+    if isinstance(Data, bytes):
+        return len(Data)
+    return sum(len(Part.encode('utf-8')) for Part in ([Data] if isinstance(Data, str) else Data))
+
+def Reset_Writer():
+    """
+    Reset the Writer in a forked child process. The writer threads are not copied by a fork, but Writer_Lock may have
+    been held by one of them at that moment and would never be released, so the child gets a new lock and no writer,
+    pending write or failed file of its parent
+    :return: None
+    """
+
+    global Writer_Lock
+    Writer_Lock = threading.Lock()
+    Writer.update({'Process': None, 'Executor': None, 'Slots': None, 'Pending': {}})
+    Failed_Paths.clear()
+
+if hasattr(os, 'register_at_fork'): # Not available on Windows, where the processes are never forked
+    os.register_at_fork(after_in_child=Reset_Writer)
+
+def Start_Writer():
+    """
+    Start the writer threads of this process, once. A forked worker process starts its own, see Reset_Writer()
+    :return: (dict) The Writer
+    """
+
+    with Writer_Lock:
+        if Writer['Process'] != os.getpid():
+            Writer.update({'Process': os.getpid(), 'Executor': ThreadPoolExecutor(max_workers=WRITER_THREADS, thread_name_prefix='Writer'),
+                           'Slots': threading.BoundedSemaphore(MAX_PENDING_WRITES), 'Pending': {}})
+    return Writer
+
+def Write_Job(File_Path, Data, Slots):
+    """
+    Write a file in a writer thread, see Submit_Write()
+    :return: None
+    """
+
+    try:
+        Write_File(File_Path, Data)
+    finally:
+        Slots.release()
+
+def Submit_Write(File_Path, Data):
+    """
+    Write a file in the background, so the computation goes on while the disk is busy. When MAX_PENDING_WRITES files
+    are already queued it waits for one of them to be written (back-pressure). The files are complete on the disk
+    only after Flush_Writes() is called by the same thread
+    :param File_Path: (string) The path of the file
+    :param Data: (bytes) The content written as it is, or (string / list of strings) the text, see Write_File()
+    :return: (int) The size of the content in bytes, for the Trace (see instrumentation.Count())
+    """
+
+    if not BACKGROUND_WRITES:
+        Write_File(File_Path, Data)
+        return Data_Size(Data)
+
+    Started = Start_Writer()
+    Started['Slots'].acquire()
+    try:
+        Future = Started['Executor'].submit(Write_Job, File_Path, Data, Started['Slots'])
+    except BaseException:
+        Started['Slots'].release()
+        raise
+
+    with Writer_Lock:
+        Started['Pending'].setdefault(threading.get_ident(), []).append((File_Path, Future))
+    return Data_Size(Data)
+
+def Flush_Writes():
+    """
+    Wait for every file submitted so far by this thread to be written, before the files are read, recorded in the
+    Manifest or at the end of a run. The files of the stages running in other threads are left to their own flush
+    (see pipeline.Run_Stage())
+    :return: (list) The paths of the files whose write failed, their error is printed
+    """
+
+    with Writer_Lock:
+        Pending = Writer['Pending'].pop(threading.get_ident(), []) if Writer['Process'] == os.getpid() else []
+
+    Failed = []
+    for File_Path, Future in Pending:
+        Error = Future.exception()
+        if Error is not None:
+            print(f"File: '{File_Path}' was not written -> '{Error}'")
+            Failed.append(File_Path)
+
+    return Failed
@@ -0,0 +1,175 @@
+import os
+import json
+import time
+import argparse
+import tempfile
+import sys
+import multiprocessing
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from synthetic_corpus import Generate_Corpus
+from trend import Linear_Trend
+
+#Constants and Global Variables
+TIME_FORMAT = '%I:%M:%S %p'
+CORPUS_FOLDER = 'Input' # MAIN FOLDER of the synthetic corpus, read by data_preprocessing, data_conversion and energy_production
+STATISTICS_FOLDER = 'InputFiles' # INPUT FOLDER of statistical_analysis, filled from the Summarized Data
+SCRIPTS = ['data_preprocessing', 'data_conversion', 'energy_production', 'statistical_analysis'] # In the order they are run
+BENCHMARK_FILE = 'benchmark_results.csv' # The time of every stage at every size
+SCALING_PLOT_FILE = 'benchmark_scaling.png'
+FIRST_YEAR = 2001
+
+def Run_Benchmark_Point(Cities, Years, Hub_Height, Workers, Defect_Rate, Compute_Only):
+    """
+    Run the scripts one after the other on a new synthetic corpus of the given size, in a temporary folder, and
+    get the Trace of every stage. It runs in its own process, so the peak RSS is the one of this size only
+    :param Cities: (int) The number of Cities
+    :param Years: (int) The number of Years of every City
+    :param Hub_Height: (int) The value of 'Z'
+    :param Workers: (int) The number of processes of data_preprocessing and of the graph rendering
+    :param Defect_Rate: (float) The share of the Files with a Defect
+    :param Compute_Only: (bool) statistical_analysis only exports the RCOV and the trends
+    :return: (list) The wall time, CPU time and peak RSS of every stage
+    """
+
+    from instrumentation import Enable_Trace
+    import data_preprocessing, data_conversion, energy_production, statistical_analysis
+    from run_pipeline import Publish_Statistical_Tables
+
+    Enable_Trace()
+
+    Working_Directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as Folder, open(os.devnull, 'w') as Output:
+        os.chdir(Folder)
+        sys.stdout.flush()
+        Standard_Output = os.dup(1)
+        os.dup2(Output.fileno(), 1) # The output of the scripts and of their worker processes is discarded
+        try:
+            Corpus = Generate_Corpus(CORPUS_FOLDER, Cities, range(FIRST_YEAR, FIRST_YEAR + Years), Defect_Rate)
+
+            data_preprocessing.Configure({'FOLDER': CORPUS_FOLDER, 'Z': Hub_Height})
+            data_preprocessing.Main(Workers = Workers, Incremental = False)
+            data_conversion.Configure({'FOLDER': CORPUS_FOLDER})
+            data_conversion.Main(Incremental = False)
+            energy_production.Configure({'FOLDER': CORPUS_FOLDER})
+            energy_production.Main(Incremental = False)
+
+            Publish_Statistical_Tables(CORPUS_FOLDER, STATISTICS_FOLDER, next(iter(energy_production.TURBINES)))
+            statistical_analysis.configure({'FOLDER': STATISTICS_FOLDER, 'RENDER_WORKERS': Workers})
+            statistical_analysis.run(incremental = False, compute_only = Compute_Only)
+
+            Results = []
+            for Script in SCRIPTS:
+                if not os.path.exists(f"{Script}_trace.json"): # No stage ran
+                    continue
+
+                with open(f"{Script}_trace.json", 'r') as File:
+                    Records = json.load(File)
+
+                Results.extend({'Script': Script, 'Stage': Record['Name'], 'Cities': Cities, 'Years': Years, 'Files': len(Corpus),
+                                'Rows': int(Corpus['Rows'].sum()), 'Wall s': Record['Wall s'], 'CPU s': Record['CPU s'],
+                                'Peak RSS MB': Record['Peak RSS MB']}
+                               for Record in Records if Record['Category'] == 'stage')
+            return Results
+
+        finally:
+            sys.stdout.flush()
+            os.dup2(Standard_Output, 1)
+            os.close(Standard_Output)
+            os.chdir(Working_Directory)
+
+def Scaling_Table(Results):
+    """
+    Get the wall time of every stage at every size, and its scaling exponent: the slope of log(time) over
+    log(Files), 1 for a stage that grows linearly with the corpus
+    :param Results: (DataFrame) The results of Run_Benchmark_Point()
+    :return: (DataFrame) Script and Stage x Files, with the 'Exponent' column
+    """
+
+    Table = Results.pivot_table(index=['Script', 'Stage'], columns='Files', values='Wall s', aggfunc='min', sort=False)
+    if Table.shape[1] > 1:
+        with np.errstate(divide='ignore'):
+            Slope, _ = Linear_Trend(np.log(Table.to_numpy(dtype=float)), X=np.log(Table.columns.to_numpy(dtype=float)))
+        Table['Exponent'] = np.where(np.isfinite(Slope), Slope, np.nan).round(2)
+    return Table
+
+def Plot_Scaling(Table, File_Path = SCALING_PLOT_FILE):
+    """
+    Plot the wall time of every stage over the number of Files, on log-log axes
+    :param Table: (DataFrame) The table from Scaling_Table()
+    :param File_Path: (string) The path of the plot
+    :return: None
+    """
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt # Only imported when a plot is asked for
+
+    Times = Table.drop(columns='Exponent', errors='ignore')
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for (Script, Stage), Values in Times.iterrows():
+        ax.plot(Times.columns, Values.values, marker='o', label=f"{Script}.{Stage}")
+
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.set_xlabel('Files (City Years)')
+    ax.set_ylabel('Wall time (s)')
+    ax.grid(True, which='both')
+    ax.legend(loc='upper left', prop={'size': 6})
+    fig.savefig(File_Path)
+    plt.close(fig)
+
+def Main(Cities = (1, 2, 4), Years = 3, Hub_Height = 100, Workers = 1, Defect_Rate = 0.0, Compute_Only = False, Repeat = 1, Plot = False):
+    """
+    :param Cities: (iterable) The numbers of Cities of the sizes benchmarked
+    :param Years: (int) The number of Years of every City
+    :param Hub_Height: (int) The value of 'Z'
+    :param Workers: (int) The number of processes of data_preprocessing and of the graph rendering
+    :param Defect_Rate: (float) The share of the Files with a Defect
+    :param Compute_Only: (bool) statistical_analysis only exports the RCOV and the trends
+    :param Repeat: (int) The runs of every size, the fastest is reported
+    :param Plot: (bool) Also plot the scaling curves in SCALING_PLOT_FILE
+    :return: (DataFrame) The scaling table
+    """
+
+    print(f"Function: Benchmark Main() Started -> {time.strftime(TIME_FORMAT)}")
+    Results = []
+
+    for Size in Cities:
+        for Run in range(Repeat):
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as Executor: # A new process for every run
+                Results.extend(Executor.submit(Run_Benchmark_Point, Size, Years, Hub_Height, Workers, Defect_Rate, Compute_Only).result())
+            print(f"Cities: {Size}, Years: {Years}, Run: {Run + 1}/{Repeat} -> {time.strftime(TIME_FORMAT)}")
+
+    Results = pd.DataFrame(Results)
+    Results.to_csv(BENCHMARK_FILE, index=False)
+    Table = Scaling_Table(Results)
+
+    with pd.option_context('display.width', 200, 'display.max_rows', None, 'display.max_columns', None, 'display.float_format', '{:.3f}'.format):
+        print("Wall time (s) of every stage by number of Files:")
+        print(Table)
+
+    Peak = Results.groupby('Files')['Peak RSS MB'].max()
+    print("Peak RSS (MB) by number of Files: " + ", ".join(f"{Files}: {Value:.1f}" for Files, Value in Peak.items()))
+
+    if Plot:
+        Plot_Scaling(Table)
+        print(f"Scaling curves exported -> {SCALING_PLOT_FILE}")
+
+    print(f"Function: Benchmark Main() Ended Successfully, results in '{BENCHMARK_FILE}' -> {time.strftime(TIME_FORMAT)}")
+    return Table
+
+if __name__ == '__main__':
+    Parser = argparse.ArgumentParser(description="Time every stage of the scripts on synthetic corpora of growing size")
+    Parser.add_argument('--cities', type=int, nargs='+', default=[1, 2, 4], help="The numbers of Cities of the sizes (default: 1 2 4)")
+    Parser.add_argument('--years', type=int, default=3, help="The number of Years of every City (default: %(default)s)")
+    Parser.add_argument('--hub-height', type=int, default=100, metavar='Z', help="The value of 'Z' (default: %(default)s)")
+    Parser.add_argument('--workers', type=int, default=1, help="The number of processes (default: %(default)s)")
+    Parser.add_argument('--defect-rate', type=float, default=0.0, help="The share of the Files with a Defect (default: %(default)s)")
+    Parser.add_argument('--compute-only', action='store_true', help="statistical_analysis only exports the RCOV and the trends")
+    Parser.add_argument('--repeat', type=int, default=1, help="The runs of every size, the fastest is reported (default: %(default)s)")
+    Parser.add_argument('--plot', action='store_true', help=f"Plot the scaling curves in {SCALING_PLOT_FILE}")
+    Arguments = Parser.parse_args()
+    Main(Arguments.cities, Arguments.years, Arguments.hub_height, Arguments.workers, Arguments.defect_rate,
+         Arguments.compute_only, Arguments.repeat, Arguments.plot)
@@ -0,0 +1,71 @@
+import os
+import io
+import pandas as pd
+
+#Constants and Global Variables
+COLUMNAR_FORMATS = {'PARQUET': '.parquet', 'ARROW': '.arrow'} # File Format -> File extension, ARROW is the Arrow IPC (Feather v2) file
+
+def Check_Columnar_Support(File_Format):
+    """
+    Check that the File Format is a known columnar format and that 'pyarrow', which pandas uses for both, is installed
+    :param File_Format: (string) The File Format, one of COLUMNAR_FORMATS
+    :return: None, raises an Error if the Format can not be used
+    """
+
+    if File_Format not in COLUMNAR_FORMATS:
+        raise ValueError(f"Unknown File Format '{File_Format}', expected 'CSV' or one of {list(COLUMNAR_FORMATS)}")
+
+    try:
+        import pyarrow # noqa: F401
+    except ImportError:
+        raise ImportError(f"The '{File_Format}' File Format requires 'pyarrow', install it with 'pip install pyarrow' or use 'CSV'")
+
+def Columnar_File_Name(File, File_Format):
+    """
+    Replace the extension of a File name with the one of the columnar File Format
+    :param File: (string) The File name, e.g. 'POWER_Point_Hourly (2020).csv'
+    :param File_Format: (string) The File Format, one of COLUMNAR_FORMATS
+    :return: (string) The File name with the columnar extension, e.g. 'POWER_Point_Hourly (2020).parquet'
+    """
+
+    return os.path.splitext(File)[0] + COLUMNAR_FORMATS[File_Format]
+
+def Columnar_File_Bytes(df, File_Format):
+    """
+    Encode a DataFrame with its column names in the columnar File Format, the index is not written. The bytes are
+    written by background_writer.Submit_Write()
+    :param df: (DataFrame) The Data to write
+    :param File_Format: (string) The File Format, one of COLUMNAR_FORMATS
+    :return: (bytes) The content of the File
+    """
+
+    Check_Columnar_Support(File_Format)
+    df = df.reset_index(drop=True)
+
+    if File_Format == 'PARQUET':
+        return df.to_parquet(index=False)
+
+    Buffer = io.BytesIO()
+    df.to_feather(Buffer)
+    return Buffer.getvalue()
+
+def Read_Columnar_File(File_Path, Columns=None):
+    """
+    Read a columnar File, the format is taken from its extension. Only the requested columns are loaded
+    :param File_Path: (string) The path of the '.parquet' or '.arrow' File
+    :param Columns: (list) The names of the columns to load, None loads all of them
+    :return: (DataFrame) The Data of the File
+    """
+
+    if File_Path.lower().endswith(COLUMNAR_FORMATS['PARQUET']):
+        return pd.read_parquet(File_Path, columns=Columns)
+
+    return pd.read_feather(File_Path, columns=Columns)
+
+def Is_Columnar_File(File):
+    """
+    :param File: (string) The File name
+    :return: (bool) True if the File has the extension of one of the COLUMNAR_FORMATS
+    """
+
+    return os.path.splitext(File)[1].lower() in COLUMNAR_FORMATS.values()
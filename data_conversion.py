@@ -1,38 +1,89 @@
 import os
 import pandas as pd
-from copy import deepcopy
+import numpy as np
 import time
+import argparse
+from aggregation import Calendar_Index, Aggregate
+from air_density import R_DRY_AIR, Air_And_Power_Density
+from pipeline import Run_Stage, Print_Memory_Report, Load_Settings, Apply_Settings
+from columnar_io import Check_Columnar_Support, Columnar_File_Name, Columnar_File_Bytes, Read_Columnar_File
+from background_writer import Submit_Write, Flush_Writes
+from instrumentation import Enable_Trace, Start_Span, Count, End_Span, Export_Trace
+from manifest import Load_Manifest, Save_Manifest, Is_Up_To_Date, Record_Build, Remove_Stale_Records
 
 #Constants and Global Variables
 TIME_FORMAT_COMPLETE = '%d %B,%Y %I:%M:%S %p'
 TIME_FORMAT = '%I:%M:%S %p'
 FOLDER = 'FinalYearProject(FYP)Data'
+FILE_FORMAT = 'CSV' # Format of the Prepared Data Sets read and of the Summarized Data written: 'CSV', 'PARQUET' or 'ARROW'
+PREPARED_COLUMNS = ['T2M', 'PS', 'WD50M', 'WS50M'] # Columns of the Prepared Data Sets, the CSV files have no header
+SUMMARY_TABLES = { # Table name -> (Variable, Resolution, Statistic, Unit), written as '{Table}_{City}.csv', see aggregation.py
+    'Monthly_Temperature': ('T2M', 'MONTH', 'MEAN', '°C'),
+    'Monthly_WindSpeed': ('WS50M', 'MONTH', 'MEAN', 'm/s'),
+    'Seasonal_Temperature': ('T2M', 'SEASON', 'MEAN', '°C'),
+    'Seasonal_WindSpeed': ('WS50M', 'SEASON', 'MEAN', 'm/s'),
+    'Diurnal_Temperature': ('T2M', 'HOUR', 'MEAN', '°C'),
+    'Diurnal_WindSpeed': ('WS50M', 'HOUR', 'MEAN', 'm/s'),
+    'Monthly_Weibull_k': ('WS50M', 'MONTH', 'WEIBULL_K', ''),
+    'Monthly_Weibull_c': ('WS50M', 'MONTH', 'WEIBULL_C', 'm/s'),
+    'Monthly_RCoV_Temperature': ('T2M', 'MONTH', 'RCOV', '%'), # Robust CoV of the hours of each month
+    'Monthly_RCoV_WindSpeed': ('WS50M', 'MONTH', 'RCOV', '%'),
+    'Monthly_AirDensity': ('RHO', 'MONTH', 'MEAN', 'kg/m3'),
+    'Monthly_WindPowerDensity': ('WPD', 'MONTH', 'MEAN', 'W/m2'),
+}
+DENSITY_VARIABLES = ['RHO', 'WPD'] # Air density and Wind power density (1/2 rho v^3) of every hour, computed from the DENSITY_COLUMNS, see air_density.py
+DENSITY_COLUMNS = ['T2M', 'PS', 'WS50M'] # Temperature (°C), Pressure (atm) and Wind speed at the Hub Height (m/s)
+REQUIRED_COLUMNS = [Column for Column in PREPARED_COLUMNS if Column in [Table[0] for Table in SUMMARY_TABLES.values()] # Only the columns of the SUMMARY_TABLES are loaded
+                    or (Column in DENSITY_COLUMNS and any(Table[0] in DENSITY_VARIABLES for Table in SUMMARY_TABLES.values()))]
+HUB_HEIGHT = None # The Hub Height 'Z' to summarize after a sweep of data_preprocessing (its '{Z}m' sub-folders), None for a single Hub Height
+STREAMING = False # Summarize one Prepared Data Set at a time with Stream_Summary_Values(), with bounded memory
+INCREMENTAL = False # Only summarize the Cities whose Prepared Data Sets or outputs changed since the last run (see manifest.py)
+
+def Height_Folder():
+    """
+    :return: (string) The '{HUB_HEIGHT}m/' sub-folder of the Prepared Data Sets and Summarized Data, empty for a single Hub Height
+    """
+
+    return "" if HUB_HEIGHT is None else f"{HUB_HEIGHT}m/"
 
-def Get_Prepared_Data_From_Directories(Folder_Name):
+def Get_Prepared_Data_From_Directories(Folder_Name, Cities = None, Dict_Data = None):
     """
     Get all the Files Data from Directories and their Sub-Directories
-    Categorized by Cities.
+    Categorized by Cities. Only the REQUIRED_COLUMNS of the SUMMARY_TABLES are loaded from the FILE_FORMAT folder
     :param Folder_Name: (string) The name of MAIN FOLDER where all the data exist
+    :param Cities: (list) Only read the Files of these Cities, None reads all of them
+    :param Dict_Data: (dict) Prepared Data Sets already in memory -> {City: {File: DataFrame}}, e.g. from
+                      data_preprocessing.Prepare_Files(), these Files are taken from it instead of being read
     :return: (dict) The dictionary file of City and its DATAFRAME
     """
 
     print("*" * 100)
     print(f"Function: Get_Prepared_Data_From_Directories() Started -> {time.strftime(TIME_FORMAT)}")
-    FILES_PATH = "{FOLDER_NAME}/{CITY_NAME}/Prepared Data Sets/CSV/"
+    FILES_PATH = "{FOLDER_NAME}/{CITY_NAME}/Prepared Data Sets/" + Height_Folder() + FILE_FORMAT + "/"
     Final_Dict = {}
 
     try:
+        if FILE_FORMAT != 'CSV':
+            Check_Columnar_Support(FILE_FORMAT)
 
-        Cities = [c for c in os.listdir(Folder_Name)] #Get all the cities name in the MAIN FOLDER
+        Cities = [c for c in os.listdir(Folder_Name)] if Cities is None else Cities #Get all the cities name in the MAIN FOLDER
         for City_Name in Cities:
 
             Files_List = os.listdir(FILES_PATH.format(FOLDER_NAME = Folder_Name,CITY_NAME = City_Name)) #Get all the Files name (Year-wise) from CSV folder of Prepared Dataset of each particular location
             Final_Dict[City_Name] = {}
+            Span = Start_Span('Read_Prepared_Data', 'city', City = City_Name)
+            In_Memory = {(file if FILE_FORMAT == 'CSV' else Columnar_File_Name(file, FILE_FORMAT)): df for file, df in (Dict_Data or {}).get(City_Name, {}).items()}
 
             for file in Files_List: #Making the JSON file of our DATA
-                Final_Dict[City_Name].update({
-                    file: pd.read_csv(FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City_Name) +  str(file),sep=',', engine='python',header=None)
-                })
+                if file in In_Memory: # The same values as the exported File
+                    Final_Dict[City_Name][file] = In_Memory[file]
+                    continue
+
+                File_Path = FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City_Name) +  str(file)
+                Final_Dict[City_Name].update({file: Read_Prepared_File(File_Path)})
+                Count(Span, Rows = len(Final_Dict[City_Name][file]), Read_Files = [File_Path])
+
+            End_Span(Span)
 
         print("Files Extracted are:")
         for x in Final_Dict.keys():
@@ -48,162 +99,331 @@ def Get_Prepared_Data_From_Directories(Folder_Name):
 
         return None
 
-def Extract_Temperature_Average_Values(Dict_Data):
+def Read_Prepared_File(File_Path):
     """
-    Get all the Temperature Average Values of each city, extracted STATICALLY from column 1
-    :param Dict_Data: (dict) The Data retrieve from the Directories in Multi-dimensional Dictionary
-    :return: (dict) The dictionary of key: City and value: List of Temperature Averages with respect to month
+    :param File_Path: (string) The path of a Prepared Data Set in the FILE_FORMAT folder
+    :return: (DataFrame) The REQUIRED_COLUMNS of the File
     """
 
-    print(f"Function: Extract_Temperature_Average_Values() Started -> {time.strftime(TIME_FORMAT)}")
-    CitiesTemperature_Dict = {}
-    Data = deepcopy(Dict_Data)
-    try:
-        if len(Data) > 0:
-            for City in Data:
-                CitiesTemperature_Dict.update({City: [[year.split('(')[1].split(')')[0],
-                                                       file.iloc[0:744, 0].mean(), file.iloc[744:1416, 0].mean(),
-                                                       file.iloc[1416:2160, 0].mean(), file.iloc[2160:2880, 0].mean(),
-                                                       file.iloc[2880:3624, 0].mean(), file.iloc[3624:4344, 0].mean(),
-                                                       file.iloc[4344:5088, 0].mean(), file.iloc[5088:5832, 0].mean(),
-                                                       file.iloc[5832:6552, 0].mean(), file.iloc[6552:7296, 0].mean(),
-                                                       file.iloc[7296:8016, 0].mean(), file.iloc[8016:8760, 0].mean()]
-                                                      for year, file in list(Data[City].items())]})
-                
-                print(f"City: {City} Temperature Averages Extracted")
-
-            print(f"Function: Extract_Temperature_Average_Values() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
-            print("*" * 100)
-            return CitiesTemperature_Dict
+    if FILE_FORMAT == 'CSV':
+        return pd.read_csv(File_Path, sep=',', engine='c', header=None, names=PREPARED_COLUMNS, usecols=REQUIRED_COLUMNS)
+    return Read_Columnar_File(File_Path, Columns=REQUIRED_COLUMNS)
 
-        else:
-            print("Function: Extract_Temperature_Average_Values() Ended -> 'Data is not extracted from Directories, Check Get_Prepared_Data_From_Directories() function'")
-            print("*" * 100)
-            return None
+def Stream_Summary_Values(Folder_Name, Cities = None, Dict_Data = None):
+    """
+    Get the values of all the SUMMARY_TABLES of each city in the STREAMING mode, one File at a time from reading to
+    its rows of the tables. Every table row only depends on its own File, so only the rows are carried from one File
+    to the next and the memory does not grow with the number of Cities and Years
+    :param Folder_Name: (string) The name of MAIN FOLDER where all the data exist
+    :param Cities: (list) Only summarize these Cities, None summarizes all of them
+    :param Dict_Data: (dict) Prepared Data Sets already in memory -> {City: {File: DataFrame}}, not read again
+    :return: (dict) The dictionary of key: Table, value: dictionary of key: City and value: List of rows [YEAR, Periods..., Annual]
+    """
+
+    print(f"Function: Stream_Summary_Values() Started -> {time.strftime(TIME_FORMAT)}")
+    FILES_PATH = "{FOLDER_NAME}/{CITY_NAME}/Prepared Data Sets/" + Height_Folder() + FILE_FORMAT + "/"
+    Summary_Dict = {Table: {} for Table in SUMMARY_TABLES}
+
+    try:
+        if FILE_FORMAT != 'CSV':
+            Check_Columnar_Support(FILE_FORMAT)
+
+        Cities = [c for c in os.listdir(Folder_Name)] if Cities is None else Cities #Get all the cities name in the MAIN FOLDER
+        for City in Cities:
+            Files_List = os.listdir(FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City))
+            for Table in SUMMARY_TABLES:
+                Summary_Dict[Table][City] = []
+
+            Span = Start_Span('Stream_Summary_Values', 'city', City = City)
+            In_Memory = {(file if FILE_FORMAT == 'CSV' else Columnar_File_Name(file, FILE_FORMAT)): df for file, df in (Dict_Data or {}).get(City, {}).items()}
+            for file in Files_List:
+                if file in In_Memory:
+                    df = In_Memory[file]
+                else:
+                    File_Path = FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City) + str(file)
+                    df = Read_Prepared_File(File_Path)
+                    Count(Span, Rows = len(df), Read_Files = [File_Path])
+
+                Append_Summary_Rows(Summary_Dict, [(City, file)], df[REQUIRED_COLUMNS].to_numpy(dtype=float))
+
+            End_Span(Span)
+            print(f"City: {City} Summary Values Extracted from {len(Files_List)} Files")
+
+        print(f"Function: Stream_Summary_Values() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+        print("*" * 100)
+        return Summary_Dict
 
     except Exception as error:
-        print(f"Function: Extract_Temperature_Average_Values() Ended with ERROR: '{error}'")
+        print(f"Function: Stream_Summary_Values() Ended with ERROR: '{error}'")
         print("*" * 100)
         return None
 
-def Extract_Wind_Average_Values(Dict_Data):
+def Append_Summary_Rows(Summary_Dict, Files, Values):
     """
-    Get all the Wind Speed Averages Values of each city, extracted STATICALLY from last column
+    Reduce the Values of some Files once per Resolution and append the row of every File to every table
+    :param Summary_Dict: (dict) The tables being filled -> {Table: {City: List of rows}}, with the list of every City
+    :param Files: (list) The (City, File name) of the Files, in the order of their columns in Values
+    :param Values: (array) The REQUIRED_COLUMNS of every File side by side, 8760 Rows
+    :return: None
+    """
+
+    Variables = [Table[0] for Table in SUMMARY_TABLES.values()]
+    File_Values = Values.reshape(len(Values), len(Files), len(REQUIRED_COLUMNS))
+
+    #The Variables of every File side by side, in groups reduced separately so each is only reduced with the statistics of its tables
+    Columns = tuple(Column for Column in REQUIRED_COLUMNS if Column in Variables)
+    Groups = {Columns: File_Values[..., [REQUIRED_COLUMNS.index(Column) for Column in Columns]].reshape(len(Values), -1)}
+    if any(Variable in DENSITY_VARIABLES for Variable in Variables):
+        #The DENSITY_VARIABLES of all the Files, computed from their REQUIRED_COLUMNS in a single pass
+        Density = np.empty((len(Values), len(Files), len(DENSITY_VARIABLES)))
+        Air_And_Power_Density(*(File_Values[..., REQUIRED_COLUMNS.index(Column)] for Column in DENSITY_COLUMNS), R_DRY_AIR,
+                              Out = (Density[..., DENSITY_VARIABLES.index('RHO')], Density[..., DENSITY_VARIABLES.index('WPD')]))
+        Groups[tuple(DENSITY_VARIABLES)] = Density.reshape(len(Values), -1)
+
+    #The statistics needed at each Resolution, the Annual value of a MEAN table is the average of its periods
+    Results = {}
+    for Columns, Group_Values in Groups.items():
+        Resolutions = {}
+        for Variable, Resolution, Statistic, Unit in SUMMARY_TABLES.values():
+            if Variable in Columns:
+                Resolutions.setdefault(Resolution, set()).add(Statistic)
+                if Statistic != 'MEAN':
+                    Resolutions.setdefault('YEAR', set()).add(Statistic)
+        Results[Columns] = {Resolution: Aggregate(Group_Values, Resolution, Statistics) for Resolution, Statistics in Resolutions.items()}
+
+    for File_Index, (City, year) in enumerate(Files):
+        for Table, (Variable, Resolution, Statistic, Unit) in SUMMARY_TABLES.items():
+            Columns = next(Columns for Columns in Groups if Variable in Columns)
+            Column = File_Index * len(Columns) + Columns.index(Variable) # The Variable of the File in its group
+            Periods = Results[Columns][Resolution][Statistic][:, Column]
+            Annual = Periods.mean() if Statistic == 'MEAN' else Results[Columns]['YEAR'][Statistic][0, Column]
+            Summary_Dict[Table][City].append([int(year.split('(')[1].split(')')[0]), *Periods, Annual])
+
+def Extract_Summary_Values(Dict_Data):
+    """
+    Get the values of all the SUMMARY_TABLES of each city. The REQUIRED_COLUMNS of every File are the columns of one
+    array, reduced once per Resolution for all the Files and statistics together with the calendar index of aggregation.py
     :param Dict_Data: (dict) The Data retrieve from the Directories in Multi-dimensional Dictionary
-    :return: (dict) The dictionary of key: City and value: List of Wind Speed Averages with respect to month
+    :return: (dict) The dictionary of key: Table, value: dictionary of key: City and value: List of rows [YEAR, Periods..., Annual]
     """
 
-    print(f"Function: Extract_Wind_Average_Values() Started -> {time.strftime(TIME_FORMAT)}")
-    CitiesWindSpeed_Dict = {}
-    Data = deepcopy(Dict_Data)
+    print(f"Function: Extract_Summary_Values() Started -> {time.strftime(TIME_FORMAT)}")
+    Summary_Dict = {Table: {} for Table in SUMMARY_TABLES}
+    Data = Dict_Data # Only read by this stage, so it is not copied
     try:
         if len(Data) > 0:
             for City in Data:
-                CitiesWindSpeed_Dict.update({City: [[year.split('(')[1].split(')')[0],
-                                                       file.iloc[0:744, -1].mean(), file.iloc[744:1416, -1].mean(),
-                                                       file.iloc[1416:2160, -1].mean(), file.iloc[2160:2880, -1].mean(),
-                                                       file.iloc[2880:3624, -1].mean(), file.iloc[3624:4344, -1].mean(),
-                                                       file.iloc[4344:5088, -1].mean(), file.iloc[5088:5832, -1].mean(),
-                                                       file.iloc[5832:6552, -1].mean(), file.iloc[6552:7296, -1].mean(),
-                                                       file.iloc[7296:8016, -1].mean(), file.iloc[8016:8760, -1].mean()]
-                                                      for year, file in list(Data[City].items())]})
-
-                print(f"City: {City} Wind Speed Averages Extracted")
-
-            print(f"Function: Extract_Wind_Average_Values() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+                for Table in SUMMARY_TABLES:
+                    Summary_Dict[Table][City] = []
+
+            Files = [(City, year) for City in Data for year in Data[City]]
+            Values = np.concatenate([Data[City][year][REQUIRED_COLUMNS].to_numpy(dtype=float) for City, year in Files], axis=1)
+            Append_Summary_Rows(Summary_Dict, Files, Values)
+
+            for City in Data:
+                print(f"City: {City} Summary Values Extracted")
+
+            print(f"Function: Extract_Summary_Values() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
             print("*" * 100)
-            return CitiesWindSpeed_Dict
+            return Summary_Dict
 
         else:
-            print("Function: Extract_Wind_Average_Values() Ended -> 'Data is not extracted from Directories, Check Get_Prepared_Data_From_Directories() function'")
+            print("Function: Extract_Summary_Values() Ended -> 'Data is not extracted from Directories, Check Get_Prepared_Data_From_Directories() function'")
             print("*" * 100)
             return None
 
     except Exception as error:
-        print(f"Function: Extract_Wind_Average_Values() Ended with ERROR: '{error}'")
+        print(f"Function: Extract_Summary_Values() Ended with ERROR: '{error}'")
         print("*" * 100)
         return None
 
-def Export_Monthly_Temperatures_CSV(Temp_Dict):
+def Summary_Table_Header(Table):
+    """
+    :param Table: (string) The name of one of the SUMMARY_TABLES
+    :return: (list) The column names of the Table, e.g. ["YEAR", "JAN °C", ..., "DEC °C", "Annual °C"]
+    """
+
+    Variable, Resolution, Statistic, Unit = SUMMARY_TABLES[Table]
+    return ["YEAR"] + [f"{Label} {Unit}".strip() for Label in Calendar_Index(Resolution)['Labels']] + [f"Annual {Unit}".strip()]
+
+def Export_Summary_Tables(Summary_Dict):
     """
-    The function Export_Monthly_Temperatures_CSV() exports the CSV file of Each City Data
-    :param Temp_Dict: (dict) A finalized Multi-dimensional Dictionary of our Temperature Averages
+    The function Export_Summary_Tables() exports the file of every Table of Each City Data, in the FILE_FORMAT, with the background writer
+    :param Summary_Dict: (dict) A finalized Multi-dimensional Dictionary of the Tables from Extract_Summary_Values()
     :return: None
     """
 
-    print(f"Function: Export_Monthly_Temperatures_CSV() Started -> {time.strftime(TIME_FORMAT)}")
-    FINAL_FILE_PATH = "{FOLDER_NAME}/{CITY_NAME}/Summarized Data/"
-    Header = ["YEAR", "JAN °C", "FEB °C", "MAR °C", "APR °C", "MAY °C", "JUN °C", "JUL °C", "AUG °C", "SEP °C", "OCT °C", "NOV °C", "DEC °C", "Annual °C"]
+    print(f"Function: Export_Summary_Tables() Started -> {time.strftime(TIME_FORMAT)}")
+    FINAL_FILE_PATH = "{FOLDER_NAME}/{CITY_NAME}/Summarized Data/" + Height_Folder()
     try:
-        if len(Temp_Dict) > 0:
-            for City in Temp_Dict:
-                Final_path = FINAL_FILE_PATH.format(FOLDER_NAME=FOLDER,CITY_NAME=City)  # Make the path for Prepared Dataset
-                os.makedirs(Final_path, exist_ok=True)  # Create the Summarized Data set directory, if not exist
-                time.sleep(0.25)
-
-                df = pd.DataFrame(Temp_Dict[City])
-                Annual_Avg = pd.Series([df.iloc[i, 1:].mean() for i in range(0, len(df))])
-                df[''] = Annual_Avg
-                df.to_csv(Final_path + f"Monthly_Temperature_{City}.csv", header=Header,index=False)  # Export All the Finalized CSV Files
-                print(f"Monthly_Temperature_{City}.csv Created Successfully")
-
-            print(f"Function: Export_Monthly_Temperatures_CSV() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+        if len(Summary_Dict) > 0:
+            for Table in Summary_Dict:
+                for City in Summary_Dict[Table]:
+                    Final_path = FINAL_FILE_PATH.format(FOLDER_NAME=FOLDER,CITY_NAME=City)  # Make the path for Summarized Data
+                    os.makedirs(Final_path, exist_ok=True)  # Create the Summarized Data set directory, if not exist
+
+                    Span = Start_Span('Export_Summary_Table', 'file', City = City, Table = Table)
+                    # The rows by YEAR, whatever the order the Files were read in, as the Production tables of energy_production.py
+                    df = pd.DataFrame(sorted(Summary_Dict[Table][City], key=lambda Row: Row[0]), columns=Summary_Table_Header(Table))
+                    File_Name = f"{Table}_{City}.csv" if FILE_FORMAT == 'CSV' else Columnar_File_Name(f"{Table}_{City}.csv", FILE_FORMAT)
+                    if FILE_FORMAT == 'CSV':
+                        Written_Bytes = Submit_Write(Final_path + File_Name, df.to_csv(index=False).encode('utf-8'))  # Export All the Finalized CSV Files
+                    else:
+                        Written_Bytes = Submit_Write(Final_path + File_Name, Columnar_File_Bytes(df, FILE_FORMAT))
+                    print(f"{File_Name} Created Successfully")
+                    Count(Span, Rows = len(df), Written_Bytes = Written_Bytes)
+                    End_Span(Span)
+
+            print(f"Function: Export_Summary_Tables() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
             print("*" * 100)
 
         else:
-            print("Function: Export_Monthly_Temperatures_CSV() Ended -> 'Data is not Transformed from Extract_Temperature_Average_Values() function' Kindly check")
+            print("Function: Export_Summary_Tables() Ended -> 'Data is not Transformed from Extract_Summary_Values() function' Kindly check")
             print("*" * 100)
 
     except Exception as error:
-        print(f"Function: Export_Monthly_Temperatures_CSV() Ended with ERROR: '{error}'")
+        print(f"Function: Export_Summary_Tables() Ended with ERROR: '{error}'")
         print("*" * 100)
 
-def Export_Monthly_WindSpeed_CSV(WindSpeed_Dict):
+def Summary_File_Paths(City):
+    """
+    :param City: (string) The City name
+    :return: (list) The paths of the SUMMARY_TABLES of the City in the Summarized Data
+    """
+
+    Final_path = f"{FOLDER}/{City}/Summarized Data/" + Height_Folder()
+    return [Final_path + (File if FILE_FORMAT == 'CSV' else Columnar_File_Name(File, FILE_FORMAT))
+            for File in [f"{Table}_{City}.csv" for Table in SUMMARY_TABLES]]
+
+def Summary_Parameters():
     """
-    The function Export_Monthly_WindSpeed_CSV() exports the CSV file of Each City Data
-    :param WindSpeed_Dict: (dict) A finalized Multi-dimensional Dictionary of our Wind Speed Averages
+    :return: (dict) The parameters the Summarized Data is built with, recorded in the Manifest
+    """
+
+    return {'FILE_FORMAT': FILE_FORMAT, 'SUMMARY_TABLES': {Table: list(Definition) for Table, Definition in SUMMARY_TABLES.items()},
+            'R_DRY_AIR': R_DRY_AIR}
+
+def Prepared_Input_Paths(City):
+    """
+    :param City: (string) The City name
+    :return: (list) The paths of the Prepared Data Sets of the City in the FILE_FORMAT folder
+    """
+
+    Files_Path = f"{FOLDER}/{City}/Prepared Data Sets/" + Height_Folder() + f"{FILE_FORMAT}/"
+    return [Files_Path + File for File in sorted(os.listdir(Files_Path))]
+
+def Record_Key(City):
+    """
+    :param City: (string) The City name
+    :return: (string) The Key of the City in the 'data_conversion' Section of the Manifest
+    """
+
+    return City if HUB_HEIGHT is None else f"{City}/{HUB_HEIGHT}m"
+
+def Select_Cities_To_Summarize(Folder_Name, Manifest):
+    """
+    Find the Cities to summarize. With a Manifest, a City is skipped when the content of all its Prepared Data Sets,
+    the parameters and its Summarized Data tables are unchanged since the last run
+    :param Folder_Name: (string) The name of MAIN FOLDER where all the data exist
+    :param Manifest: (dict) The Manifest from Load_Manifest(), None summarizes every City
+    :return: (list) The Cities to summarize
+    """
+
+    Cities = sorted(os.listdir(Folder_Name))
+    if Manifest is None:
+        return Cities
+
+    # The Records of the other Hub Heights are kept as long as their City exists
+    Remove_Stale_Records(Manifest, 'data_conversion', [Key for Key in Manifest.get('data_conversion', {}) if Key.split('/')[0] in Cities])
+    Selected_Cities = []
+    for City in Cities:
+        try:
+            if Is_Up_To_Date(Manifest, 'data_conversion', Record_Key(City), Prepared_Input_Paths(City), Summary_Parameters()):
+                continue
+        except FileNotFoundError: # No Prepared Data Sets, Get_Prepared_Data_From_Directories() reports it
+            pass
+        Selected_Cities.append(City)
+
+    print(f"Cities to summarize: {len(Selected_Cities)}, Cities unchanged since the last run: {len(Cities) - len(Selected_Cities)}")
+    return Selected_Cities
+
+def Record_Summarized_Cities(Manifest, Cities):
+    """
+    Record the summarized Cities in the Manifest, a City is only recorded if all of its tables were written
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Cities: (list) The Cities that were summarized
     :return: None
     """
 
-    print(f"Function: Export_Monthly_WindSpeed_CSV() Started -> {time.strftime(TIME_FORMAT)}")
-    FINAL_FILE_PATH = "{FOLDER_NAME}/{CITY_NAME}/Summarized Data/"
-    Header = ["YEAR", "JAN m/s", "FEB m/s", "MAR m/s", "APR m/s", "MAY m/s", "JUN m/s", "JUL m/s", "AUG m/s", "SEP m/s", "OCT m/s", "NOV m/s", "DEC m/s", "Annual m/s"]
-    try:
-        if len(WindSpeed_Dict) > 0:
-            for City in WindSpeed_Dict:
-                Final_path = FINAL_FILE_PATH.format(FOLDER_NAME=FOLDER,CITY_NAME=City)  # Make the path for Prepared Dataset
-                os.makedirs(Final_path, exist_ok=True)  # Create the Summarized Data set directory, if not exist
-                time.sleep(0.25)
-
-                df = pd.DataFrame(WindSpeed_Dict[City])
-                Annual_Avg = pd.Series([df.iloc[i, 1:].mean() for i in range(0, len(df))])
-                df[''] = Annual_Avg
-                df.to_csv(Final_path + f"Monthly_WindSpeed_{City}.csv", header=Header,index=False)  # Export All the Finalized CSV Files
-                print(f"Monthly_WindSpeed_{City}.csv Created Successfully")
-
-            print(f"Function: Export_Monthly_WindSpeed_CSV() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
-            print("*" * 100)
+    for City in Cities:
+        try:
+            Record_Build(Manifest, 'data_conversion', Record_Key(City), Prepared_Input_Paths(City), Summary_Parameters(), Summary_File_Paths(City))
+        except FileNotFoundError: # No Prepared Data Sets, the City was not summarized
+            pass
 
+    Save_Manifest(Manifest)
+
+def Configure(Settings):
+    """
+    Override the Constants of this script, e.g. from the command line or a config file
+    :param Settings: (dict) Constant name -> Value, see pipeline.Load_Settings()
+    :return: None
+    """
+
+    Apply_Settings(globals(), Settings)
+
+def Summarize_Cities(Manifest = None, Prepared_Data = None):
+    """
+    Summarize the Cities whose Prepared Data Sets changed since the last run recorded in the Manifest, or every City
+    without a Manifest, and record them in the Manifest
+    :param Manifest: (dict) The Manifest from Load_Manifest(), None summarizes every City
+    :param Prepared_Data: (dict) Prepared Data Sets already in memory -> {City: {File: DataFrame}}, they are not read again
+    :return: (list) The Cities summarized
+    """
+
+    Cities = Select_Cities_To_Summarize(Folder_Name = FOLDER, Manifest = Manifest)
+
+    if len(Cities) == 0:
+        print("All the Summarized Data is up to date, there is no City to summarize")
+
+    else:
+        if STREAMING:
+            Summary_Dict = Run_Stage(Stream_Summary_Values, Folder_Name = FOLDER, Cities = Cities, Dict_Data = Prepared_Data)
         else:
-            print("Function: Export_Monthly_WindSpeed_CSV() Ended -> 'Data is not Transformed from Extract_Wind_Average_Values() function' Kindly check")
-            print("*" * 100)
+            Prepared_Data = Run_Stage(Get_Prepared_Data_From_Directories, Folder_Name= FOLDER, Cities = Cities, Dict_Data = Prepared_Data)
+            Summary_Dict = Run_Stage(Extract_Summary_Values, Dict_Data= Prepared_Data)
+            del Prepared_Data
 
-    except Exception as error:
-        print(f"Function: Export_Monthly_WindSpeed_CSV() Ended with ERROR: '{error}'")
-        print("*" * 100)
+        Run_Stage(Export_Summary_Tables, Summary_Dict = Summary_Dict)
 
-def Main():
+        Flush_Writes() # The tables are complete before they are recorded or published
+        if Manifest is not None:
+            Record_Summarized_Cities(Manifest, Cities)
 
-    print(f"EXECUTION STARTED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
+    return Cities
 
-    Prepared_Data = Get_Prepared_Data_From_Directories(Folder_Name= FOLDER)
-    Temperature_Averages_Dict = Extract_Temperature_Average_Values(Dict_Data= Prepared_Data)
-    Wind_Averages_Dict = Extract_Wind_Average_Values(Dict_Data= Prepared_Data)
+def Main(Incremental = INCREMENTAL):
+
+    print(f"EXECUTION STARTED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
 
-    Export_Monthly_Temperatures_CSV(Temp_Dict = Temperature_Averages_Dict)
-    Export_Monthly_WindSpeed_CSV(WindSpeed_Dict = Wind_Averages_Dict)
+    Summarize_Cities(Manifest = Load_Manifest() if Incremental else None)
+    Print_Memory_Report()
 
+    Export_Trace('data_conversion')
     print(f"EXECUTION ENDED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
 
 if __name__ == '__main__':
-    Main()
\ No newline at end of file
+    Parser = argparse.ArgumentParser(description="Summarize the Prepared Data Sets of every City in FOLDER")
+    Parser.add_argument('--folder', help=f"The MAIN FOLDER of the Cities (default: {FOLDER})")
+    Parser.add_argument('--format', choices=['CSV', 'PARQUET', 'ARROW'], help=f"The format of the Prepared Data Sets and of the tables (default: {FILE_FORMAT})")
+    Parser.add_argument('--hub-height', type=int, metavar='Z', help="The Hub Height to use after a sweep of data_preprocessing (its '{Z}m' sub-folders)")
+    Parser.add_argument('--streaming', action='store_true', help="Summarize one Prepared Data Set at a time, with bounded memory")
+    Parser.add_argument('--incremental', action='store_true', help="Only summarize the Cities changed since the last run, recorded in the Manifest (see manifest.py)")
+    Parser.add_argument('--trace', action='store_true', help="Export the timing, CPU, memory, rows and bytes of every stage and City (see instrumentation.py)")
+    Parser.add_argument('--config', help="A JSON file of Constants of this script, e.g. {\"FOLDER\": \"Input\"}, the arguments take precedence")
+    Arguments = Parser.parse_args()
+    if Arguments.trace:
+        Enable_Trace()
+    Configure(Load_Settings(Arguments.config, FOLDER = Arguments.folder, FILE_FORMAT = Arguments.format, HUB_HEIGHT = Arguments.hub_height,
+                            STREAMING = True if Arguments.streaming else None, INCREMENTAL = True if Arguments.incremental else None))
+    Main(Incremental = INCREMENTAL)
@@ -1,22 +1,109 @@
 import os
 import pandas as pd
+import numpy as np
 import time
 import re #Regular Expression
-from copy import deepcopy
+import argparse
 from math import log #By default log is treated as ln() in python
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from aggregation import Calendar_Index, Aggregate
+from pipeline import Run_Stage, Run_Graph, Shallow_Copy, Print_Memory_Report, Load_Settings, Apply_Settings, Worker_Context
+from air_density import R_DRY_AIR, Air_And_Power_Density
+from columnar_io import Check_Columnar_Support, Columnar_File_Name, Columnar_File_Bytes
+from background_writer import Submit_Write, Flush_Writes, Mark_Failed
+from instrumentation import Enable_Trace, Start_Span, Count, End_Span, Collect_Trace_Records, Export_Trace, Trace_Records
+from manifest import Load_Manifest, Save_Manifest, Get_Record, Is_Up_To_Date, Record_Build, Remove_Stale_Records
 
 #Constants and Global Variables
 TIME_FORMAT_COMPLETE = '%d %B,%Y %I:%M:%S %p'
 TIME_FORMAT = '%I:%M:%S %p'
 FOLDER = 'Input'
 Zref = 50
-Z = int(input("Enter the value of 'Z': "))
+Z = None # The value of 'Z' (Hub Height), asked when the script is executed without --hub-heights
+WORKERS = 1 # Number of processes used by Main(), more than 1 runs Main_Parallel()
+FILE_FORMAT = 'CSV' # Format of the Prepared Data Sets: 'CSV', or the columnar 'PARQUET' or 'ARROW' (needs pyarrow)
+INCREMENTAL = False # Only prepare the Files whose input, parameters or outputs changed since the last run (see manifest.py)
+STREAMING = False # Prepare one File at a time, read in blocks of STREAM_CHUNK_ROWS rows, see Stream_NASA_POWER_File()
+STREAM_CHUNK_ROWS = 100000 # Rows of a File read at once in the STREAMING mode
+SHEAR_MODE = 'ANNUAL' # ALPHA of the Wind speed conversion: 'ANNUAL' one per File from its mean Uref, 'HOURLY' one per hour from its own WS50M, 'MONTH_HOUR' one per month and hour of the day from the mean WS50M of those hours, see Shear_Exponents()
+SHEAR_MODES = ['ANNUAL', 'HOURLY', 'MONTH_HOUR']
+TIME_COLUMNS = ['YEAR', 'MO', 'DY', 'HR']
+MINUTE_COLUMN = 'MN' # Minute of the sub-hourly records, only read in the STREAMING mode
+VARIABLES = ['T2M', 'PS', 'WD50M', 'WS50M'] # Order of the Variable axis of the Stacked Data
+HOURS_PER_YEAR = 8760
+MISSING_VALUE = -999 # The NASA POWER fill value of missing source data, read as NaN
+MAX_REPORTED_RANGES = 10 # Ranges of missing hours kept in the Validation Report of a File
+WRITE_BLOCK_ROWS = 8760 # Rows formatted at once by Export_File_CSV_SRW(), each block is formatted a single time for all outputs
+LOG_VARIABLES = ['T2M', 'WS50M', 'PS'] # Variables of the Logs statistics, in the order they are written, followed by the Air density and Wind power density
+SETTINGS = {} # The Constants overridden by Configure(), given again to the worker processes of Main_Parallel()
+LATITUDE_LONGITUDE_PATTERN = r'Latitude\s+(-?\d+\.\d+)\s+Longitude\s+(-?\d+\.\d+)'
+
+def Read_NASA_POWER_Header(File):
+    """
+    Scan the header block of a NASA POWER export line by line for the Latitude, Longitude and Parameter names.
+    The open file is left at the line of the column names, for the C parser
+    :param File: (file) The NASA POWER CSV File opened for reading
+    :return: (dict) The header values -> 'Latitude', 'Longitude' and 'Parameters'
+    """
+
+    Header = {'Latitude': None, 'Longitude': None, 'Parameters': []}
+
+    if File.readline().strip() == '-BEGIN HEADER-':
+        Parameters_Section = False
+        for Line in File:
+            Line = Line.strip()
+            if Line == '-END HEADER-':
+                break
+
+            match = re.search(LATITUDE_LONGITUDE_PATTERN, Line) #Finding the Value using REGEX Expression
+            if match:
+                Header['Latitude'] = match.group(1)
+                Header['Longitude'] = match.group(2)
+            elif Line.startswith('Parameter(s)'):
+                Parameters_Section = True
+            elif Parameters_Section and Line:
+                Header['Parameters'].append(Line.split()[0]) # Each parameter line starts with its column name
+    else:
+        File.seek(0) # No header block, the file starts directly with the column names
+
+    return Header
+
+def Column_Types(Header):
+    """
+    :param Header: (dict) The header values from Read_NASA_POWER_Header()
+    :return: (dict) The type of every column -> the TIME_COLUMNS and MINUTE_COLUMN as int and every parameter as float
+    """
+
+    Types = {Column: 'int64' for Column in TIME_COLUMNS + [MINUTE_COLUMN]}
+    Types.update({Parameter: 'float64' for Parameter in Header['Parameters']})
+    return Types
 
-def Get_Data_From_Directories(Folder_Name):
+def Read_NASA_POWER_File(File_Path):
+    """
+    Read a NASA POWER hourly export in one pass. The header block is scanned line by line for the Latitude,
+    Longitude and Parameter names, then the same open file is handed to the C parser so the hourly rows
+    are loaded straight into typed columns (YEAR, MO, DY, HR as int and every parameter as float)
+    :param File_Path: (string) The path of the NASA POWER CSV File
+    :return: (DataFrame) The hourly data with the header values kept in DataFrame.attrs
+             as 'Latitude', 'Longitude' and 'Parameters', the MISSING_VALUE of the parameters is NaN
+    """
+
+    with open(File_Path, 'r') as File:
+        Header = Read_NASA_POWER_Header(File)
+        df = pd.read_csv(File, sep=',', engine='c', dtype=Column_Types(Header))
+
+    Value_Columns = [Column for Column in df.columns if Column not in TIME_COLUMNS + [MINUTE_COLUMN]]
+    df[Value_Columns] = df[Value_Columns].mask(df[Value_Columns] == MISSING_VALUE)
+    df.attrs.update(Header)
+    return df
+
+def Get_Data_From_Directories(Folder_Name, Selected_Files = None):
     """
     Get all the Files Data from Directories and their Sub-Directories
     Categorized by Cities.
     :param Folder_Name: (string) The name of MAIN FOLDER where all the data exist
+    :param Selected_Files: (dict) Only read these Files -> {City: [File names]}, None reads all of them
     :return: (dict) The dictionary file of City and its DATAFRAME
     """
 
@@ -27,16 +114,19 @@ def Get_Data_From_Directories(Folder_Name):
 
     try:
 
-        Cities = [c for c in os.listdir(Folder_Name)] #Get all the cities name in the MAIN FOLDER
+        Cities = [c for c in os.listdir(Folder_Name)] if Selected_Files is None else list(Selected_Files) #Get all the cities name in the MAIN FOLDER
         for City_Name in Cities:
 
-            Files_List = os.listdir(FILES_PATH.format(FOLDER_NAME = Folder_Name,CITY_NAME = City_Name)) #Get all the Files name (Year-wise) of each particular location
+            Files_List = os.listdir(FILES_PATH.format(FOLDER_NAME = Folder_Name,CITY_NAME = City_Name)) if Selected_Files is None else Selected_Files[City_Name] #Get all the Files name (Year-wise) of each particular location
             Final_Dict[City_Name] = {}
 
             for file in Files_List: #Making the JSON file of our DATA
+                Span = Start_Span('Read_NASA_POWER_File', 'file', City = City_Name, File = file)
                 Final_Dict[City_Name].update({
-                    file: pd.read_csv(FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City_Name) +  str(file),sep='delimeter', engine='python',header=None)
+                    file: Read_NASA_POWER_File(FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City_Name) +  str(file))
                 })
+                Count(Span, Rows = len(Final_Dict[City_Name][file]), Read_Files = [FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City_Name) + str(file)])
+                End_Span(Span)
 
         print("Files Extracted are:")
         for x in Final_Dict.keys():
@@ -54,25 +144,24 @@ def Get_Data_From_Directories(Folder_Name):
 
 def Extract_Longitude_Latitude_Values(Dict_Data):
     """
-    Get all the Longitude and Latitude Values of each city, extracted STATICALLY from row 2
+    Get all the Longitude and Latitude Values of each city, read from the header of its first file
+    by Read_NASA_POWER_File()
     :param Dict_Data: (dict) The Data retrieve from the Directories in Multi-dimensional Dictionary
     :return: (dict) The dictionary of key: City and value: List of [Longitude, Latitude]
     """
 
     print(f"Function: Extract_Longitude_Latitude_Values() Started -> {time.strftime(TIME_FORMAT)}")
-    pattern = r'Latitude\s+(\d+\.\d+)\s+Longitude\s+(\d+\.\d+)'
     Long_Lati_Dict = {}
-    Data = deepcopy(Dict_Data)
+    Data = Dict_Data # Only read by this stage, so it is not copied
     try:
         if len(Data) > 0:
             for City in Data:
 
-                Long_Lati_Expression = str(list(Data[City].values())[0].iloc[3].values) #Get 2nd row where Longitude and Latitude Value Contains
-                match = re.search(pattern, Long_Lati_Expression) #Finding the Value using REGEX Expression
+                Header = list(Data[City].values())[0].attrs # Header values parsed along with the first file of the city
+                latitude = Header.get('Latitude')
+                longitude = Header.get('Longitude')
 
-                if match:
-                    latitude = match.group(1)
-                    longitude = match.group(2)
+                if latitude is not None and longitude is not None:
                     Long_Lati_Dict[City] = [longitude,latitude]
                     print(f"City: {City} -> Latitude: {latitude}, Longitude: {longitude}")
 
@@ -93,178 +182,442 @@ def Extract_Longitude_Latitude_Values(Dict_Data):
         print("*" * 100)
         return None
 
-def Transform_Data_With_New_Headers(Dict_Data):
+def Validate_File(File, df):
     """
-    Transform the Dataframe from (87xx Rows, 1 Column) To (87xx Rows, 8 Column) and drop the first 12 STATIC Rows
-    :param Dict_Data: (dict) The Data retrieve from the Directories in Multi-dimensional Dictionary
-    :return: (dict) The same dictionary with new modified values for further processing
+    Validate a single file in one pass over its typed YEAR, MO, DY, HR columns. Every row is placed on the hourly
+    calendar of the Year in its File name, without the Leap year 29th February, which gives its missing, duplicate
+    and out of order hours together. A File with missing values (the MISSING_VALUE of NASA POWER) in its hours is
+    EXCLUDED as well. The Variables must be in the "[T2M, PS, WD50M, WS50M]" order
+    :param File: (string) The File name containing the Year within brackets
+    :param df: (DataFrame) The Data of the File from Read_NASA_POWER_File()
+    :return: (tuple) (The 8760 Rows and 4 Column Data in hourly order, or None if the File is EXCLUDED,
+             The Validation Report of the File -> (dict) of the counts, the missing hour ranges and 'Valid')
     """
 
-    print(f"Function: Transform_Data_With_New_Headers() Started -> {time.strftime(TIME_FORMAT)}")
-    Data = deepcopy(Dict_Data)
-    try:
-        if len(Data) > 0:
-            for City in Data:
-                for File_name, File in list(Data[City].items()):
+    Year = File_Year(File)
+    Years = df['YEAR'].to_numpy()
+    Position, Invalid, In_Year, Leap_Day = Hour_Positions(Year, *(df[Column].to_numpy() for Column in TIME_COLUMNS))
+    Missing_Values = np.isnan(df.iloc[:, len(TIME_COLUMNS):].to_numpy(dtype=float))
+    Null = Missing_Values.all(axis=1) # Rows without any value
+    Rows = np.flatnonzero(In_Year & ~Leap_Day & ~Null)
+    Position = Position[Rows]
+    Counts = np.bincount(Position, minlength=HOURS_PER_YEAR)
+    Missing = np.flatnonzero(Counts == 0)
+    Ordered = bool(np.all(np.diff(Position) > 0))
+
+    Report = {
+        'Year': Year,
+        'Rows': int(len(df)),
+        'Other_Year_Rows': int(np.count_nonzero((Years != Year) & ~Invalid)),
+        'Leap_Day_Rows': int(np.count_nonzero(Leap_Day)),
+        'Invalid_Dates': int(np.count_nonzero(Invalid)),
+        'Null_Rows': int(np.count_nonzero(In_Year & ~Leap_Day & Null)),
+        'Missing_Values': int(np.count_nonzero(Missing_Values[Rows])),
+        'Missing_Hours': int(len(Missing)),
+        'Missing_Ranges': Missing_Hour_Ranges(Year, Missing),
+        'Duplicate_Hours': int(np.count_nonzero(Counts > 1)),
+        'Reordered': not Ordered,
+        'Columns_Valid': list(df.columns) == TIME_COLUMNS + VARIABLES
+    }
+    Report['Valid'] = Report['Missing_Hours'] == 0 and Report['Duplicate_Hours'] == 0 and Report['Missing_Values'] == 0 and Report['Columns_Valid']
+
+    if not Report['Valid']:
+        print(f"File: '{File}' is EXCLUDED -> {Format_Validation_Report(Report)}")
+        return None, Report
+
+    if not Ordered: # Complete and without duplicates, only the order of the hours is different
+        Rows = Rows[np.argsort(Position, kind='stable')]
+        print(f"File: '{File}' hours are not in order, so they are sorted")
+
+    return df.iloc[Rows, len(TIME_COLUMNS):], Report
+
+def File_Year(File):
+    """
+    :param File: (string) The File name containing the Year within brackets
+    :return: (int) The Year of the File
+    """
 
-                    File = File.iloc[12:] # Removing first 12 rows
-                    File = File[0].str.split(',',expand=True) # Transforming the file from 1 Column to 8 Columns
+    return int(File.split('(')[-1].split(")")[0].strip()) # Extract the Year within the File Name
 
-                    headers_row = File.iloc[0]  # Extract the headers from first Row of new Dataframe
-                    headers = headers_row.str.split(',').explode() # Converting headers to suitable format for the Dataframe
+def Hour_Positions(Year, Years, Months, Days, Hours):
+    """
+    Place rows on the hourly calendar of the Year, without the Leap year 29th February
+    :param Year: (int) The Year in the File name
+    :param Years: (array) The YEAR of every row
+    :param Months: (array) The MO of every row
+    :param Days: (array) The DY of every row
+    :param Hours: (array) The HR of every row
+    :return: (tuple) (The hour of every row in the 8760 hours of the Year, only meaningful for the rows In the Year
+             and not on the Leap Day, the masks of the Invalid dates, of the rows In the Year and of the Leap Day rows)
+    """
 
-                    File.columns = headers # Assigning new headers
-                    File = File.iloc[1:] # Removing Additional header row
-                    File = File.reset_index(drop=True) # Reset the S.No from 12 to 0
+    #The datetime64 of every row, a date that does not exist (e.g. 31st April) rolls over into the next month
+    Stamps = ((Years - 1970).astype('datetime64[Y]').astype('datetime64[M]') + (Months - 1)).astype('datetime64[D]') + (Days - 1)
+    Stamps = Stamps.astype('datetime64[h]') + Hours
+    Invalid = (Stamps.astype('datetime64[M]').astype(int) % 12 + 1 != Months) | (Days < 1) | (Hours < 0) | (Hours > 23)
 
-                    Data[City].update({File_name: File}) # Apply changes to Main Dictionary
+    In_Year = (Years == Year) & ~Invalid # Filtering based on Year
+    Leap_Day = In_Year & (Months == 2) & (Days == 29) # Leap year additional 29th Date
 
-            print(f"Function: Transform_Data_With_New_Headers() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
-            print("*" * 100)
-            return Data
+    #The hours after the 29th February move back by one day
+    Position = (Stamps - np.datetime64(f'{Year}-01-01T00', 'h')).astype(int)
+    if Year % 4 == 0:
+        Position -= 24 * (Stamps >= np.datetime64(f'{Year}-03-01T00', 'h'))
+    return Position, Invalid, In_Year, Leap_Day
 
-        else:
-            print("Function: Transform_Data_With_New_Headers() Ended -> 'Data is not extracted from Directories, Check Get_Data_From_Directories() function'")
-            print("*" * 100)
-            return None
+def Stream_NASA_POWER_File(File_Path, File):
+    """
+    Read and validate a NASA POWER export in blocks of STREAM_CHUNK_ROWS rows, the input of Process_File() in the
+    STREAMING mode. Every block is placed on the hourly calendar of the Year and added to hourly sums, so only the
+    8760 hours of the Year are kept whatever the length and resolution of the File. A sub-hourly File, with the
+    minute in a MINUTE_COLUMN after the TIME_COLUMNS, gives the mean of every hour, and the mean Wind direction of
+    the hour is the direction of its mean unit vector. An hourly File gives the same Data as Validate_File()
+    :param File_Path: (string) The path of the NASA POWER CSV File
+    :param File: (string) The File name containing the Year within brackets
+    :return: (tuple) (The header values -> 'Latitude', 'Longitude' and 'Parameters',
+             The 8760 Rows and 4 Column Data in hourly order, or None if the File is EXCLUDED,
+             The Validation Report of the File, as from Validate_File())
+    """
 
-    except Exception as error:
-        print(f"Function: Transform_Data_With_New_Headers() Ended with ERROR: '{error}'")
-        print("*" * 100)
-        return None
+    Year = File_Year(File)
+    Sums = np.zeros((HOURS_PER_YEAR, len(VARIABLES)))
+    Direction_Sums = np.zeros((HOURS_PER_YEAR, 2)) # Sine and cosine of the Wind direction
+    Counts = np.zeros(HOURS_PER_YEAR, dtype=int)
+    Duplicate = np.zeros(HOURS_PER_YEAR, dtype=bool)
+    Seen_Minutes = None # The minutes read of every hour, only for a sub-hourly File
+    Report = {'Year': Year, 'Rows': 0, 'Other_Year_Rows': 0, 'Leap_Day_Rows': 0, 'Invalid_Dates': 0, 'Null_Rows': 0, 'Missing_Values': 0}
+    Last_Key, Ordered, Columns_Valid = -1, True, False
+
+    with open(File_Path, 'r') as File_Object:
+        Header = Read_NASA_POWER_Header(File_Object)
+        for Chunk in pd.read_csv(File_Object, sep=',', engine='c', dtype=Column_Types(Header), chunksize=STREAM_CHUNK_ROWS):
+            Report['Rows'] += len(Chunk)
+            Sub_Hourly = list(Chunk.columns) == TIME_COLUMNS + [MINUTE_COLUMN] + VARIABLES
+            Columns_Valid = Sub_Hourly or list(Chunk.columns) == TIME_COLUMNS + VARIABLES
+            if not Columns_Valid: # The rows are only counted
+                continue
+
+            Position, Invalid, In_Year, Leap_Day = Hour_Positions(Year, *(Chunk[Column].to_numpy() for Column in TIME_COLUMNS))
+            Minutes = Chunk[MINUTE_COLUMN].to_numpy() if Sub_Hourly else np.zeros(len(Chunk), dtype=int)
+            Invalid |= (Minutes < 0) | (Minutes > 59)
+            In_Year &= ~Invalid
+            Leap_Day &= In_Year
+            Values = Chunk[VARIABLES].to_numpy(dtype=float)
+            Values[Values == MISSING_VALUE] = np.nan
+            Null = np.isnan(Values).all(axis=1) # Rows without any value
+            Rows = np.flatnonzero(In_Year & ~Leap_Day & ~Null)
+
+            Report['Other_Year_Rows'] += int(np.count_nonzero((Chunk['YEAR'].to_numpy() != Year) & ~Invalid))
+            Report['Leap_Day_Rows'] += int(np.count_nonzero(Leap_Day))
+            Report['Invalid_Dates'] += int(np.count_nonzero(Invalid))
+            Report['Null_Rows'] += int(np.count_nonzero(In_Year & ~Leap_Day & Null))
+            Report['Missing_Values'] += int(np.count_nonzero(np.isnan(Values[Rows])))
+
+            Position, Values = Position[Rows], Values[Rows]
+            Keys = Position * 60 + Minutes[Rows] # The minute of every row in the Year
+            if len(Keys) > 0:
+                Ordered = Ordered and Keys[0] > Last_Key and bool(np.all(np.diff(Keys) > 0))
+                Last_Key = max(Last_Key, int(Keys.max()))
+
+            if Sub_Hourly: # A minute read twice, in this block or an earlier one
+                if Seen_Minutes is None:
+                    Seen_Minutes = np.zeros(HOURS_PER_YEAR * 60, dtype=bool)
+                Unique_Keys, Key_Counts = np.unique(Keys, return_counts=True)
+                Duplicate[Unique_Keys[(Key_Counts > 1) | Seen_Minutes[Unique_Keys]] // 60] = True
+                Seen_Minutes[Unique_Keys] = True
+
+            Counts += np.bincount(Position, minlength=HOURS_PER_YEAR)
+            for Index in range(len(VARIABLES)):
+                Sums[:, Index] += np.bincount(Position, weights=Values[:, Index], minlength=HOURS_PER_YEAR)
+            Radians = np.radians(Values[:, VARIABLES.index('WD50M')])
+            Direction_Sums[:, 0] += np.bincount(Position, weights=np.sin(Radians), minlength=HOURS_PER_YEAR)
+            Direction_Sums[:, 1] += np.bincount(Position, weights=np.cos(Radians), minlength=HOURS_PER_YEAR)
+
+    if Seen_Minutes is None: # An hourly File, an hour read twice is a duplicate
+        Duplicate = Counts > 1
+    Missing = np.flatnonzero(Counts == 0)
+
+    Report.update({
+        'Missing_Hours': int(len(Missing)),
+        'Missing_Ranges': Missing_Hour_Ranges(Year, Missing),
+        'Duplicate_Hours': int(np.count_nonzero(Duplicate)),
+        'Reordered': not Ordered,
+        'Columns_Valid': Columns_Valid
+    })
+    Report['Valid'] = Report['Missing_Hours'] == 0 and Report['Duplicate_Hours'] == 0 and Report['Missing_Values'] == 0 and Report['Columns_Valid']
+
+    if not Report['Valid']:
+        print(f"File: '{File}' is EXCLUDED -> {Format_Validation_Report(Report)}")
+        return Header, None, Report
+
+    if not Ordered:
+        print(f"File: '{File}' hours are not in order, so they are sorted")
+
+    Hourly = Sums / Counts[:, np.newaxis] # An hour of a single row keeps its value as it is
+    Mean_Direction = np.mod(np.degrees(np.arctan2(Direction_Sums[:, 0], Direction_Sums[:, 1])), 360)
+    Hourly[:, VARIABLES.index('WD50M')] = np.where(Counts == 1, Hourly[:, VARIABLES.index('WD50M')], Mean_Direction)
+    return Header, pd.DataFrame(Hourly, columns=VARIABLES), Report
+
+def Missing_Hour_Ranges(Year, Missing):
+    """
+    :param Year: (int) The Year of the File
+    :param Missing: (array) The sorted positions of the missing hours in the 8760 hours of the Year
+    :return: (list) The first MAX_REPORTED_RANGES ranges of consecutive missing hours, e.g. ['2021-03-01T00 -> 2021-03-01T09']
+    """
+
+    if len(Missing) == 0:
+        return []
+
+    Calendar = np.arange(f'{Year}-01-01T00', f'{Year + 1}-01-01T00', dtype='datetime64[h]')
+    if Year % 4 == 0:
+        Calendar = Calendar[(Calendar < np.datetime64(f'{Year}-02-29T00', 'h')) | (Calendar >= np.datetime64(f'{Year}-03-01T00', 'h'))]
+
+    Breaks = np.flatnonzero(np.diff(Missing) > 1)
+    Starts = Missing[np.concatenate(([0], Breaks + 1))][:MAX_REPORTED_RANGES]
+    Ends = Missing[np.concatenate((Breaks, [len(Missing) - 1]))][:MAX_REPORTED_RANGES]
+    return [f"{Calendar[Start]} -> {Calendar[End]}" for Start, End in zip(Starts, Ends)]
+
+def Format_Validation_Report(Report):
+    """
+    :param Report: (dict) The Validation Report of a File from Validate_File()
+    :return: (string) The problems of the File in one line
+    """
+
+    Problems = []
+    if Report['Missing_Hours'] > 0:
+        Problems.append(f"{Report['Missing_Hours']} missing hours ({', '.join(Report['Missing_Ranges'])}"
+                        f"{', ...' if len(Report['Missing_Ranges']) == MAX_REPORTED_RANGES else ''})")
+    if Report['Duplicate_Hours'] > 0:
+        Problems.append(f"{Report['Duplicate_Hours']} duplicate hours")
+    if Report['Null_Rows'] > 0:
+        Problems.append(f"{Report['Null_Rows']} rows without values")
+    if Report.get('Missing_Values', 0) > 0: # Not in the Reports recorded before it was counted
+        Problems.append(f"{Report['Missing_Values']} missing values ({MISSING_VALUE})")
+    if Report['Invalid_Dates'] > 0:
+        Problems.append(f"{Report['Invalid_Dates']} rows with an invalid date")
+    if not Report['Columns_Valid']:
+        Problems.append(f"Column order is not the exact same as this -> '{TIME_COLUMNS + VARIABLES}'")
+
+    return ", ".join(Problems) if len(Problems) > 0 else "Valid"
+
+def Convert_File_Pressure(df):
+    """
+    Convert the "Pressure PS" Column of a single file from kPa into atmospheric pressure atm
+    :param df: (DataFrame) The Data of the File from Validate_File()
+    :return: (DataFrame) A new DataFrame with converted pressure values, sharing the other columns
+    """
+
+    return df.assign(PS = (df['PS'].to_numpy() * 1000) / 101325) # Conversion and replacing the PS values at 'ATM' unit
+
+def Calculate_File_ALPHA(df):
+    """
+    Calculate the ALPHA value of a single file using Zref, Uref and some constants
+    :param df: (DataFrame) The Data of the File from Convert_File_Pressure()
+    :return: (float) The ALPHA Value of the File, or (array) the ALPHA of every hour for the other SHEAR_MODES, see Shear_Exponents()
+    """
+
+    if SHEAR_MODE != 'ANNUAL':
+        return Shear_Exponents(df['WS50M'].to_numpy(dtype=float))
+
+    Uref = df['WS50M'].mean()  # Get the Average (Uref) Value of WS50M Column
+    return (0.37 - (0.088*log(Uref)))/(1 - (0.088*log(Zref/10))) # Formula to Calculate the ALPHA Value for each file
+
+def ALPHA_From_Uref(Uref):
+    """
+    :param Uref: (array) Average Wind speeds at Zref
+    :return: (array) The ALPHA of every Uref, with the formula of Calculate_ALPHA_Value()
+    """
+
+    with np.errstate(invalid='ignore', divide='ignore'): # A calm (0 m/s) or empty (NaN) Uref has no ALPHA
+        return (0.37 - (0.088*np.log(Uref)))/(1 - (0.088*log(Zref/10)))
+
+def Shear_Exponents(Wind_Speed):
+    """
+    Calculate the ALPHA of every hour of some Files at once for the SHEAR_MODE 'HOURLY' or 'MONTH_HOUR', so the
+    diurnal and seasonal changes of the shear are kept. The Uref of an hour is its own WS50M, or the mean WS50M of
+    its month and hour of the day. The log terms are computed once: ln(Zref/10) for all the Files, and ln(Uref) of
+    each month and hour of the day before it is broadcast to its hours. A calm Uref (0 m/s), which has no ALPHA,
+    takes the ALPHA of its File
+    :param Wind_Speed: (array) The WS50M of the Files, of shape (..., 8760)
+    :return: (array) The ALPHA of every hour, of the shape of Wind_Speed
+    """
+
+    if SHEAR_MODE not in SHEAR_MODES[1:]:
+        raise ValueError(f"Unknown SHEAR_MODE '{SHEAR_MODE}' for the ALPHA of every hour, expected one of {SHEAR_MODES[1:]}")
+
+    Uref = Wind_Speed
+    if SHEAR_MODE == 'MONTH_HOUR': # The mean of every month and hour of the day, of shape (..., 288)
+        Uref = Aggregate(Wind_Speed.reshape(-1, HOURS_PER_YEAR).T, 'MONTH_HOUR')['MEAN'].T.reshape(Wind_Speed.shape[:-1] + (-1,))
+
+    ALPHA = np.where(Uref > 0, ALPHA_From_Uref(Uref), ALPHA_From_Uref(Wind_Speed.mean(axis=-1, keepdims=True)))
+    return ALPHA[..., Calendar_Index('MONTH_HOUR')['Groups']] if SHEAR_MODE == 'MONTH_HOUR' else ALPHA
+
+def Convert_File_WindSpeed(df, Alpha, Hub_Height):
+    """
+    Convert the "Wind Speed at 50 WS50M" Column of a single file into new Wind speed U(z)
+    :param df: (DataFrame) The Data of the File from Convert_File_Pressure()
+    :param Alpha: (float) The Alpha value of the File, or (array) the ALPHA of every hour
+    :param Hub_Height: (int) The value of 'Z' to which the Wind speed is converted
+    :return: (DataFrame) A new DataFrame with converted Wind speed values, sharing the other columns
+    """
 
-def Validate_Rows(Transform_Data):
+    return df.assign(WS50M = ((Hub_Height/Zref)**Alpha) * df['WS50M'].to_numpy()) # Conversion and replacing the WS50M values to new ones
+
+def Validate_Data(Transform_Data, Reports = None):
     """
-    Filter the data based on the Year present in File name, if it contains 8760 rows of that year,
-    it is included otherwise excluded
-    :param Transform_Data: (dict) The Transformed Data from the Transform_Data_With_New_Headers() function
+    Validate every File in a single pass with Validate_File(), a File is included only if it has the 8760 hours of
+    the Year in its File name and the "[T2M, PS, WD50M, WS50M]" column order, otherwise excluded
+    :param Transform_Data: (dict) The Data retrieve from the Get_Data_From_Directories() function
                            in Multi-dimensional Dictionary
-    :return: (dict) The same Multi-dimensional Dictionary with 8760 Rows Data only
+    :param Reports: (dict) Filled with the Validation Report of every File -> {City: {File: Report}}
+    :return: (dict) The same Multi-dimensional Dictionary with 8760 Rows and 4 Column only
     """
 
-    print(f"Function: Validate_Rows() Started -> {time.strftime(TIME_FORMAT)}")
-    Data = deepcopy(Transform_Data)
-    List_To_Exclude = []
+    print(f"Function: Validate_Data() Started -> {time.strftime(TIME_FORMAT)}")
+    Data = Shallow_Copy(Transform_Data)
+    Reports = {} if Reports is None else Reports
+    Excluded_Files = 0
     try:
         if len(Data) > 0:
 
             for City in Data:
-                for File in Data[City]:
-
-                    Year = File.split('(')[-1].split(")")[0].strip() # Extract the Year within the File Name
-                    df = Data[City][File] # Get the 1st Dataframe of First City in the dictionary
-
-                    Final_df = df[df["YEAR"] == Year] # Filtering based on Year
-                    Final_df = Final_df[~((Final_df["MO"] == '2') & (Final_df["DY"] == '29'))] if int(Year) % 4 == 0 else Final_df #Exclude Leap year additional 29th Date
-                    Null_Values_Count = Final_df.isnull().all(axis=1).sum() # Find if there are any null valu/rows in the data
-                    if len(Final_df) == 8760 and Null_Values_Count == 0 :
-                        Data[City].update({File:Final_df})
-
-                    else:
-                        print(f"File: '{File}' contains {len(Final_df)} rows Only, so it is EXCLUDED")
-                        List_To_Exclude.append(File)
-
-            #Excluding the Invalid Cities
-            if len(List_To_Exclude) > 0:
-                for City in Data:
-                    for Exclude_City in List_To_Exclude:
-                        if Data[City].get(Exclude_City) is not None:
-                            Data[City].pop(Exclude_City)
-            else:
-                print("There is no Cities to Exclude, All Files contains 8760 Rows")
+                Reports[City] = {}
+                for File in list(Data[City]):
+
+                    Final_df, Reports[City][File] = Validate_File(File, Data[City][File])
+                    if Final_df is not None:
+                        Data[City].update({File: Final_df})
+
+                    else: #Excluding the Invalid Files
+                        Data[City].pop(File)
+                        Excluded_Files += 1
+
+            if Excluded_Files == 0:
+                print("There is no Files to Exclude, All Files contains 8760 Rows with the appropriate Columns order")
 
-            print(f"Function: Validate_Rows() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+            print(f"Function: Validate_Data() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
             print("*" * 100)
             return Data
 
         else:
-            print("Function: Validate_Rows() Ended -> 'Data is not Transformed from Transform_Data_With_New_Headers() function' Kindly check")
+            print("Function: Validate_Data() Ended -> 'Data is not extracted from Directories, Check Get_Data_From_Directories() function'")
             print("*" * 100)
             return None
 
     except Exception as error:
-        print(f"Function: Validate_Rows() Ended with ERROR: '{error}'")
+        print(f"Function: Validate_Data() Ended with ERROR: '{error}'")
         print("*" * 100)
         return None
 
-def Validate_Columns(Transform_Data):
+def Height_Folder(Hub_Height, Hub_Heights):
     """
-    Filter the data based on this "[T2M, PS, WD50M, WS50M]" column order in File, if it is exact same, it will be included,
-    otherwise excluded
-    :param Transform_Data: (dict) The Transformed Data from the Validate_Rows() function
-                           in Multi-dimensional Dictionary
-    :return: (dict) The same Multi-dimensional Dictionary with 8760 Rows and 4 Column only
+    :param Hub_Height: (int) One of the Hub Heights of the run
+    :param Hub_Heights: (list) All the Hub Heights of the run
+    :return: (int) The Hub Height, when several Hub Heights are prepared in one run (a sweep) each one is written to
+             its own '{Hub_Height}m' sub-folder of the Prepared Data Sets. None for a single Hub Height
     """
 
-    print(f"Function: Validate_Columns() Started -> {time.strftime(TIME_FORMAT)}")
-    Data = deepcopy(Transform_Data)
-    List_To_Exclude = []
-    Columns_To_Verify = ['T2M','PS','WD50M','WS50M']
-    try:
-        if len(Data) > 0:
+    return Hub_Height if len(Hub_Heights) > 1 else None
 
-            for City in Data:
-                for File in Data[City]:
+def Prepared_Data_Path(City, Height_Folder = None):
+    """
+    :param City: (string) The City name
+    :param Height_Folder: (int) The Hub Height sub-folder from Height_Folder(), None for a single Hub Height
+    :return: (string) The path of the Prepared Data Sets of the City
+    """
 
-                    df = Data[City][File]  # Get the 1st Dataframe of First City in the dictionary
-                    df_Columns_list = list(df.columns)[4:] # Get the last 4 columns after YEAR, MO, DY, HR
+    Final_path = f"{FOLDER}/{City}/Prepared Data Sets/"
+    return Final_path if Height_Folder is None else Final_path + f"{Height_Folder}m/"
 
-                    if df_Columns_list == Columns_To_Verify:
-                        Data[City].update({File: df.iloc[:,4:]})
+def Stack_Validated_Data(Transform_Data):
+    """
+    Load the validated Data of every City and Year into one contiguous array of shape (City, Year, 8760, Variable),
+    so the conversions run as single broadcast operations over the whole corpus. A City without the File of a Year
+    has NaN in that slot
+    :param Transform_Data: (dict) The Transformed Data from the Validate_Data() function
+                           in Multi-dimensional Dictionary
+    :return: (dict) The Stacked Data -> 'Values': the array, 'Cities': the City names, 'Years': the Years,
+             'Files': {(City index, Year index): File name} of the filled slots
+    """
 
-                    else:
-                        print(f"File: '{File}' Column order are not the exact same as this -> '{Columns_To_Verify}', so it is EXCLUDED")
-                        List_To_Exclude.append(File)
+    print(f"Function: Stack_Validated_Data() Started -> {time.strftime(TIME_FORMAT)}")
 
-            # Excluding the Invalid Cities
-            if len(List_To_Exclude) > 0:
-                for City in Data:
-                    for Exclude_City in List_To_Exclude:
-                        if Data[City].get(Exclude_City) is not None:
-                            Data[City].pop(Exclude_City)
-            else:
-                print("There is no Cities to Exclude, All Files Columns order is appropriate")
+    try:
+        if len(Transform_Data) > 0:
+
+            Cities = list(Transform_Data.keys())
+            File_Years = {File: int(File.split('(')[-1].split(")")[0].strip()) for City in Cities for File in Transform_Data[City]} # Extract the Year within the File Name
+            Years = sorted(set(File_Years.values()))
+
+            Values = np.full((len(Cities), len(Years), HOURS_PER_YEAR, len(VARIABLES)), np.nan)
+            Files = {}
+            for City_Index, City in enumerate(Cities):
+                for File, df in Transform_Data[City].items():
+                    Year_Index = Years.index(File_Years[File])
+                    Values[City_Index, Year_Index] = df[VARIABLES].to_numpy(dtype=float)
+                    Files[(City_Index, Year_Index)] = File
 
-            print(f"Function: Validate_Columns() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+            print(f"Function: Stack_Validated_Data() {len(Files)} Files Stacked in an array of shape {Values.shape}")
+            print(f"Function: Stack_Validated_Data() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
             print("*" * 100)
-            return Data
+            return {'Values': Values, 'Cities': Cities, 'Years': Years, 'Files': Files}
 
         else:
-            print("Function: Validate_Columns() Ended -> 'Data is not Transformed from Validate_Rows() function' Kindly check")
+            print("Function: Stack_Validated_Data() Ended -> 'Data is not Transformed from Validate_Data() function' Kindly check")
             print("*" * 100)
             return None
 
     except Exception as error:
-        print(f"Function: Validate_Columns() Ended with ERROR: '{error}'")
+        print(f"Function: Stack_Validated_Data() Ended with ERROR: '{error}'")
         print("*" * 100)
         return None
 
-def Pressure_Conversion(Transform_Data):
+def Unstack_Data(Stacked_Data, Height_Index = None):
     """
-    Convert the data "Pressure PS" Column Value from data "Transform_Data" into atmospheric pressure atm
-    :param Transform_Data: (dict) The Transformed Data from the Validate_Columns() function
-                           in Multi-dimensional Dictionary
-    :return: (dict) The same Multi-dimensional Dictionary with converted pressure values
+    Give back the Multi-dimensional Dictionary of the Stacked Data, the DataFrames are views of the array
+    :param Stacked_Data: (dict) The Stacked Data from the Stack_Validated_Data() function
+    :param Height_Index: (int) After a sweep of WindSpeed50M_Conversion(), the index of the Hub Height whose
+                         Wind speed is given in WS50M. None when the Wind speed was converted in place
+    :return: (dict) The Multi-dimensional Dictionary of City -> File -> DataFrame of the VARIABLES, empty when no File was stacked
+    """
+
+    if Stacked_Data is None: # Every File was EXCLUDED, or a previous stage Ended with ERROR
+        return {}
+
+    Data = {City: {} for City in Stacked_Data['Cities']}
+    for (City_Index, Year_Index), File in Stacked_Data['Files'].items():
+        Values = Stacked_Data['Values'][City_Index, Year_Index]
+        if Height_Index is None:
+            df = pd.DataFrame(Values, columns=VARIABLES, copy=False)
+        else:
+            df = pd.DataFrame({Variable: Stacked_Data['Wind_Speeds'][Height_Index, City_Index, Year_Index] if Variable == 'WS50M'
+                               else Values[:, Index] for Index, Variable in enumerate(VARIABLES)}, copy=False)
+        Data[Stacked_Data['Cities'][City_Index]][File] = df
+
+    return Data
+
+def Pressure_Conversion(Stacked_Data):
+    """
+    Convert the "Pressure PS" Variable of the Stacked Data into atmospheric pressure atm, in a single operation
+    over every City and Year. The array is owned by the Stacked Data, so it is converted in place
+    :param Stacked_Data: (dict) The Stacked Data from the Stack_Validated_Data() function
+    :return: (dict) The same Stacked Data with converted pressure values
     """
 
     print(f"Function: Pressure_Conversion() Started -> {time.strftime(TIME_FORMAT)}")
-    Data = deepcopy(Transform_Data)
     try:
-        if len(Data) > 0:
+        if Stacked_Data is not None and len(Stacked_Data['Files']) > 0:
 
-            for City in Data:
-                for File in Data[City]:
-                    df = Data[City][File]  # Get the 1st Dataframe of First City in the dictionary
-                    df_Pressure_Column = list(df.iloc[:,1]) # Get the PS Columns Values in a list
-                    df['PS'] = [(float(x) * 1000)/ 101325 for x in df_Pressure_Column] # Conversion and replacing the PS values at 'ATM' unit
-                    Data[City].update({File: df})
+            Pressure = Stacked_Data['Values'][..., VARIABLES.index('PS')] # A view of the PS values of every City and Year
+            Pressure *= 1000
+            Pressure /= 101325 # Conversion of the PS values to 'ATM' unit
 
             print(f"Function: Pressure_Conversion() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
             print("*" * 100)
-            return Data
+            return Stacked_Data
 
         else:
-            print("Function: Pressure_Conversion() Ended -> 'Data is not Transformed from Validated_RowsColumns_Data() function' Kindly check")
+            print("Function: Pressure_Conversion() Ended -> 'Data is not Stacked from Stack_Validated_Data() function' Kindly check")
             print("*" * 100)
             return None
 
@@ -273,30 +626,29 @@ def Pressure_Conversion(Transform_Data):
         print("*" * 100)
         return None
 
-def Calculate_ALPHA_Value(Transform_Data):
+def Calculate_ALPHA_Value(Stacked_Data):
     """
-    Calculate the ALPHA value using Zref, Uref and some constants and make it in the dictionary
-    :param Transform_Data: (dict) The Transformed Data from the Pressure_Conversion() function
-                           in Multi-dimensional Dictionary
-    :return: (dict) A Dictionary with File name and its ALPHA Value
+    Calculate the ALPHA value of every File using Zref, Uref and some constants, with the Uref of all the Files
+    computed in a single operation. For the other SHEAR_MODES, the ALPHA of every hour of all the Files, see Shear_Exponents()
+    :param Stacked_Data: (dict) The Stacked Data from the Pressure_Conversion() function
+    :return: (dict) A Dictionary with File name and its ALPHA Value, or the (array) of the ALPHA of its 8760 hours
     """
 
     print(f"Function: Calculate_ALPHA_Value() Started -> {time.strftime(TIME_FORMAT)}")
-    Alphas_Dict = {}
 
     try:
-        if len(Transform_Data) > 0:
+        if Stacked_Data is not None and len(Stacked_Data['Files']) > 0:
 
-            for City in Transform_Data:
-                for File in Transform_Data[City]:
+            if SHEAR_MODE == 'ANNUAL':
+                Uref = Stacked_Data['Values'][..., VARIABLES.index('WS50M')].mean(axis=2) # The Average (Uref) of WS50M of every City and Year
+                with np.errstate(invalid='ignore'): # The empty (NaN) slots give a NaN ALPHA
+                    ALPHA = (0.37 - (0.088*np.log(Uref)))/(1 - (0.088*log(Zref/10))) # Formula to Calculate the ALPHA Value for each file
+                Alphas_Dict = {File: float(ALPHA[Slot]) for Slot, File in Stacked_Data['Files'].items()}
 
-                    df = Transform_Data[City][File]  # Get the 1st Dataframe of First City in the dictionary
-                    df['WS50M'] = df['WS50M'].astype(float) # Convert the WS50M Column from str to float
-                    Uref = df.iloc[:, -1].mean()  # Get the Average (Uref) Value of WS50M Column
-                    ALPHA = (0.37 - (0.088*log(Uref)))/(1 - (0.088*log(Zref/10))) # Formula to Calculate the ALPHA Value for each file
-
-                    # print(f"The ALPHA Value for the file: '{File}' is -> '{ALPHA}'") #Uncomment this if you want to show Alpha Value logs for each file
-                    Alphas_Dict.update({File:ALPHA})
+            else:
+                ALPHA = Shear_Exponents(Stacked_Data['Values'][..., VARIABLES.index('WS50M')]) # The ALPHA of every hour of every City and Year
+                Alphas_Dict = {File: ALPHA[Slot] for Slot, File in Stacked_Data['Files'].items()}
+            # print(f"The ALPHA Values are -> '{Alphas_Dict}'") #Uncomment this if you want to show Alpha Value logs for each file
 
             print(f"Function: Calculate_ALPHA_Value() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
             print("*" * 100)
@@ -312,32 +664,39 @@ def Calculate_ALPHA_Value(Transform_Data):
         print("*" * 100)
         return None
 
-def WindSpeed50M_Conversion(Transform_Data, Alpha_Values):
+def WindSpeed50M_Conversion(Stacked_Data, Alpha_Values, Hub_Heights = None):
     """
-    Convert the data "Wind Speed at 50 WS50M" Column Value from data "Transform_Data" into new Wind speed U(z)
-    :param Transform_Data: (dict) The Transformed Data from the Pressure_Conversion() function
-                           in Multi-dimensional Dictionary
+    Convert the "Wind Speed at 50 WS50M" Variable of the Stacked Data into new Wind speed U(z), with the ALPHA of
+    each File (or of each hour) broadcast over its 8760 hours in a single operation. For a single Hub Height the array is converted
+    in place, for several Hub Heights the conversion is broadcast over all of them into 'Wind_Speeds'
+    :param Stacked_Data: (dict) The Stacked Data from the Pressure_Conversion() function
     :param Alpha_Values: (dict) The Alpha Values with respect to each File name
-    :return: (dict) The same Multi-dimensional Dictionary with converted Wind speed values
+    :param Hub_Heights: (list) The values of 'Z' to convert to, None converts to the global 'Z'
+    :return: (dict) The same Stacked Data with converted Wind speed values, and with 'Wind_Speeds': the array of
+             shape (Hub Height, City, Year, 8760) and 'Hub_Heights' for several Hub Heights
     """
 
     print(f"Function: WindSpeed50M_Conversion() Started -> {time.strftime(TIME_FORMAT)}")
-    Data = deepcopy(Transform_Data)
 
     try:
-        if len(Data) > 0:
+        if Stacked_Data is not None and len(Stacked_Data['Files']) > 0:
 
-            for City in Data:
-                for File in Data[City]:
-                    df = Data[City][File]  # Get the 1st Dataframe of First City in the dictionary
-                    Alpha = Alpha_Values[File] # Get the Alpha value with respect to File name
-                    All_Uzr_Values = list(df.iloc[:,-1]) # Get all the Uzr values in a list
-                    df['WS50M'] = [((Z/Zref)**Alpha) * Uzr for Uzr in All_Uzr_Values] # Conversion and replacing the WS50M values to new ones
-                    Data[City].update({File: df})
+            ALPHA = np.full(Stacked_Data['Values'].shape[:2] + (1 if SHEAR_MODE == 'ANNUAL' else HOURS_PER_YEAR,), np.nan)
+            for Slot, File in Stacked_Data['Files'].items():
+                ALPHA[Slot] = Alpha_Values[File] # The (City, Year, 1) array of the Alpha Values, or (City, Year, 8760) of the ALPHA of every hour
+
+            Hub_Heights = [Z] if Hub_Heights is None else Hub_Heights
+            Wind_Speed = Stacked_Data['Values'][..., VARIABLES.index('WS50M')] # A view of the WS50M values of every City and Year
+            if len(Hub_Heights) == 1:
+                Wind_Speed *= (Hub_Heights[0]/Zref)**ALPHA # Conversion of the WS50M values to new ones
+            else:
+                Ratios = (np.array(Hub_Heights, dtype=float)[:, np.newaxis, np.newaxis, np.newaxis]/Zref)**ALPHA # (Hub Height, City, Year, 1 or 8760)
+                Stacked_Data['Wind_Speeds'] = Wind_Speed * Ratios # Conversion of the WS50M values for every Hub Height at once
+                Stacked_Data['Hub_Heights'] = list(Hub_Heights)
 
             print(f"Function: WindSpeed50M_Conversion() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
             print("*" * 100)
-            return Data
+            return Stacked_Data
 
         else:
             print("Function: WindSpeed50M_Conversion() Ended -> 'Data is not Transformed from Pressure_Conversion() function' Kindly check")
@@ -349,90 +708,527 @@ def WindSpeed50M_Conversion(Transform_Data, Alpha_Values):
         print("*" * 100)
         return None
 
-def Export_CSV_SRW_LOGS_Files(Final_Data, Alpha_Values, LongLati_Values):
+def Export_File_CSV_SRW(City, File, df, LongLati, Hub_Height, Height_Folder = None, Alpha = None):
+    """
+    Export the CSV (or the columnar file of FILE_FORMAT) and SRW file of a single File and return its entry for the City Logs.
+    The files are formatted here and written by the background writer
+    :param City: (string) The City name
+    :param File: (string) The File name
+    :param df: (DataFrame) The finalized Data of the File
+    :param LongLati: (list) The [Longitude, Latitude] values of the City
+    :param Hub_Height: (int) The value of 'Z' written in the SRW header
+    :param Height_Folder: (int) The Hub Height sub-folder from Height_Folder(), None for a single Hub Height
+    :param Alpha: (array) The ALPHA of every hour for the SHEAR_MODES other than 'ANNUAL', the Logs then compare it
+                  with the ALPHA of the File. None, or a (float), adds nothing to the Logs
+    :return: (string) The Logs text of the File
+    """
+
+    Span = Start_Span('Export_File_CSV_SRW', 'file', City = City, File = File, Hub_Height = Hub_Height)
+    SRW_HEADER = "loc_id,city??,{CITY},Pakistan,year??,lat??,lon??,{LATITUDE},{LONGITUDE},8760\nFinalYearProject\nTemperature,Pressure,Direction,Speed\nC,atm,degrees,m/s\n2,0,{Z},{Z}\n"
+    Final_path = Prepared_Data_Path(City, Height_Folder)  # Make the path for Prepared Dataset
+
+    SRW_Path = Final_path + f"SRW/{File.replace('.csv','.srw')}"
+
+    #Every block of rows is formatted once, for the CSV and the SRW files. The lines end with '\n' as the SRW header,
+    #the text mode of the writer gives them the line ending of the platform
+    Blocks = [df.iloc[Start:Start + WRITE_BLOCK_ROWS].to_csv(header = False, index = False, lineterminator = '\n')
+              for Start in range(0, len(df), WRITE_BLOCK_ROWS)]
+    Written_Bytes = Submit_Write(SRW_Path, [SRW_HEADER.format(CITY = City, LATITUDE = LongLati[1], LONGITUDE = LongLati[0], Z = Hub_Height)] + Blocks)
+
+    if FILE_FORMAT == 'CSV':
+        #Exporting CSV and SRW Files
+        print()
+        print(f"Exporting {File} and {File.replace('.csv','.srw')} Files...")
+        Written_Bytes += Submit_Write(Final_path + f"CSV/{File}", Blocks)
+
+    else:
+        #Exporting Columnar Files, the column names are kept so the readers can load only the columns they need
+        print()
+        print(f"Exporting {Columnar_File_Name(File, FILE_FORMAT)} and {File.replace('.csv','.srw')} Files...")
+        Written_Bytes += Submit_Write(Final_path + f"{FILE_FORMAT}/{Columnar_File_Name(File, FILE_FORMAT)}", Columnar_File_Bytes(df, FILE_FORMAT))
+
+    #Logs text of the File, the Log Variables are converted once and every statistic is reduced over all of them together
+    Values = np.empty((len(df), len(LOG_VARIABLES) + 2), order='F') # Column by column, so every mode sums in the same order
+    Values[:, :len(LOG_VARIABLES)] = df[LOG_VARIABLES].to_numpy(dtype=float)
+    #The Air density and Wind power density are computed in the same pass, into the last two columns
+    Air_And_Power_Density(*(Values[:, LOG_VARIABLES.index(Variable)] for Variable in ('T2M', 'PS', 'WS50M')), R_DRY_AIR,
+                          Out = (Values[:, -2], Values[:, -1]))
+    Max, Min, Mean = Values.max(axis=0), Values.min(axis=0), Values.mean(axis=0)
+
+    Log_Entry = f"Year: {File.split('(')[1].split(')')[0]}\n"
+    Log_Entry += f"Max Temp: {Max[0]}\n"
+    Log_Entry += f"Min Temp: {Min[0]}\n"
+    Log_Entry += f"Average Temp: {Mean[0]}\n"
+    Log_Entry += f"Max Wind Speed: {Max[1]}\n"
+    Log_Entry += f"Min Wind Speed: {Min[1]}\n"
+    Log_Entry += f"Average Wind Speed: {Mean[1]}\n"
+    Log_Entry += f"Max Pressure: {Max[2]}\n"
+    Log_Entry += f"Min Pressure: {Min[2]}\n"
+    Log_Entry += f"Average Pressure: {Mean[2]}\n"
+    Log_Entry += f"Max Air Density: {Max[3]}\n"
+    Log_Entry += f"Min Air Density: {Min[3]}\n"
+    Log_Entry += f"Average Air Density: {Mean[3]}\n"
+    Log_Entry += f"Max Wind Power Density: {Max[4]}\n"
+    Log_Entry += f"Min Wind Power Density: {Min[4]}\n"
+    Log_Entry += f"Average Wind Power Density: {Mean[4]}\n"
+
+    if np.ndim(Alpha) > 0:
+        #The Wind speeds at Zref give the ALPHA of the File, and the Average Wind Speed the 'ANNUAL' SHEAR_MODE would have given
+        Uref = (df['WS50M'].to_numpy() / (Hub_Height/Zref)**Alpha).mean()
+        Annual_Alpha = ALPHA_From_Uref(Uref)
+        Log_Entry += f"Shear Mode: {SHEAR_MODE}\n"
+        Log_Entry += f"Annual Alpha Value: {Annual_Alpha}\n"
+        Log_Entry += f"Max Alpha Value: {Alpha.max()}\n"
+        Log_Entry += f"Min Alpha Value: {Alpha.min()}\n"
+        Log_Entry += f"Average Alpha Value: {Alpha.mean()}\n"
+        Log_Entry += f"Average Wind Speed (Annual Alpha): {Uref * (Hub_Height/Zref)**Annual_Alpha}\n"
+    Log_Entry += "\n"
+    # Log_Entry += f"Alpha Value: {Alpha_Values[File]}\n" # Uncomment this, If you also wants to show Alpha Values in the Logs of each file
+    # Log_Entry += f"Longitude & Latitude Values: {LongLati}\n\n" # Uncomment this, If you also wants to show Longitude and Latitude Values in the Logs of each file
+
+    Count(Span, Rows = len(df), Written_Bytes = Written_Bytes)
+    End_Span(Span)
+    return Log_Entry
+
+def Prepared_File_Paths(City, File, Height_Folder = None):
+    """
+    :param City: (string) The City name
+    :param File: (string) The File name in the 'Extracted Data Sets' of the City
+    :param Height_Folder: (int) The Hub Height sub-folder from Height_Folder(), None for a single Hub Height
+    :return: (list) The paths of the Prepared Data Set (CSV, PARQUET or ARROW) and SRW files exported for the File
+    """
+
+    Final_path = Prepared_Data_Path(City, Height_Folder)
+    Prepared_File = File if FILE_FORMAT == 'CSV' else Columnar_File_Name(File, FILE_FORMAT)
+    return [Final_path + f"{FILE_FORMAT}/{Prepared_File}", Final_path + f"SRW/{File.replace('.csv','.srw')}"]
+
+def Create_City_Directories(City, Height_Folder = None):
+    """
+    Create the Prepared Data Sets directories of a City
+    :param City: (string) The City name
+    :param Height_Folder: (int) The Hub Height sub-folder from Height_Folder(), None for a single Hub Height
+    :return: None
+    """
+
+    Final_path = Prepared_Data_Path(City, Height_Folder)  # Make the path for Prepared Dataset
+    os.makedirs(Final_path + f"{FILE_FORMAT}/", exist_ok=True)  # Create the Prepared Data set directory (CSV, PARQUET or ARROW), if not exist
+    os.makedirs(Final_path + "SRW/", exist_ok=True)  # Create the Prepared Data set directory, if not exist
+
+def Write_City_Logs(City, Log_Entries, Height_Folder = None):
+    """
+    Write the Logs file of a City from the Logs text of its Files, ordered by File name.
+    The whole file is replaced, so the Logs of a Previous Execution are never duplicated
+    :param City: (string) The City name
+    :param Log_Entries: (dict) The Logs text of each File of the City -> {File: Logs text}
+    :param Height_Folder: (int) The Hub Height sub-folder from Height_Folder(), None for a single Hub Height
+    :return: None
+    """
+
+    Log_Path = Prepared_Data_Path(City, Height_Folder) + f"{City} Logs.txt"
+    print(f"Writing the Logs of File: '{City + ' Logs.txt'}' with {len(Log_Entries)} Files...")
+    Submit_Write(Log_Path, [Log_Entries[File] for File in sorted(Log_Entries)])
+
+def Export_CSV_SRW_LOGS_Files(Final_Data, Alpha_Values, LongLati_Values, Cached_Logs = None, Hub_Height = None, Height_Folder = None):
     """
     The function Export_CSV_SRW_LOGS_Files() exports the CSV, SRW, and TXT logs file of Each City Data
     :param Final_Data: (dict) A finalized Multi-dimensional Dictionary of our Data
     :param Alpha_Values: {dict} A Dictionary of Alpha files with respect to file name
     :param LongLati_Values: (dict) A Dictionary of Longitude and Latitude values of each city
-    :return: None
+    :param Cached_Logs: (dict) The Logs text of the Files not exported again -> {City: {File: Logs text}},
+                        written to the Logs file of the City along with the exported Files
+    :param Hub_Height: (int) The value of 'Z' the Data was converted to, None for the global 'Z'
+    :param Height_Folder: (int) The Hub Height sub-folder from Height_Folder(), None for a single Hub Height
+    :return: (dict) The Logs text of each exported File -> {City: {File: Logs text}}, None on ERROR
     """
 
     print(f"Function: Export_CSV_SRW_LOGS_Files() Started -> {time.strftime(TIME_FORMAT)}")
-    FINAL_FILE_PATH = "{FOLDER_NAME}/{CITY_NAME}/Prepared Data Sets/"
-    SRW_HEADER = "loc_id,city??,{CITY},Pakistan,year??,lat??,lon??,{LATITUDE},{LONGITUDE},8760\nFinalYearProject\nTemperature,Pressure,Direction,Speed\nC,atm,degrees,m/s\n2,0,{Z},{Z}\n"
+    Cached_Logs = Cached_Logs or {}
+    Hub_Height = Z if Hub_Height is None else Hub_Height
+    Log_Entries = {}
 
     try:
+        if FILE_FORMAT != 'CSV':
+            Check_Columnar_Support(FILE_FORMAT)
+
         if len(Final_Data) > 0:
             for City in Final_Data:
-                Final_path = FINAL_FILE_PATH.format(FOLDER_NAME=FOLDER, CITY_NAME=City)  # Make the path for Prepared Dataset
-                os.makedirs(Final_path + "CSV/", exist_ok=True)  # Create the Prepared Data set directory, if not exist
-                os.makedirs(Final_path + "SRW/", exist_ok=True)  # Create the Prepared Data set directory, if not exist
-                time.sleep(0.25)
-
-                #Removing the Logs file if it is already created from Previous Execution (To Avoid Data Logs Duplication)
-                try:
-                    os.remove(Final_path + City +" Logs.txt")
-                    print(f"The Logs of File: '{City + ' Logs.txt'}' Already exist, removing old ones...")
-                except FileNotFoundError:
-                    print(f"The Logs of File: '{City + ' Logs.txt'}' does not exist yet. CREATING NOW...")
-
-                for File in Final_Data[City]:
-
-                    #Exporting CSV Files
-                    print()
-                    print(f"Exporting {File} File...")
-                    df = Final_Data[City][File]  # Get the 1st Dataframe of First City in the dictionary
-                    df.to_csv(Final_path + f"CSV/{File}", header = False, index = False) # Export All the Finalized CSV Files
-
-                    #Exporting SRW Files
-                    print(f"Exporting {File.replace('.csv','.srw')} File...")
-                    with open(Final_path + f"SRW/{File.replace('.csv','.srw')}",'w') as SRW_File:
-                        Data = open(Final_path + f"CSV/{File}", 'r')
-                        SRW_File.write(SRW_HEADER.format(CITY = City, LATITUDE = LongLati_Values[City][1], LONGITUDE = LongLati_Values[City][0], Z = Z))
-                        SRW_File.write(Data.read())
-
-                    #Exporting TXT Logs Files
-                    with open(Final_path + City + ' Logs.txt','a') as File_log:
-                        File_log.write(f"Year: {File.split('(')[1].split(')')[0]}\n")
-                        File_log.write(f"Max Temp: {df['T2M'].astype(float).max()}\n")
-                        File_log.write(f"Min Temp: {df['T2M'].astype(float).min()}\n")
-                        File_log.write(f"Average Temp: {df['T2M'].astype(float).mean()}\n")
-                        File_log.write(f"Max Wind Speed: {df['WS50M'].max()}\n")
-                        File_log.write(f"Min Wind Speed: {df['WS50M'].min()}\n")
-                        File_log.write(f"Average Wind Speed: {df['WS50M'].mean()}\n")
-                        File_log.write(f"Max Pressure: {df['PS'].max()}\n")
-                        File_log.write(f"Min Pressure: {df['PS'].min()}\n")
-                        File_log.write(f"Average Pressure: {df['PS'].mean()}\n\n")
-                        # File_log.write(f"Alpha Value: {Alpha_Values[File]}\n") # Uncomment this, If you also wants to show Alpha Values in the Logs of each file
-                        # File_log.write(f"Longitude & Latitude Values: {LongLati_Values[City]}\n\n") # Uncomment this, If you also wants to show Longitude and Latitude Values in the Logs of each file
+                Create_City_Directories(City, Height_Folder)
+
+                Log_Entries[City] = {File: Export_File_CSV_SRW(City, File, Final_Data[City][File], LongLati_Values[City], Hub_Height, Height_Folder,
+                                                               Alpha_Values[File])
+                                     for File in Final_Data[City]}
+
+                #Exporting TXT Logs Files
+                Write_City_Logs(City, {**Cached_Logs.get(City, {}), **Log_Entries[City]}, Height_Folder)
 
             print(f"Function: Export_CSV_SRW_LOGS_Files() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
             print("*" * 100)
+            return Log_Entries
 
         else:
             print("Function: Export_CSV_SRW_LOGS_Files() Ended -> 'Data is not Transformed from WindSpeed50M_Conversion() function' Kindly check")
             print("*" * 100)
+            return None
 
     except Exception as error:
         print(f"Function: Export_CSV_SRW_LOGS_Files() Ended with ERROR: '{error}'")
         print("*" * 100)
+        return None
+
+def Build_Parameters(Hub_Height = None):
+    """
+    :param Hub_Height: (int) The value of 'Z' of the Prepared Data Sets, None for the global 'Z'
+    :return: (dict) The parameters the Prepared Data Sets depend on, recorded in the Manifest
+    """
+
+    return {'Z': Z if Hub_Height is None else Hub_Height, 'Zref': Zref, 'FILE_FORMAT': FILE_FORMAT, 'R_DRY_AIR': R_DRY_AIR, 'SHEAR_MODE': SHEAR_MODE}
+
+def Record_Key(City, File, Height_Folder = None):
+    """
+    :param City: (string) The City name
+    :param File: (string) The File name in the 'Extracted Data Sets' of the City
+    :param Height_Folder: (int) The Hub Height sub-folder from Height_Folder(), None for a single Hub Height
+    :return: (string) The Key of the File in the 'data_preprocessing' Section of the Manifest
+    """
+
+    return f"{City}/{File}" if Height_Folder is None else f"{City}/{Height_Folder}m/{File}"
+
+def Select_Files_To_Prepare(Folder_Name, Manifest, Hub_Heights):
+    """
+    Find the Files to prepare. With a Manifest, a File is skipped when its input content, the parameters and its
+    exported files are unchanged since the last run for every Hub Height, and its Logs text is taken from the Manifest instead
+    :param Folder_Name: (string) The name of MAIN FOLDER where all the data exist
+    :param Manifest: (dict) The Manifest from Load_Manifest(), None prepares every File
+    :param Hub_Heights: (list) The values of 'Z' to prepare
+    :return: (tuple) (Files to prepare -> {City: [File names]}, Cached Logs -> {Hub Height: {City: {File: Logs text}}},
+             Cities whose Logs must be written again as some of their Files were removed)
+    """
+
+    Selected_Files = {}
+    Cached_Logs = {Hub_Height: {} for Hub_Height in Hub_Heights}
+    Current_Files = set()
+    Unchanged_Files = 0
+
+    for City in sorted(os.listdir(Folder_Name)):
+        for File in sorted(os.listdir(f"{Folder_Name}/{City}/Extracted Data Sets/")):
+
+            Current_Files.add(f"{City}/{File}")
+            Input_File = f"{Folder_Name}/{City}/Extracted Data Sets/{File}"
+            Keys = {Hub_Height: Record_Key(City, File, Height_Folder(Hub_Height, Hub_Heights)) for Hub_Height in Hub_Heights}
+            if Manifest is not None and all(Is_Up_To_Date(Manifest, 'data_preprocessing', Keys[Hub_Height], [Input_File], Build_Parameters(Hub_Height))
+                                            for Hub_Height in Hub_Heights):
+                Unchanged_Files += 1
+                for Hub_Height in Hub_Heights:
+                    Log_Entry = Get_Record(Manifest, 'data_preprocessing', Keys[Hub_Height])['Log']
+                    if Log_Entry is not None: # None for an EXCLUDED File
+                        Cached_Logs[Hub_Height].setdefault(City, {})[File] = Log_Entry
+            else:
+                Selected_Files.setdefault(City, []).append(File)
 
-def Main():
+    Removed_Cities = set()
+    if Manifest is not None:
+        # The Records of the other Hub Heights are kept as long as their input File exists
+        Current_Keys = [Key for Key in Manifest.get('data_preprocessing', {}) if f"{Key.split('/')[0]}/{Key.split('/')[-1]}" in Current_Files]
+        Removed_Cities = {Key.split('/')[0] for Key in Remove_Stale_Records(Manifest, 'data_preprocessing', Current_Keys)}
+        Removed_Cities = {City for City in Removed_Cities if os.path.isdir(f"{Folder_Name}/{City}")}
+
+    print(f"Files to prepare: {sum(len(Files) for Files in Selected_Files.values())}, "
+          f"Files unchanged since the last run: {Unchanged_Files}")
+    return Selected_Files, Cached_Logs, Removed_Cities
+
+def Record_Prepared_Files(Manifest, Selected_Files, Log_Entries, Reports):
+    """
+    Record the prepared Files in the Manifest with their Logs text and Validation Report, the EXCLUDED Files are
+    recorded without outputs so they are not read again until they change
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Selected_Files: (dict) The Files that were prepared -> {City: [File names]}
+    :param Log_Entries: (dict) The Logs text of each exported File -> {Hub Height: {City: {File: Logs text}}}
+    :param Reports: (dict) The Validation Report of every File -> {City: {File: Report}}
+    :return: None
+    """
+
+    Hub_Heights = list(Log_Entries)
+    for Hub_Height in Hub_Heights:
+        if Log_Entries[Hub_Height] is None: # The export of this Hub Height ended with ERROR
+            continue
+
+        Folder = Height_Folder(Hub_Height, Hub_Heights)
+        for City in Selected_Files:
+            for File in Selected_Files[City]:
+                Log_Entry = Log_Entries[Hub_Height].get(City, {}).get(File)
+                Record_Build(Manifest, 'data_preprocessing', Record_Key(City, File, Folder), [f"{FOLDER}/{City}/Extracted Data Sets/{File}"],
+                             Build_Parameters(Hub_Height), Prepared_File_Paths(City, File, Folder) if Log_Entry is not None else [],
+                             Log = Log_Entry, Validation = Reports.get(City, {}).get(File))
+
+    Save_Manifest(Manifest)
+
+def Remove_Stale_Prepared_Files(Folder_Name, Cached_Logs, Log_Entries, Hub_Heights):
+    """
+    Delete the Prepared Data Sets and SRW files whose input File was removed from the 'Extracted Data Sets' or is
+    now EXCLUDED, so the following scripts never read them again. Only the Hub Heights exported without ERROR are cleaned
+    :param Folder_Name: (string) The name of MAIN FOLDER where all the data exist
+    :param Cached_Logs: (dict) The Logs text of the Files not prepared again -> {Hub Height: {City: {File: Logs text}}}
+    :param Log_Entries: (dict) The Logs text of each exported File -> {Hub Height: {City: {File: Logs text}}}
+    :param Hub_Heights: (list) The values of 'Z'
+    :return: (list) The paths of the deleted files
+    """
+
+    Removed_Files = []
+    for Hub_Height in Hub_Heights:
+        if Hub_Height in Log_Entries and Log_Entries[Hub_Height] is None: # The export of this Hub Height ended with ERROR
+            continue
+
+        Folder = Height_Folder(Hub_Height, Hub_Heights)
+        for City in sorted(os.listdir(Folder_Name)):
+            Exported_Files = {**Cached_Logs[Hub_Height].get(City, {}), **Log_Entries.get(Hub_Height, {}).get(City, {})}
+            Current_Paths = {Path for File, Log_Entry in Exported_Files.items() if Log_Entry is not None
+                             for Path in Prepared_File_Paths(City, File, Folder)}
+            Final_path = Prepared_Data_Path(City, Folder)
+            for Sub_Folder in [f"{FILE_FORMAT}/", "SRW/"]:
+                if not os.path.isdir(Final_path + Sub_Folder):
+                    continue
+                for Prepared_File in sorted(os.listdir(Final_path + Sub_Folder)):
+                    Path = Final_path + Sub_Folder + Prepared_File
+                    if os.path.isfile(Path) and Path not in Current_Paths:
+                        os.remove(Path)
+                        Removed_Files.append(Path)
+
+    if len(Removed_Files) > 0:
+        print(f"Prepared files deleted as their input File was removed or EXCLUDED: {len(Removed_Files)}")
+    return Removed_Files
+
+def Process_File(City, File, Hub_Heights):
+    """
+    Run a single File through the whole preparation, from reading to the CSV and SRW export of every Hub Height.
+    It is the unit of work of Main_Parallel() and only depends on its own File. In the STREAMING mode the File is
+    read in blocks by Stream_NASA_POWER_File(), and the Uref of its ALPHA value is the mean of its hourly sums
+    :param City: (string) The City name
+    :param File: (string) The File name in the 'Extracted Data Sets' of the City
+    :param Hub_Heights: (list) The values of 'Z'
+    :return: (tuple) (City, File, Logs text of each Hub Height -> {Hub Height: Logs text} or None if the File is EXCLUDED,
+             Validation Report of the File, Trace Records of the worker process -> empty when the Trace is disabled,
+             paths of the files whose write failed)
+    """
+
+    Span = Start_Span('Process_File', 'file', City = City, File = File)
+    File_Path = f"{FOLDER}/{City}/Extracted Data Sets/{File}"
+    if STREAMING:
+        Header, df, Report = Stream_NASA_POWER_File(File_Path, File)
+    else:
+        df = Read_NASA_POWER_File(File_Path)
+        Header = df.attrs
+        df, Report = Validate_File(File, df)
+    Count(Span, Rows = Report['Rows'], Read_Files = [File_Path])
+    LongLati = [Header.get('Longitude'), Header.get('Latitude')]
+
+    if df is None:
+        End_Span(Span)
+        return City, File, None, Report, Collect_Trace_Records(), []
+
+    df = Convert_File_Pressure(df)
+    Alpha = Calculate_File_ALPHA(df)
+
+    Height_Logs = {Hub_Height: Export_File_CSV_SRW(City, File, Convert_File_WindSpeed(df, Alpha, Hub_Height), LongLati, Hub_Height,
+                                                   Height_Folder(Hub_Height, Hub_Heights), Alpha)
+                   for Hub_Height in Hub_Heights}
+    Failed = Flush_Writes() # The files are complete before the main process records them
+    End_Span(Span)
+    return City, File, Height_Logs, Report, Collect_Trace_Records(), Failed
+
+def Main_Parallel(Workers, Selected_Files, Cached_Logs, Hub_Heights, Reports = None):
+    """
+    Prepare the City and Year Files across a pool of processes. Files are fanned out in a fixed
+    (City, File) order and the Logs of each City are written from the results in that same order. With 1 Worker,
+    in the STREAMING mode, the Files are prepared one after the other in this process, only one is held in memory
+    :param Workers: (int) The number of worker processes, 1 prepares the Files in this process
+    :param Selected_Files: (dict) The Files to prepare -> {City: [File names]}
+    :param Cached_Logs: (dict) The Logs text of the Files not prepared again -> {Hub Height: {City: {File: Logs text}}}
+    :param Hub_Heights: (list) The values of 'Z'
+    :param Reports: (dict) Filled with the Validation Report of every File -> {City: {File: Report}}
+    :return: (dict) The Logs text of each exported File -> {Hub Height: {City: {File: Logs text}}}, None on ERROR
+    """
+
+    print(f"Function: Main_Parallel() Started with {Workers} Workers -> {time.strftime(TIME_FORMAT)}")
+
+    try:
+        if FILE_FORMAT != 'CSV':
+            Check_Columnar_Support(FILE_FORMAT)
+
+        Jobs = [(City, File) for City in sorted(Selected_Files) for File in sorted(Selected_Files[City])]
+        for City in Selected_Files:
+            for Hub_Height in Hub_Heights:
+                Create_City_Directories(City, Height_Folder(Hub_Height, Hub_Heights))
+
+        Log_Entries = {Hub_Height: {City: {} for City in Selected_Files} for Hub_Height in Hub_Heights}
+        # The workers start from a clean process with the Constants of this one, 'Z' may have been asked after Configure()
+        with ProcessPoolExecutor(max_workers=Workers, mp_context=Worker_Context(), initializer=Initialize_Worker, initargs=({**SETTINGS, 'Z': Z},)) \
+                if Workers > 1 else nullcontext() as Executor:
+            Results = (map if Executor is None else Executor.map)(Process_File, [City for City, _ in Jobs], [File for _, File in Jobs], [Hub_Heights] * len(Jobs))
+
+            for City, File, Height_Logs, Report, Records, Failed in Results: # map() yields the results in the order of Jobs
+                Trace_Records.extend(Records)
+                Mark_Failed(Failed) # Written by a worker process, they are not recorded in the Manifest
+                if Reports is not None:
+                    Reports.setdefault(City, {})[File] = Report
+                if Height_Logs is not None:
+                    for Hub_Height, Log_Entry in Height_Logs.items():
+                        Log_Entries[Hub_Height][City][File] = Log_Entry
+
+        #Exporting TXT Logs Files
+        for Hub_Height in Hub_Heights:
+            for City in Log_Entries[Hub_Height]:
+                Write_City_Logs(City, {**Cached_Logs[Hub_Height].get(City, {}), **Log_Entries[Hub_Height][City]},
+                                Height_Folder(Hub_Height, Hub_Heights))
+
+        print(f"Function: Main_Parallel() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+        print("*" * 100)
+        return Log_Entries
+
+    except Exception as error:
+        print(f"Function: Main_Parallel() Ended with ERROR: '{error}'")
+        print("*" * 100)
+        return None
+
+def Configure(Settings):
+    """
+    Override the Constants of this script, e.g. from the command line or a config file
+    :param Settings: (dict) Constant name -> Value, see pipeline.Load_Settings()
+    :return: None
+    """
+
+    Apply_Settings(globals(), Settings)
+    SETTINGS.update(Settings)
+
+def Initialize_Worker(Settings):
+    """
+    Initialize a worker process of Main_Parallel() with the Constants of the main process
+    :param Settings: (dict) Constant name -> Value, see Configure()
+    :return: None
+    """
+
+    Configure(Settings)
+    Collect_Trace_Records() # Only the Trace Records made by this worker are returned to the main process
+
+def Preparation_Graph(Selected_Files, Cached_Logs, Hub_Heights, Reports):
+    """
+    The stages of the preparation in a single process as a dependency graph for pipeline.Run_Graph(). The Longitude
+    and Latitude extraction and the validation both only read the Raw Data, so they run at the same time, as do the
+    exports of the Hub Heights. Every intermediate dictionary is released as soon as its last stage has run
+    :param Selected_Files: (dict) The Files to prepare -> {City: [File names]}
+    :param Cached_Logs: (dict) The Logs text of the Files not prepared again -> {Hub Height: {City: {File: Logs text}}}
+    :param Hub_Heights: (list) The values of 'Z'
+    :param Reports: (dict) Filled with the Validation Report of every File -> {City: {File: Report}}
+    :return: (dict) The graph, the 'Log_Entries_{Z}' Nodes give the Logs text of every Hub Height and the
+             'Finalized_Data_{Z}' Nodes the Multi-dimensional Dictionary exported for it
+    """
+
+    Graph = {
+        'Raw_Data': {'Stage': Get_Data_From_Directories, 'Arguments': {'Folder_Name': FOLDER, 'Selected_Files': Selected_Files}},
+        'LongLati_Dict': {'Stage': Extract_Longitude_Latitude_Values, 'Inputs': {'Dict_Data': 'Raw_Data'}},
+        'Validated_Data': {'Stage': Validate_Data, 'Inputs': {'Transform_Data': 'Raw_Data'}, 'Arguments': {'Reports': Reports}},
+        'Stacked_Data': {'Stage': Stack_Validated_Data, 'Inputs': {'Transform_Data': 'Validated_Data'}},
+        # The conversions own the Stacked Data and convert its array in place
+        'Converted_Data': {'Stage': Pressure_Conversion, 'Inputs': {'Stacked_Data': 'Stacked_Data'}},
+        'ALPHA_Values_Dict': {'Stage': Calculate_ALPHA_Value, 'Inputs': {'Stacked_Data': 'Converted_Data'}},
+        'Final_Data': {'Stage': WindSpeed50M_Conversion, 'Inputs': {'Stacked_Data': 'Converted_Data', 'Alpha_Values': 'ALPHA_Values_Dict'},
+                       'Arguments': {'Hub_Heights': Hub_Heights}},
+    }
+
+    for Height_Index, Hub_Height in enumerate(Hub_Heights):
+        Graph[f"Finalized_Data_{Hub_Height}"] = {'Stage': Unstack_Data, 'Inputs': {'Stacked_Data': 'Final_Data'},
+                                                 'Arguments': {'Height_Index': Height_Index if len(Hub_Heights) > 1 else None}}
+        Graph[f"Log_Entries_{Hub_Height}"] = {'Stage': Export_CSV_SRW_LOGS_Files,
+                                              'Inputs': {'Final_Data': f"Finalized_Data_{Hub_Height}", 'Alpha_Values': 'ALPHA_Values_Dict',
+                                                         'LongLati_Values': 'LongLati_Dict'},
+                                              'Arguments': {'Cached_Logs': Cached_Logs[Hub_Height], 'Hub_Height': Hub_Height,
+                                                            'Height_Folder': Height_Folder(Hub_Height, Hub_Heights)}}
+    return Graph
+
+def Prepare_Files(Manifest = None, Workers = WORKERS, Hub_Heights = None):
+    """
+    Prepare the Files that changed since the last run recorded in the Manifest, or every File without a Manifest,
+    and record them in the Manifest
+    :param Manifest: (dict) The Manifest from Load_Manifest(), None prepares every File
+    :param Workers: (int) The number of processes, more than 1, or the STREAMING mode, runs Main_Parallel()
+    :param Hub_Heights: (list) The values of 'Z' to prepare, None prepares the global 'Z'
+    :return: (dict) The Multi-dimensional Dictionary of City -> File -> DataFrame of the first Hub Height, as it was
+             exported, so the following scripts do not read it again. Empty when no File was prepared in this process,
+             or in the STREAMING mode
+    """
+
+    Hub_Heights = [Z] if Hub_Heights is None else list(dict.fromkeys(Hub_Heights)) # Without the repeated Hub Heights
+    Selected_Files, Cached_Logs, Removed_Cities = Select_Files_To_Prepare(Folder_Name = FOLDER, Manifest = Manifest, Hub_Heights = Hub_Heights)
+    Validation_Reports = {}
+    Finalized_Data = {}
+
+    for City in Removed_Cities - set(Selected_Files): # Only the Logs of these Cities changed, as some of their Files were removed
+        for Hub_Height in Hub_Heights:
+            Write_City_Logs(City, Cached_Logs[Hub_Height].get(City, {}), Height_Folder(Hub_Height, Hub_Heights))
+
+    if len(Selected_Files) == 0:
+        print("All the Prepared Data Sets are up to date, there is no File to prepare")
+        Log_Entries = {}
+
+    elif Workers > 1 or STREAMING:
+        Log_Entries = Run_Stage(Main_Parallel, Workers = Workers, Selected_Files = Selected_Files, Cached_Logs = Cached_Logs, Hub_Heights = Hub_Heights,
+                                Reports = Validation_Reports)
+
+    else:
+        Values = Run_Graph(Preparation_Graph(Selected_Files, Cached_Logs, Hub_Heights, Validation_Reports),
+                           Targets = [f"Log_Entries_{Hub_Height}" for Hub_Height in Hub_Heights] + [f"Finalized_Data_{Hub_Heights[0]}"])
+        Log_Entries = {Hub_Height: Values[f"Log_Entries_{Hub_Height}"] for Hub_Height in Hub_Heights}
+        if Log_Entries[Hub_Heights[0]] is not None:
+            Finalized_Data = Values[f"Finalized_Data_{Hub_Heights[0]}"] or {}
+        elif all(not Validation_Reports.get(City, {}).get(File, {}).get('Valid', True) for City in Selected_Files for File in Selected_Files[City]):
+            Log_Entries = {Hub_Height: {} for Hub_Height in Hub_Heights} # Every File was EXCLUDED, there was nothing to export
+            for City in Selected_Files:
+                for Hub_Height in Hub_Heights:
+                    if os.path.isdir(Prepared_Data_Path(City, Height_Folder(Hub_Height, Hub_Heights))):
+                        Write_City_Logs(City, Cached_Logs[Hub_Height].get(City, {}), Height_Folder(Hub_Height, Hub_Heights))
+
+    Flush_Writes() # The Prepared Data Sets are complete before they are recorded or read by the following scripts
+    if Log_Entries is not None:
+        Remove_Stale_Prepared_Files(FOLDER, Cached_Logs, Log_Entries, Hub_Heights)
+    if Manifest is not None and Log_Entries is not None:
+        Record_Prepared_Files(Manifest, Selected_Files, Log_Entries, Validation_Reports)
+
+    return Finalized_Data
+
+def Main(Workers = WORKERS, Incremental = INCREMENTAL, Hub_Heights = None):
+    """
+    :param Workers: (int) The number of processes, more than 1 runs Main_Parallel()
+    :param Incremental: (bool) Only prepare the Files that changed since the last run
+    :param Hub_Heights: (list) The values of 'Z' to prepare, None prepares the global 'Z'. The Data is read, validated
+                        and converted once, then written for every Hub Height in its own '{Hub_Height}m' sub-folder
+    :return: None
+    """
 
     print(f"EXECUTION STARTED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
-    Raw_Data = Get_Data_From_Directories(Folder_Name= FOLDER)
 
-    LongLati_Dict = Extract_Longitude_Latitude_Values(Dict_Data= Raw_Data)
-    Transformed_Data = Transform_Data_With_New_Headers(Dict_Data = Raw_Data)
-    Validated_Rows_Data = Validate_Rows(Transform_Data = Transformed_Data)
-    Validated_RowsColumns_Data = Validate_Columns(Transform_Data = Validated_Rows_Data)
-    Pressure_Converted_Data = Pressure_Conversion(Transform_Data = Validated_RowsColumns_Data)
-    ALPHA_Values_Dict = Calculate_ALPHA_Value(Transform_Data = Pressure_Converted_Data)
-    Finalized_Data = WindSpeed50M_Conversion(Transform_Data = Pressure_Converted_Data, Alpha_Values = ALPHA_Values_Dict)
+    Prepare_Files(Manifest = Load_Manifest() if Incremental else None, Workers = Workers, Hub_Heights = Hub_Heights)
+    Print_Memory_Report()
 
-    Export_CSV_SRW_LOGS_Files(Final_Data = Finalized_Data, Alpha_Values = ALPHA_Values_Dict, LongLati_Values = LongLati_Dict)
+    Export_Trace('data_preprocessing')
     print(f"EXECUTION ENDED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
 
 if __name__ == '__main__':
-    Main()
\ No newline at end of file
+    Parser = argparse.ArgumentParser(description="Prepare the CSV and SRW Data Sets of every City in FOLDER")
+    Parser.add_argument('--hub-heights', type=int, nargs='+', metavar='Z',
+                        help="The values of 'Z' to prepare in one run, e.g. --hub-heights 80 100 120 140. Asked when not given")
+    Parser.add_argument('--workers', type=int, help=f"The number of processes (default: {WORKERS})")
+    Parser.add_argument('--folder', help=f"The MAIN FOLDER of the Cities (default: {FOLDER})")
+    Parser.add_argument('--format', choices=['CSV', 'PARQUET', 'ARROW'], help=f"The format of the Prepared Data Sets (default: {FILE_FORMAT})")
+    Parser.add_argument('--streaming', action='store_true', help=f"Prepare one File at a time, read in blocks of {STREAM_CHUNK_ROWS} rows, with bounded memory")
+    Parser.add_argument('--shear-mode', choices=SHEAR_MODES, help=f"The ALPHA of the Wind speed conversion, one per File, per hour or per month and hour of the day (default: {SHEAR_MODE})")
+    Parser.add_argument('--incremental', action='store_true', help="Only prepare the Files changed since the last run, recorded in the Manifest (see manifest.py)")
+    Parser.add_argument('--trace', action='store_true', help="Export the timing, CPU, memory, rows and bytes of every stage and File (see instrumentation.py)")
+    Parser.add_argument('--config', help="A JSON file of Constants of this script, e.g. {\"Z\": 80, \"FOLDER\": \"Input\"}, the arguments take precedence")
+    Arguments = Parser.parse_args()
+    if Arguments.trace:
+        Enable_Trace()
+    Configure(Load_Settings(Arguments.config, WORKERS = Arguments.workers, FOLDER = Arguments.folder, FILE_FORMAT = Arguments.format,
+                            STREAMING = True if Arguments.streaming else None, SHEAR_MODE = Arguments.shear_mode, INCREMENTAL = True if Arguments.incremental else None))
+
+    if Arguments.hub_heights is None and Z is None:
+        Z = int(input("Enter the value of 'Z': ")) # Asked here, so the worker processes of Main_Parallel() can import this module
+    Main(Workers = WORKERS, Incremental = INCREMENTAL, Hub_Heights = Arguments.hub_heights)
@@ -0,0 +1,414 @@
+import os
+import pandas as pd
+import numpy as np
+import time
+import argparse
+from aggregation import HOURS_PER_YEAR, MONTHS, Calendar_Index
+from air_density import R_DRY_AIR, Air_Density
+from pipeline import Run_Stage, Print_Memory_Report, Load_Settings, Apply_Settings
+from columnar_io import Check_Columnar_Support, Columnar_File_Name, Columnar_File_Bytes, Read_Columnar_File
+from background_writer import Submit_Write, Flush_Writes
+from instrumentation import Enable_Trace, Export_Trace
+from manifest import Load_Manifest, Save_Manifest, Is_Up_To_Date, Record_Build, Remove_Stale_Records
+
+#Constants and Global Variables
+TIME_FORMAT_COMPLETE = '%d %B,%Y %I:%M:%S %p'
+TIME_FORMAT = '%I:%M:%S %p'
+FOLDER = 'FinalYearProject(FYP)Data'
+FILE_FORMAT = 'CSV' # Format of the Prepared Data Sets read and of the tables written: 'CSV', 'PARQUET' or 'ARROW'
+HUB_HEIGHT = None # The Hub Height 'Z' to use after a sweep of data_preprocessing (its '{Z}m' sub-folders), None for a single Hub Height
+PREPARED_COLUMNS = ['T2M', 'PS', 'WD50M', 'WS50M'] # Columns of the Prepared Data Sets, the CSV files have no header
+REQUIRED_COLUMNS = ['T2M', 'PS', 'WS50M'] # Temperature (°C) and Pressure (atm) for the Air density, Wind Speed at the Hub Height (m/s)
+STREAMING = False # Compute one City at a time, with bounded memory, instead of all the Cities together
+INCREMENTAL = False # Only compute the Cities whose Prepared Data Sets or outputs changed since the last run (see manifest.py)
+RHO_0 = 1.225 # Standard Air density (kg/m3) of the Power Curves
+CURVE_STEP = 0.01 # Wind speed step (m/s) of the Power Curve table every Turbine is interpolated on
+CURVE_MAX_SPEED = 40 # Highest Wind speed (m/s) of the Power Curve table, faster winds give the power at this speed
+WIND_FARM_TURBINES = 1 # Number of Turbines of the Wind farm, the Production is multiplied by it
+CITIES_PER_BATCH = 8 # Cities computed together, the power array holds Turbines x Cities x Years x 8760 values
+TURBINE_CURVES_FILE = None # CSV file of manufacturer Power Curves added to TURBINES, see Load_Turbine_Curves(), None for the TURBINES only
+TURBINES = { # Turbine Model -> Rated Power (kW), Cut-in, Rated and Cut-out Wind speeds (m/s). A 'Curve': ([Speeds], [Powers kW])
+             # replaces the generic cubic curve, e.g. with the table of the manufacturer from TURBINE_CURVES_FILE
+    'Generic_2.0MW': {'Rated_Power': 2000, 'Cut_In': 3.0, 'Rated_Speed': 12.0, 'Cut_Out': 25.0},
+    'Generic_2.5MW': {'Rated_Power': 2500, 'Cut_In': 3.0, 'Rated_Speed': 12.5, 'Cut_Out': 25.0},
+    'Generic_3.0MW': {'Rated_Power': 3000, 'Cut_In': 3.0, 'Rated_Speed': 13.0, 'Cut_Out': 25.0},
+    'Generic_4.2MW': {'Rated_Power': 4200, 'Cut_In': 3.0, 'Rated_Speed': 13.5, 'Cut_Out': 25.0},
+}
+
+def Load_Turbine_Curves(File_Path):
+    """
+    Load manufacturer Power Curves from a CSV file with the columns 'Model', 'Speed' (m/s) and 'Power' (kW)
+    :param File_Path: (string) The path of the CSV file
+    :return: (dict) Turbine Model -> {'Rated_Power', 'Curve'}, to update TURBINES with
+    """
+
+    Curves = pd.read_csv(File_Path, sep=',', engine='c')
+    return {Model: {'Rated_Power': float(Curve['Power'].max()), 'Curve': (Curve['Speed'].tolist(), Curve['Power'].tolist())}
+            for Model, Curve in Curves.sort_values(['Model', 'Speed']).groupby('Model', sort=False)}
+
+def Power_Curve_Table(Turbines):
+    """
+    Tabulate the Power Curve of every Turbine on the same Wind speed grid, so all the Turbines are
+    interpolated with the same index
+    :param Turbines: (dict) The Turbine Models, as TURBINES
+    :return: (array) The power (kW) of shape (Turbines, Speeds), the Speeds are 0 to CURVE_MAX_SPEED by CURVE_STEP
+    """
+
+    Speeds = np.arange(0, CURVE_MAX_SPEED + CURVE_STEP / 2, CURVE_STEP)
+    Table = np.zeros((len(Turbines), len(Speeds)))
+
+    for Index, Turbine in enumerate(Turbines.values()):
+        if 'Curve' in Turbine:
+            Table[Index] = np.interp(Speeds, *Turbine['Curve'], left=0, right=0)
+        else:
+            Cut_In, Rated_Speed = Turbine['Cut_In'], Turbine['Rated_Speed']
+            Rising = (Speeds**3 - Cut_In**3)/(Rated_Speed**3 - Cut_In**3) # Cubic rise from the Cut-in to the Rated Wind speed
+            Table[Index] = Turbine['Rated_Power'] * np.clip(Rising, 0, 1)
+            Table[Index, (Speeds < Cut_In) | (Speeds > Turbine['Cut_Out'])] = 0
+
+    return Table
+
+def Get_Hub_Height_Data(Folder_Name, Cities = None, Dict_Data = None):
+    """
+    Load the REQUIRED_COLUMNS of the Prepared Data Sets of every City and Year into one array of shape
+    (City, Year, 8760, Variable). A City without the File of a Year has NaN in that slot
+    :param Folder_Name: (string) The name of MAIN FOLDER where all the data exist
+    :param Cities: (list) Only read the Files of these Cities, None reads all of them
+    :param Dict_Data: (dict) Prepared Data Sets already in memory -> {City: {File: DataFrame}}, e.g. from
+                      data_preprocessing.Prepare_Files(), these Files are taken from it instead of being read
+    :return: (dict) The Stacked Data -> 'Values': the array, 'Cities': the City names, 'Years': the Years,
+             'Files': {(City index, Year index): File name} of the filled slots
+    """
+
+    print("*" * 100)
+    print(f"Function: Get_Hub_Height_Data() Started -> {time.strftime(TIME_FORMAT)}")
+
+    try:
+        if FILE_FORMAT != 'CSV':
+            Check_Columnar_Support(FILE_FORMAT)
+
+        Cities = sorted(os.listdir(Folder_Name)) if Cities is None else list(Cities) #Get all the cities name in the MAIN FOLDER
+        Files = {City: sorted(os.listdir(Prepared_Data_Path(City))) for City in Cities}
+        File_Years = {(City, File): int(File.split('(')[-1].split(")")[0].strip()) for City in Cities for File in Files[City]} # Extract the Year within the File Name
+        Years = sorted(set(File_Years.values()))
+
+        In_Memory = {(City, File if FILE_FORMAT == 'CSV' else Columnar_File_Name(File, FILE_FORMAT)): df
+                     for City, Files_Data in (Dict_Data or {}).items() for File, df in Files_Data.items()}
+
+        Values = np.full((len(Cities), len(Years), HOURS_PER_YEAR, len(REQUIRED_COLUMNS)), np.nan)
+        Slots = {}
+        for (City, File), Year in File_Years.items():
+            if (City, File) in In_Memory: # The same values as the exported File
+                df = In_Memory[(City, File)]
+            elif FILE_FORMAT == 'CSV':
+                df = pd.read_csv(Prepared_Data_Path(City) + File, sep=',', engine='c', header=None, names=PREPARED_COLUMNS, usecols=REQUIRED_COLUMNS)
+            else:
+                df = Read_Columnar_File(Prepared_Data_Path(City) + File, Columns=REQUIRED_COLUMNS)
+
+            if len(df) != HOURS_PER_YEAR:
+                raise ValueError(f"File: '{File}' of {City} contains {len(df)} rows instead of {HOURS_PER_YEAR}")
+            Slot = (Cities.index(City), Years.index(Year))
+            Values[Slot] = df[REQUIRED_COLUMNS].to_numpy(dtype=float)
+            Slots[Slot] = File
+
+        print(f"Function: Get_Hub_Height_Data() {len(Slots)} Files Stacked in an array of shape {Values.shape}")
+        print(f"Function: Get_Hub_Height_Data() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+        print("*" * 100)
+        return {'Values': Values, 'Cities': Cities, 'Years': Years, 'Files': Slots}
+
+    except Exception as error:
+        print(f"Function: Get_Hub_Height_Data() Ended with ERROR: '{error}'")
+        print("*" * 100)
+        return None
+
+def Calculate_Production(Stacked_Data, Turbines = None):
+    """
+    Calculate the hourly power of every Turbine at every City and Year in a single broadcast operation, with the
+    Wind speed at the Hub Height normalized to the standard Air density (IEC 61400-12-1) before the Power Curve:
+    U_norm = U * (rho / RHO_0)^(1/3), rho = P / (R_DRY_AIR * T). The hours are summed by month
+    :param Stacked_Data: (dict) The Stacked Data from the Get_Hub_Height_Data() function
+    :param Turbines: (dict) The Turbine Models, None uses TURBINES
+    :return: (dict) The Stacked Data with 'Turbines': the Models, 'Production': the monthly Production (GWh) and
+             'Capacity_Factor': the monthly Capacity Factor (%) of shape (Turbine, City, Year, 12),
+             'Annual_Production' and 'Annual_Capacity_Factor' of shape (Turbine, City, Year)
+    """
+
+    print(f"Function: Calculate_Production() Started -> {time.strftime(TIME_FORMAT)}")
+    Turbines = TURBINES if Turbines is None else Turbines
+
+    try:
+        if Stacked_Data is not None and len(Stacked_Data['Files']) > 0:
+
+            Table = Power_Curve_Table(Turbines)
+            Rated_Power = np.array([Turbine['Rated_Power'] for Turbine in Turbines.values()], dtype=float)
+            Starts = Calendar_Index('MONTH')['Starts']
+            Month_Hours = np.diff(np.append(Starts, HOURS_PER_YEAR))
+
+            Values = Stacked_Data['Values']
+            Energy = np.full((len(Turbines),) + Values.shape[:2] + (len(MONTHS),), np.nan) # Monthly energy (kWh)
+            for Batch in range(0, Values.shape[0], CITIES_PER_BATCH):
+                Temperature, Pressure, Wind_Speed = np.moveaxis(Values[Batch:Batch + CITIES_PER_BATCH], -1, 0)
+
+                Rho = Air_Density(Temperature, Pressure, R_DRY_AIR) # Air density (kg/m3) from T2M (°C) and PS (atm)
+                Position = np.clip(Wind_Speed * (Rho/RHO_0)**(1/3) / CURVE_STEP, 0, Table.shape[1] - 1)
+                Empty = np.isnan(Position) # The slots of the missing Files
+                Position[Empty] = 0
+
+                #Linear interpolation of all the Turbines at once, the index is shared by every Turbine
+                Index = np.minimum(Position.astype(int), Table.shape[1] - 2)
+                Fraction = Position - Index
+                Power = Table[:, Index] * (1 - Fraction) + Table[:, Index + 1] * Fraction # (Turbine, City, Year, 8760) in kW
+                Power[:, Empty] = np.nan
+
+                Energy[:, Batch:Batch + CITIES_PER_BATCH] = np.add.reduceat(Power, Starts, axis=-1) # 1 hour steps, kW -> kWh
+
+            Production = Energy * WIND_FARM_TURBINES / 1e6 # kWh -> GWh
+            Capacity_Factor = Energy / (Rated_Power[:, np.newaxis, np.newaxis, np.newaxis] * Month_Hours) * 100
+
+            print(f"Function: Calculate_Production() {len(Turbines)} Turbines computed for {len(Stacked_Data['Files'])} Files")
+            print(f"Function: Calculate_Production() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+            print("*" * 100)
+            return {**Stacked_Data, 'Turbines': list(Turbines), 'Production': Production, 'Capacity_Factor': Capacity_Factor,
+                    'Annual_Production': Production.sum(axis=-1),
+                    'Annual_Capacity_Factor': Energy.sum(axis=-1) / (Rated_Power[:, np.newaxis, np.newaxis] * HOURS_PER_YEAR) * 100}
+
+        else:
+            print("Function: Calculate_Production() Ended -> 'Data is not Stacked from Get_Hub_Height_Data() function' Kindly check")
+            print("*" * 100)
+            return None
+
+    except Exception as error:
+        print(f"Function: Calculate_Production() Ended with ERROR: '{error}'")
+        print("*" * 100)
+        return None
+
+def Export_Production_Tables(Production_Data):
+    """
+    The function Export_Production_Tables() exports, for every City and Turbine Model, the monthly Production and
+    Capacity Factor tables in the '{Model}' folder of the Summarized Data, named and shaped as the input tables of
+    statistical_analysis ('{City}_Production.csv' and '{City}_Capacity_Factor.csv'). The Annual values of all the
+    Turbines are compared in the 'Turbine_Screening_{City}.csv' table
+    :param Production_Data: (dict) The Production from the Calculate_Production() function
+    :return: None
+    """
+
+    print(f"Function: Export_Production_Tables() Started -> {time.strftime(TIME_FORMAT)}")
+    try:
+        if Production_Data is not None and len(Production_Data['Files']) > 0:
+            Years = Production_Data['Years']
+            for City_Index, City in enumerate(Production_Data['Cities']):
+                Year_Indexes = sorted(Year_Index for (Slot_City, Year_Index) in Production_Data['Files'] if Slot_City == City_Index)
+                if len(Year_Indexes) == 0:
+                    continue
+
+                Screening = []
+                for Turbine_Index, Model in enumerate(Production_Data['Turbines']):
+                    os.makedirs(Summary_Data_Path(City) + f"{Model}/", exist_ok=True)  # Create the Turbine directory, if not exist
+
+                    for Table, Unit in [('Production', 'GWh'), ('Capacity_Factor', '%')]:
+                        Monthly = Production_Data[Table][Turbine_Index, City_Index, Year_Indexes]
+                        df = pd.DataFrame(Monthly, columns=[f"{Month} {Unit}" for Month in MONTHS])
+                        df.insert(0, 'YEAR', [Years[Year_Index] for Year_Index in Year_Indexes])
+                        df[f"Annual {Unit}"] = Production_Data[f"Annual_{Table}"][Turbine_Index, City_Index, Year_Indexes]
+                        Write_Table(df, Summary_Data_Path(City) + f"{Model}/", f"{City}_{Table}.csv")
+
+                    Screening += [[Model, Years[Year_Index], Production_Data['Annual_Production'][Turbine_Index, City_Index, Year_Index],
+                                   Production_Data['Annual_Capacity_Factor'][Turbine_Index, City_Index, Year_Index]] for Year_Index in Year_Indexes]
+
+                Write_Table(pd.DataFrame(Screening, columns=['MODEL', 'YEAR', 'Annual GWh', 'Annual %']), Summary_Data_Path(City), f"Turbine_Screening_{City}.csv")
+                print(f"City: {City} Production of {len(Production_Data['Turbines'])} Turbines Exported")
+
+            print(f"Function: Export_Production_Tables() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+            print("*" * 100)
+
+        else:
+            print("Function: Export_Production_Tables() Ended -> 'Production is not Calculated from Calculate_Production() function' Kindly check")
+            print("*" * 100)
+
+    except Exception as error:
+        print(f"Function: Export_Production_Tables() Ended with ERROR: '{error}'")
+        print("*" * 100)
+
+def Write_Table(df, Final_path, File):
+    """
+    Write a table in the FILE_FORMAT, with the background writer
+    :param df: (DataFrame) The table
+    :param Final_path: (string) The directory of the table
+    :param File: (string) The CSV File name of the table, its extension is replaced for a columnar FILE_FORMAT
+    :return: None
+    """
+
+    if FILE_FORMAT == 'CSV':
+        Submit_Write(Final_path + File, df.to_csv(index=False).encode('utf-8')) # The bytes of DataFrame.to_csv() to the file
+    else:
+        Submit_Write(Final_path + Columnar_File_Name(File, FILE_FORMAT), Columnar_File_Bytes(df, FILE_FORMAT))
+
+def Height_Folder():
+    """
+    :return: (string) The '{HUB_HEIGHT}m/' sub-folder of the Prepared Data Sets and Summarized Data, empty for a single Hub Height
+    """
+
+    return "" if HUB_HEIGHT is None else f"{HUB_HEIGHT}m/"
+
+def Prepared_Data_Path(City):
+    """
+    :param City: (string) The City name
+    :return: (string) The FILE_FORMAT folder of the Prepared Data Sets of the City
+    """
+
+    return f"{FOLDER}/{City}/Prepared Data Sets/" + Height_Folder() + f"{FILE_FORMAT}/"
+
+def Summary_Data_Path(City):
+    """
+    :param City: (string) The City name
+    :return: (string) The Summarized Data folder of the City
+    """
+
+    return f"{FOLDER}/{City}/Summarized Data/" + Height_Folder()
+
+def Production_File_Paths(City):
+    """
+    :param City: (string) The City name
+    :return: (list) The paths of all the tables exported for the City
+    """
+
+    Files = [f"{Model}/{City}_{Table}.csv" for Model in TURBINES for Table in ['Production', 'Capacity_Factor']] + [f"Turbine_Screening_{City}.csv"]
+    return [Summary_Data_Path(City) + (File if FILE_FORMAT == 'CSV' else Columnar_File_Name(File, FILE_FORMAT)) for File in Files]
+
+def Production_Parameters():
+    """
+    :return: (dict) The parameters the tables are built with, recorded in the Manifest
+    """
+
+    return {'FILE_FORMAT': FILE_FORMAT, 'RHO_0': RHO_0, 'CURVE_STEP': CURVE_STEP, 'WIND_FARM_TURBINES': WIND_FARM_TURBINES,
+            'TURBINES': {Model: {Key: list(map(list, Value)) if Key == 'Curve' else Value for Key, Value in Turbine.items()}
+                         for Model, Turbine in TURBINES.items()}}
+
+def Record_Key(City):
+    """
+    :param City: (string) The City name
+    :return: (string) The Key of the City in the 'energy_production' Section of the Manifest
+    """
+
+    return City if HUB_HEIGHT is None else f"{City}/{HUB_HEIGHT}m"
+
+def Prepared_Input_Paths(City):
+    """
+    :param City: (string) The City name
+    :return: (list) The paths of the Prepared Data Sets of the City
+    """
+
+    return [Prepared_Data_Path(City) + File for File in sorted(os.listdir(Prepared_Data_Path(City)))]
+
+def Select_Cities_To_Compute(Folder_Name, Manifest):
+    """
+    Find the Cities to compute. With a Manifest, a City is skipped when the content of all its Prepared Data Sets,
+    the Turbines and its tables are unchanged since the last run
+    :param Folder_Name: (string) The name of MAIN FOLDER where all the data exist
+    :param Manifest: (dict) The Manifest from Load_Manifest(), None computes every City
+    :return: (list) The Cities to compute
+    """
+
+    Cities = sorted(os.listdir(Folder_Name))
+    if Manifest is None:
+        return Cities
+
+    # The Records of the other Hub Heights are kept as long as their City exists
+    Remove_Stale_Records(Manifest, 'energy_production', [Key for Key in Manifest.get('energy_production', {}) if Key.split('/')[0] in Cities])
+    Selected_Cities = []
+    for City in Cities:
+        try:
+            if Is_Up_To_Date(Manifest, 'energy_production', Record_Key(City), Prepared_Input_Paths(City), Production_Parameters()):
+                continue
+        except FileNotFoundError: # No Prepared Data Sets, Get_Hub_Height_Data() reports it
+            pass
+        Selected_Cities.append(City)
+
+    print(f"Cities to compute: {len(Selected_Cities)}, Cities unchanged since the last run: {len(Cities) - len(Selected_Cities)}")
+    return Selected_Cities
+
+def Record_Computed_Cities(Manifest, Cities):
+    """
+    Record the computed Cities in the Manifest, a City is only recorded if all of its tables were written
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Cities: (list) The Cities that were computed
+    :return: None
+    """
+
+    for City in Cities:
+        try:
+            Record_Build(Manifest, 'energy_production', Record_Key(City), Prepared_Input_Paths(City), Production_Parameters(), Production_File_Paths(City))
+        except FileNotFoundError: # No Prepared Data Sets, the City was not computed
+            pass
+
+    Save_Manifest(Manifest)
+
+def Configure(Settings):
+    """
+    Override the Constants of this script, e.g. from the command line or a config file. The Power Curves of the
+    TURBINE_CURVES_FILE are added to TURBINES, a Model already in TURBINES is replaced by its curve
+    :param Settings: (dict) Constant name -> Value, see pipeline.Load_Settings()
+    :return: None
+    """
+
+    global TURBINES
+
+    Apply_Settings(globals(), Settings)
+    if TURBINE_CURVES_FILE is not None:
+        TURBINES = {**TURBINES, **Load_Turbine_Curves(TURBINE_CURVES_FILE)}
+
+def Compute_Cities(Manifest = None, Prepared_Data = None):
+    """
+    Compute the Production of the Cities whose Prepared Data Sets changed since the last run recorded in the Manifest,
+    or of every City without a Manifest, and record them in the Manifest
+    :param Manifest: (dict) The Manifest from Load_Manifest(), None computes every City
+    :param Prepared_Data: (dict) Prepared Data Sets already in memory -> {City: {File: DataFrame}}, they are not read again
+    :return: (list) The Cities computed
+    """
+
+    Cities = Select_Cities_To_Compute(Folder_Name = FOLDER, Manifest = Manifest)
+
+    if len(Cities) == 0:
+        print("All the Production tables are up to date, there is no City to compute")
+
+    else:
+        for Batch in ([[City] for City in Cities] if STREAMING else [Cities]): # Only the Data of one City is held in the STREAMING mode
+            Stacked_Data = Run_Stage(Get_Hub_Height_Data, Folder_Name = FOLDER, Cities = Batch, Dict_Data = Prepared_Data)
+            Production_Data = Run_Stage(Calculate_Production, Stacked_Data = Stacked_Data)
+            del Stacked_Data
+
+            Run_Stage(Export_Production_Tables, Production_Data = Production_Data)
+            del Production_Data
+
+        Flush_Writes() # The tables are complete before they are recorded or published
+        if Manifest is not None:
+            Record_Computed_Cities(Manifest, Cities)
+
+    return Cities
+
+def Main(Incremental = INCREMENTAL):
+
+    print(f"EXECUTION STARTED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
+
+    Compute_Cities(Manifest = Load_Manifest() if Incremental else None)
+    Print_Memory_Report()
+
+    Export_Trace('energy_production')
+    print(f"EXECUTION ENDED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
+
+if __name__ == '__main__':
+    Parser = argparse.ArgumentParser(description="Compute the Production and Capacity Factor tables of every City in FOLDER")
+    Parser.add_argument('--folder', help=f"The MAIN FOLDER of the Cities (default: {FOLDER})")
+    Parser.add_argument('--format', choices=['CSV', 'PARQUET', 'ARROW'], help=f"The format of the Prepared Data Sets and of the tables (default: {FILE_FORMAT})")
+    Parser.add_argument('--hub-height', type=int, metavar='Z', help="The Hub Height to use after a sweep of data_preprocessing (its '{Z}m' sub-folders)")
+    Parser.add_argument('--turbine-curves', metavar='CSV', help="A CSV file of manufacturer Power Curves with the columns 'Model', 'Speed' (m/s) and 'Power' (kW), added to the Turbines")
+    Parser.add_argument('--streaming', action='store_true', help="Compute one City at a time, with bounded memory")
+    Parser.add_argument('--incremental', action='store_true', help="Only compute the Cities changed since the last run, recorded in the Manifest (see manifest.py)")
+    Parser.add_argument('--trace', action='store_true', help="Export the timing, CPU, memory, rows and bytes of every stage (see instrumentation.py)")
+    Parser.add_argument('--config', help="A JSON file of Constants of this script, e.g. {\"FOLDER\": \"Input\"}, the arguments take precedence")
+    Arguments = Parser.parse_args()
+    if Arguments.trace:
+        Enable_Trace()
+    Configure(Load_Settings(Arguments.config, FOLDER = Arguments.folder, FILE_FORMAT = Arguments.format, HUB_HEIGHT = Arguments.hub_height,
+                            TURBINE_CURVES_FILE = Arguments.turbine_curves, STREAMING = True if Arguments.streaming else None, INCREMENTAL = True if Arguments.incremental else None))
+    Main(Incremental = INCREMENTAL)
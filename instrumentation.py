@@ -0,0 +1,128 @@
+import os
+import json
+import time
+import sys
+import threading
+
+try:
+    import resource # Peak RSS of the process, not available on Windows
+except ImportError:
+    resource = None
+
+#Constants and Global Variables
+TRACE_VARIABLE = 'PIPELINE_TRACE' # Environment variable enabling the Trace, inherited by the worker processes
+TRACE = os.environ.get(TRACE_VARIABLE) == '1' # Record the Spans of every stage and City/File, see Enable_Trace()
+TRACE_FILE = '{NAME}_trace.json' # Every Span with its counters, NAME is the script name
+CHROME_TRACE_FILE = '{NAME}_trace.chrome.json' # The Spans in the Chrome trace format, opened in chrome://tracing or Perfetto
+Trace_Records = []
+
+def Enable_Trace():
+    """
+    Enable the Trace in this process and in the worker processes started after it
+    :return: None
+    """
+
+    global TRACE
+    TRACE = True
+    os.environ[TRACE_VARIABLE] = '1'
+
+def Peak_RSS_MB():
+    """
+    :return: (float) The peak Resident Set Size of the process so far (MB), None where it is not available
+    """
+
+    if resource is None:
+        return None
+
+    Peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return Peak / 2**20 if sys.platform == 'darwin' else Peak / 2**10 # Bytes on macOS, KB on Linux
+
+def Start_Span(Name, Category = 'stage', **Arguments):
+    """
+    Start timing a stage, or the work on one City/File. When the Trace is disabled nothing is measured
+    :param Name: (string) The name of the Span, e.g. the stage function name
+    :param Category: (string) 'stage', 'city' or 'file'
+    :param Arguments: The values kept with the Span, e.g. City='Gharo', File='2019.csv'
+    :return: (dict) The Span to give to Count() and End_Span(), None when the Trace is disabled
+    """
+
+    if not TRACE:
+        return None
+
+    return {'Name': Name, 'Category': Category, 'Arguments': Arguments, 'Process': os.getpid(), 'Thread': threading.get_ident(),
+            'Start': time.time(), 'Wall Start': time.perf_counter(), 'CPU Start': time.process_time(),
+            'Rows': 0, 'Bytes Read': 0, 'Bytes Written': 0}
+
+def Count(Span, Rows = 0, Read_Files = (), Written_Files = (), Written_Bytes = 0):
+    """
+    Add the rows processed and the sizes of the files read and written to a Span
+    :param Span: (dict) The Span from Start_Span(), None does nothing
+    :param Rows: (int) The number of rows processed
+    :param Read_Files: (iterable) The paths of the files read
+    :param Written_Files: (iterable) The paths of the files written
+    :param Written_Bytes: (int) The bytes submitted to the background writer, whose files may not be written yet
+    :return: None
+    """
+
+    if Span is None:
+        return
+
+    Span['Rows'] += int(Rows)
+    Span['Bytes Read'] += sum(os.path.getsize(File_Path) for File_Path in Read_Files if os.path.exists(File_Path))
+    Span['Bytes Written'] += sum(os.path.getsize(File_Path) for File_Path in Written_Files if os.path.exists(File_Path)) + int(Written_Bytes)
+
+def End_Span(Span):
+    """
+    Record the wall time, CPU time (of the whole process) and peak RSS of a Span
+    :param Span: (dict) The Span from Start_Span(), None does nothing
+    :return: None
+    """
+
+    if Span is None:
+        return
+
+    Trace_Records.append({
+        'Name': Span['Name'], 'Category': Span['Category'], **Span['Arguments'],
+        'Process': Span['Process'], 'Thread': Span['Thread'], 'Start': Span['Start'],
+        'Wall s': time.perf_counter() - Span['Wall Start'],
+        'CPU s': time.process_time() - Span['CPU Start'],
+        'Peak RSS MB': Peak_RSS_MB(),
+        'Rows': Span['Rows'], 'Bytes Read': Span['Bytes Read'], 'Bytes Written': Span['Bytes Written']
+    })
+
+def Collect_Trace_Records():
+    """
+    Take the Records of this process, e.g. to return them from a worker process to the main process
+    :return: (list) The Records, the Trace of this process is cleared
+    """
+
+    Records = list(Trace_Records)
+    Trace_Records.clear()
+    return Records
+
+def Export_Trace(Name):
+    """
+    Export the Records as JSON and as a Chrome trace, then clear them. When the Trace is disabled nothing is written
+    :param Name: (string) The name of the script, the files are TRACE_FILE and CHROME_TRACE_FILE
+    :return: None
+    """
+
+    if not TRACE or len(Trace_Records) == 0:
+        return
+
+    Trace_File, Chrome_Trace_File = TRACE_FILE.format(NAME = Name), CHROME_TRACE_FILE.format(NAME = Name)
+    Records = Collect_Trace_Records()
+    with open(Trace_File, 'w') as File:
+        json.dump(Records, File, indent=1)
+
+    Base = min(Record['Start'] for Record in Records)
+    Events = [{'name': Record['Name'], 'cat': Record['Category'], 'ph': 'X',
+               'ts': (Record['Start'] - Base) * 1e6, 'dur': Record['Wall s'] * 1e6,
+               'pid': Record['Process'], 'tid': Record['Thread'],
+               'args': {Key: Value for Key, Value in Record.items() if Key not in ('Name', 'Category', 'Process', 'Thread', 'Start')}}
+              for Record in Records]
+
+    with open(Chrome_Trace_File, 'w') as File:
+        json.dump({'traceEvents': Events, 'displayTimeUnit': 'ms'}, File)
+
+    print(f"Trace exported -> {Trace_File}, {Chrome_Trace_File} ({len(Records)} Spans)")
@@ -0,0 +1,137 @@
+import os
+import json
+import hashlib
+import threading
+from background_writer import Write_Failed
+
+#Constants and Global Variables
+MANIFEST_FILE = 'pipeline_manifest.json' # Kept in the working directory, outside the data FOLDERS listed as Cities
+HASH_BLOCK_SIZE = 1024 * 1024
+Manifest_Lock = threading.RLock() # A Manifest can be shared by the stages running in threads, see pipeline.Run_Graph()
+
+def Load_Manifest(Manifest_File = MANIFEST_FILE):
+    """
+    Load the Manifest of the previous runs, it records for each output the content hashes of its inputs and
+    outputs and the parameters it was built with
+    :param Manifest_File: (string) The path of the Manifest file
+    :return: (dict) The Manifest, empty if there was no previous run
+    """
+
+    try:
+        with open(Manifest_File, 'r') as File:
+            return json.load(File)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'Hashes': {}}
+
+def Save_Manifest(Manifest, Manifest_File = MANIFEST_FILE):
+    """
+    Save the Manifest, written to a temporary file first so an interrupted run never leaves a broken Manifest
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Manifest_File: (string) The path of the Manifest file
+    :return: None
+    """
+
+    with Manifest_Lock:
+        with open(Manifest_File + '.tmp', 'w') as File:
+            json.dump(Manifest, File, indent=1)
+        os.replace(Manifest_File + '.tmp', Manifest_File)
+
+def File_Hash(Manifest, File_Path):
+    """
+    Get the SHA-256 content hash of a File. The hash is cached in the Manifest with the size and modification time
+    of the File, so an unchanged File is not read again
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param File_Path: (string) The path of the File
+    :return: (string) The hex digest of the File content
+    """
+
+    Stat = os.stat(File_Path)
+    Cached = Manifest.setdefault('Hashes', {}).get(File_Path)
+    if Cached is not None and Cached['Size'] == Stat.st_size and Cached['Modified'] == Stat.st_mtime_ns:
+        return Cached['Hash']
+
+    Hash = hashlib.sha256()
+    with open(File_Path, 'rb') as File:
+        for Block in iter(lambda: File.read(HASH_BLOCK_SIZE), b''):
+            Hash.update(Block)
+
+    with Manifest_Lock:
+        Manifest['Hashes'][File_Path] = {'Size': Stat.st_size, 'Modified': Stat.st_mtime_ns, 'Hash': Hash.hexdigest()}
+    return Hash.hexdigest()
+
+def Get_Record(Manifest, Section, Key):
+    """
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Section: (string) The name of the script that built the output, e.g. 'data_preprocessing'
+    :param Key: (string) The name of the build within the Section, e.g. 'City/File'
+    :return: (dict) The Record of the last build, None if it was never built
+    """
+
+    return Manifest.get(Section, {}).get(Key)
+
+def Is_Up_To_Date(Manifest, Section, Key, Inputs, Parameters):
+    """
+    Check if a build is current: it was recorded with the same Parameters, its Inputs have the same content,
+    and its Outputs still exist with the content they were written with
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Section: (string) The name of the script that builds the output
+    :param Key: (string) The name of the build within the Section
+    :param Inputs: (list) The paths of the input Files
+    :param Parameters: (dict) The parameters of the build, e.g. {'Z': 100, 'Zref': 50}
+    :return: (bool) True if the build can be skipped
+    """
+
+    Record = Get_Record(Manifest, Section, Key)
+    if Record is None or Record['Parameters'] != Parameters or sorted(Record['Inputs']) != sorted(Inputs):
+        return False
+
+    for File_Path, Hash in list(Record['Inputs'].items()) + list(Record['Outputs'].items()):
+        if not os.path.exists(File_Path) or File_Hash(Manifest, File_Path) != Hash:
+            return False
+
+    return True
+
+def Record_Build(Manifest, Section, Key, Inputs, Parameters, Outputs, **Extra):
+    """
+    Record a build in the Manifest, only if all of its Outputs were written, a file whose last write failed keeps the
+    content of a previous run (see background_writer.Write_File())
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Section: (string) The name of the script that built the output
+    :param Key: (string) The name of the build within the Section
+    :param Inputs: (list) The paths of the input Files
+    :param Parameters: (dict) The parameters of the build
+    :param Outputs: (list) The paths of the output Files
+    :param Extra: Any other JSON values kept with the Record, e.g. Log='...'
+    :return: (bool) True if the build is recorded
+    """
+
+    if not all(os.path.exists(File_Path) and not Write_Failed(File_Path) for File_Path in Outputs):
+        return False
+
+    Record = {
+        'Inputs': {File_Path: File_Hash(Manifest, File_Path) for File_Path in Inputs},
+        'Parameters': Parameters,
+        'Outputs': {File_Path: File_Hash(Manifest, File_Path) for File_Path in Outputs},
+        **Extra
+    }
+    with Manifest_Lock:
+        Manifest.setdefault(Section, {})[Key] = Record
+    return True
+
+def Remove_Stale_Records(Manifest, Section, Keys):
+    """
+    Remove the Records of the Section whose Key is not in Keys anymore, e.g. the input File was deleted
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Section: (string) The name of the script
+    :param Keys: (iterable) The Keys of the current builds
+    :return: (list) The removed Keys
+    """
+
+    Keys = set(Keys)
+    with Manifest_Lock:
+        Records = Manifest.get(Section, {})
+        Removed = [Key for Key in Records if Key not in Keys]
+        for Key in Removed:
+            Records.pop(Key)
+
+    return Removed
@@ -0,0 +1,220 @@
+import time
+import json
+import pandas as pd
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from instrumentation import Start_Span, End_Span, Peak_RSS_MB
+from background_writer import Flush_Writes
+
+#Constants and Global Variables
+TIME_FORMAT = '%I:%M:%S %p'
+TRACE_MEMORY = True # Record the peak RSS of the process after every stage run through Run_Stage(), read from resource without any allocation hook
+GRAPH_WORKERS = 4 # Threads of Run_Graph(), the stages whose inputs are ready run at the same time
+Memory_Report = []
+
+# Copy-on-Write lets the stages hand the same DataFrames from one dictionary to the next, a column is only
+# copied when a stage replaces it. It is always on from pandas 3, before that it is an option
+if int(pd.__version__.split('.')[0]) < 3:
+    try:
+        pd.set_option('mode.copy_on_write', True)
+    except Exception:
+        pass
+
+def Shallow_Copy(Dict_Data):
+    """
+    Copy only the City -> File dictionaries of the Multi-dimensional Dictionary, the DataFrames are shared.
+    A stage owns the dictionary it returns and never modifies the one it receives, with Copy-on-Write the shared
+    DataFrames are only copied column by column when a stage replaces a column
+    :param Dict_Data: (dict) The Multi-dimensional Dictionary of City -> File -> DataFrame
+    :return: (dict) A new Multi-dimensional Dictionary with the same DataFrames
+    """
+
+    return {City: dict(Files) for City, Files in Dict_Data.items()}
+
+def Worker_Context():
+    """
+    The start method of the worker process pools. A forked child would inherit the locks held at that moment by the
+    other threads, e.g. of the background writer, the Manifest or print(), and wait for them forever. The workers are
+    forked from a clean server process instead, or spawned where it is not available (Windows)
+    :return: The multiprocessing context to give to ProcessPoolExecutor(mp_context=...)
+    """
+
+    return multiprocessing.get_context('forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn')
+
+def Run_Stage(Stage, **Arguments):
+    """
+    Run a single stage of a pipeline and record the peak RSS of the process, when TRACE_MEMORY is enabled, and its
+    Span when the Trace of instrumentation.py is enabled. The peak RSS is only read, never reset, so the stages running
+    at the same time in Run_Graph() are recorded as well, each with the peak reached by the process when it ended.
+    The files the stage submitted to the background writer are complete when it returns, so the following stages can read them
+    :param Stage: (function) The stage function to run
+    :param Arguments: The keyword arguments of the stage function
+    :return: The value returned by the stage function
+    """
+
+    Span = Start_Span(Stage.__name__)
+    Peak_Before = Peak_RSS_MB() if TRACE_MEMORY else None
+    Result = Stage(**Arguments)
+    Flush_Writes()
+
+    if Peak_Before is not None: # None where resource is not available, e.g. on Windows
+        Peak_After = Peak_RSS_MB()
+        Memory_Report.append({
+            'Stage': Stage.__name__,
+            'Peak RSS MB': Peak_After, # The peak of the process so far, including the data of previous stages
+            'Stage Increase MB': Peak_After - Peak_Before # How much the stage, or a stage running with it, raised the peak
+        })
+    End_Span(Span)
+    return Result
+
+def Graph_Dependencies(Graph, Node):
+    """
+    :param Graph: (dict) The graph of Run_Graph()
+    :param Node: (string) A Node of the graph
+    :return: (list) The Nodes whose value is an input of the Node, then the Nodes it only runs after
+    """
+
+    return list(Graph[Node].get('Inputs', {}).values()) + list(Graph[Node].get('After', []))
+
+def Plan_Graph(Graph, Targets):
+    """
+    Find the Nodes to run and the Nodes to load to get the Targets. A Node is changed when its 'Current' check fails
+    or one of its dependencies is changed, the Current checks are made from the sources to the Targets and only once.
+    A changed Node is run. A Node that is not changed is loaded when it has a 'Current' check (its outputs are up to
+    date), otherwise it is run as it only computes a value from the up to date files
+    :param Graph: (dict) The graph of Run_Graph()
+    :param Targets: (list) The Nodes whose value is wanted
+    :return: (tuple) (Nodes to run, Nodes to load) in the order of the Graph
+    """
+
+    Changed = {}
+    def Is_Changed(Node):
+        if Node not in Changed:
+            Changed[Node] = any([Is_Changed(Dependency) for Dependency in Graph_Dependencies(Graph, Node)]) or \
+                            ('Current' in Graph[Node] and not Graph[Node]['Current']())
+        return Changed[Node]
+
+    Run, Load = set(), set()
+    def Plan(Node):
+        if Node in Run or Node in Load:
+            return
+        if Is_Changed(Node) or 'Current' not in Graph[Node]:
+            Run.add(Node)
+            for Dependency in Graph[Node].get('Inputs', {}).values():
+                Plan(Dependency)
+            for Dependency in Graph[Node].get('After', []): # Only run before the Node when it has something to do
+                if Is_Changed(Dependency):
+                    Plan(Dependency)
+        else:
+            Load.add(Node)
+
+    for Target in Targets:
+        Plan(Target)
+
+    return [Node for Node in Graph if Node in Run], [Node for Node in Graph if Node in Load]
+
+def Run_Graph(Graph, Targets = None, Workers = GRAPH_WORKERS):
+    """
+    Run the stages of a dependency graph through Run_Stage(), handing the value of every stage to the following
+    stages in memory. The stages whose dependencies are done run at the same time in threads, and the value of a
+    stage is released as soon as the last stage using it has run. Only the stages needed by the Targets are run,
+    and the stages whose outputs are up to date are loaded instead (see Plan_Graph())
+    :param Graph: (dict) Node name -> {'Stage': (function) the stage function,
+                                       'Inputs': (dict) Argument name -> Node name whose value is given to the Argument,
+                                       'After': (list) Node names it runs after, without their value,
+                                       'Arguments': (dict) the other keyword arguments of the stage function,
+                                       'Current': (function) True when the outputs of the Node are up to date, optional,
+                                       'Load': (function) the value of an up to date Node, optional (None when not given)}
+    :param Targets: (list) The Nodes whose value is wanted, None for the Nodes whose value no other Node uses
+    :param Workers: (int) The number of stages running at the same time
+    :return: (dict) Target -> value
+    """
+
+    if Targets is None:
+        Targets = [Node for Node in Graph if not any(Node in Graph[User].get('Inputs', {}).values() for User in Graph)]
+    Targets = list(Targets)
+    Unknown = [Node for Node in Targets + [Dependency for Node in Graph for Dependency in Graph_Dependencies(Graph, Node)] if Node not in Graph]
+    if len(Unknown) > 0:
+        raise ValueError(f"Unknown Nodes {sorted(set(Unknown))}, expected one of {list(Graph)}")
+
+    Run, Load = Plan_Graph(Graph, Targets)
+    print(f"Graph: {len(Run)} stages to run ({', '.join(Run)}), {len(Load)} up to date ({', '.join(Load)}) -> {time.strftime(TIME_FORMAT)}")
+
+    Values = {Node: Graph[Node]['Load']() if 'Load' in Graph[Node] else None for Node in Load}
+    Waiting = {Node: {Dependency for Dependency in Graph_Dependencies(Graph, Node) if Dependency in Run} for Node in Run}
+    Users = {} # Node -> number of stages still to run with its value
+    for Node in Run:
+        for Dependency in Graph[Node].get('Inputs', {}).values():
+            Users[Dependency] = Users.get(Dependency, 0) + 1
+
+    Running = {}
+    with ThreadPoolExecutor(max_workers=max(1, Workers)) as Executor:
+        while len(Waiting) > 0 or len(Running) > 0:
+            for Node in [Node for Node, Dependencies in Waiting.items() if len(Dependencies) == 0]:
+                Waiting.pop(Node)
+                Arguments = dict(Graph[Node].get('Arguments', {}))
+                Arguments.update({Argument: Values[Dependency] for Argument, Dependency in Graph[Node].get('Inputs', {}).items()})
+                Running[Executor.submit(Run_Stage, Graph[Node]['Stage'], **Arguments)] = Node
+
+            Done, _ = wait(Running, return_when=FIRST_COMPLETED)
+            for Future in Done:
+                Node = Running.pop(Future)
+                Values[Node] = Future.result() # An exception of a stage stops the graph
+                if Users.get(Node, 0) == 0 and Node not in Targets:
+                    Values.pop(Node) # No stage uses its value
+                for Dependencies in Waiting.values():
+                    Dependencies.discard(Node)
+
+                for Dependency in Graph[Node].get('Inputs', {}).values():
+                    Users[Dependency] -= 1
+                    if Users[Dependency] == 0 and Dependency not in Targets:
+                        Values.pop(Dependency, None) # The last stage using it has run
+
+    return {Target: Values.get(Target) for Target in Targets}
+
+def Print_Memory_Report():
+    """
+    Print the peak RSS of every stage run through Run_Stage(), in the order they ended, and clear the report.
+    The worker processes of a stage are not included, their peak RSS is in the Trace
+    :return: None
+    """
+
+    if len(Memory_Report) > 0:
+        print(f"Memory Report -> {time.strftime(TIME_FORMAT)}")
+        print(f"{'Stage':<40}{'Peak RSS MB':>14}{'Stage Increase MB':>20}")
+        for Record in Memory_Report:
+            print(f"{Record['Stage']:<40}{Record['Peak RSS MB']:>14.1f}{Record['Stage Increase MB']:>20.1f}")
+        print("*" * 100)
+
+    Memory_Report.clear()
+
+def Load_Settings(Config_File = None, **Arguments):
+    """
+    Get the Settings of a script run: the Constants of a JSON config file, e.g. {"FOLDER": "Input", "Z": 80},
+    overridden by the command-line Arguments that were given
+    :param Config_File: (string) The path of the JSON config file, None for no file
+    :param Arguments: The Constants given on the command line, None when not given
+    :return: (dict) Constant name -> Value
+    """
+
+    Settings = {}
+    if Config_File is not None:
+        with open(Config_File, 'r') as File:
+            Settings.update(json.load(File))
+
+    Settings.update({Name: Value for Name, Value in Arguments.items() if Value is not None})
+    return Settings
+
+def Apply_Settings(Module_Globals, Settings):
+    """
+    Override the Constants of a script with the Settings, so it runs without asking for any value
+    :param Module_Globals: (dict) The globals() of the script
+    :param Settings: (dict) Constant name -> Value, from Load_Settings()
+    :return: None
+    """
+
+    Unknown = [Name for Name in Settings if not Name.isupper() or Name not in Module_Globals]
+    if len(Unknown) > 0:
+        raise ValueError(f"Unknown Settings {Unknown}, expected Constants of the script")
+
+    Module_Globals.update(Settings)
@@ -0,0 +1,42 @@
+import numpy as np
+
+#Constants and Global Variables
+RCOV_DECIMALS = 3 # Decimals of the RCoV (%) values, as written in the RCOV_DATA files
+
+def Robust_CoV(Values, Axis = 0):
+    """
+    Robust Coefficient of Variation along an axis: RCoV = MAD / median * 100, with MAD = median(|x - median(x)|).
+    The medians are partition based (numpy selects the middle values without sorting the whole axis), and the
+    missing (NaN) values are left out
+    :param Values: (array) The values, of any shape
+    :param Axis: (int) The axis reduced, e.g. the Years of a monthly table or the hours of a group
+    :return: (array) The RCoV (%) with the Axis removed
+    """
+
+    Values = np.asarray(Values, dtype=float)
+    Median_Function = np.nanmedian if np.isnan(Values).any() else np.median
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Median = Median_Function(Values, axis=Axis, keepdims=True)
+        MAD = Median_Function(np.abs(Values - Median), axis=Axis, keepdims=True)
+        return np.squeeze(MAD / Median * 100, axis=Axis)
+
+def Grouped_Robust_CoV(Sorted, Starts):
+    """
+    RCoV of every contiguous segment of every column. The segments of the same length are gathered into one
+    (Segments, Length, Columns) array and reduced together, so a year of months is three batches (744, 720, 672 hours)
+    :param Sorted: (array) The values of shape (Rows, Columns), every group is a contiguous segment of rows
+    :param Starts: (array) The position of the first row of every segment
+    :return: (array) The RCoV (%) of shape (Segments, Columns)
+    """
+
+    Sorted = np.asarray(Sorted, dtype=float)
+    Starts = np.asarray(Starts)
+    Sizes = np.diff(np.append(Starts, len(Sorted)))
+    Results = np.full((len(Starts),) + Sorted.shape[1:], np.nan)
+
+    for Size in np.unique(Sizes):
+        Segments = np.flatnonzero(Sizes == Size)
+        Rows = Starts[Segments][:, np.newaxis] + np.arange(Size) # (Segments, Size) positions in Sorted
+        Results[Segments] = Robust_CoV(Sorted[Rows], Axis=1)
+
+    return Results
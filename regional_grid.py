@@ -0,0 +1,278 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from math import log #By default log is treated as ln() in python
+from pipeline import Run_Stage, Print_Memory_Report, Load_Settings, Apply_Settings
+from columnar_io import Check_Columnar_Support, Columnar_File_Name, Columnar_File_Bytes
+from background_writer import Submit_Write, Flush_Writes
+from instrumentation import Enable_Trace, Start_Span, Count, End_Span, Export_Trace
+from data_preprocessing import Read_NASA_POWER_Header, Column_Types, File_Year, Hour_Positions, TIME_COLUMNS, VARIABLES, HOURS_PER_YEAR, MISSING_VALUE, Zref
+from data_conversion import SUMMARY_TABLES, REQUIRED_COLUMNS, Append_Summary_Rows, Summary_Table_Header
+
+#Constants and Global Variables
+TIME_FORMAT_COMPLETE = '%d %B,%Y %I:%M:%S %p'
+TIME_FORMAT = '%I:%M:%S %p'
+FOLDER = 'Regional' # The NASA POWER regional exports are in '{FOLDER}/Extracted Data Sets/', one File per Year
+Z = None # The value of 'Z' (Hub Height), asked when the script is executed without --hub-heights
+FILE_FORMAT = 'PARQUET' # Format of the gridded tables: 'PARQUET', 'ARROW' or 'CSV'
+COORDINATE_COLUMNS = ['LAT', 'LON'] # The grid cell of every row, before the TIME_COLUMNS and VARIABLES
+CELLS_PER_BATCH = 256 # Grid cells aggregated together, the aggregated array holds 8760 x Cells x REQUIRED_COLUMNS values
+SHEAR_TABLE = 'Shear' # The Uref and ALPHA value of every grid cell and Year
+
+def Read_Regional_File(File_Path):
+    """
+    Read a NASA POWER regional hourly export, the rows of all its grid cells, with the LAT and LON of every row
+    :param File_Path: (string) The path of the regional CSV File
+    :return: (DataFrame) The hourly data of every grid cell
+    """
+
+    with open(File_Path, 'r') as File:
+        Header = Read_NASA_POWER_Header(File)
+        return pd.read_csv(File, sep=',', engine='c', dtype={**Column_Types(Header), **{Column: 'float64' for Column in COORDINATE_COLUMNS}})
+
+def Get_Grid_Data(Folder_Name, File):
+    """
+    Load a regional File into a (Cell, Hour, Variable) array with the coordinate index of its grid cells. Every row is
+    placed on the hourly calendar of the Year, without the Leap year 29th February, as by data_preprocessing.Validate_File().
+    A grid cell is EXCLUDED (all NaN) unless it has each of the 8760 hours exactly once, without a MISSING_VALUE
+    :param Folder_Name: (string) The name of MAIN FOLDER of the regional exports
+    :param File: (string) The File name containing the Year within brackets
+    :return: (dict) 'File', 'Year', 'Latitudes' and 'Longitudes' of the Cells, 'Values' of shape (Cell, 8760, VARIABLES)
+             and 'Valid' the mask of the complete Cells, None on ERROR
+    """
+
+    print(f"Function: Get_Grid_Data() Started -> {time.strftime(TIME_FORMAT)}")
+
+    try:
+        Span = Start_Span('Get_Grid_Data', 'file', File = File)
+        File_Path = f"{Folder_Name}/Extracted Data Sets/{File}"
+        df = Read_Regional_File(File_Path)
+        if list(df.columns) != COORDINATE_COLUMNS + TIME_COLUMNS + VARIABLES:
+            raise ValueError(f"Column order is not the exact same as this -> '{COORDINATE_COLUMNS + TIME_COLUMNS + VARIABLES}'")
+
+        Year = File_Year(File)
+        Coordinates, Cell_Of_Row = np.unique(df[COORDINATE_COLUMNS].to_numpy(), axis=0, return_inverse=True)
+        Cell_Of_Row = Cell_Of_Row.reshape(-1)
+        Position, Invalid, In_Year, Leap_Day = Hour_Positions(Year, *(df[Column].to_numpy() for Column in TIME_COLUMNS))
+        Row_Values = df[VARIABLES].to_numpy(dtype=float)
+        Row_Values[Row_Values == MISSING_VALUE] = np.nan
+        Rows = np.flatnonzero(In_Year & ~Leap_Day & ~np.isnan(Row_Values).all(axis=1))
+
+        #Slot of every row in the (Cell, Hour) grid, the Counts give the missing and duplicate hours of every Cell
+        Slots = Cell_Of_Row[Rows] * HOURS_PER_YEAR + Position[Rows]
+        Counts = np.bincount(Slots, minlength=len(Coordinates) * HOURS_PER_YEAR).reshape(len(Coordinates), HOURS_PER_YEAR)
+        Values = np.full((len(Coordinates), HOURS_PER_YEAR, len(VARIABLES)), np.nan)
+        Values.reshape(-1, len(VARIABLES))[Slots] = Row_Values[Rows]
+        Missing_Values = np.isnan(Values).any(axis=2) & (Counts == 1) # Cell hours read once with a missing value
+        Valid = (Counts == 1).all(axis=1) & ~Missing_Values.any(axis=1)
+        Values[~Valid] = np.nan
+        Count(Span, Rows = len(df), Read_Files = [File_Path])
+        End_Span(Span)
+
+        print(f"File: '{File}' -> {len(Coordinates)} grid cells, {int(Valid.sum())} complete, {int((~Valid).sum())} EXCLUDED "
+              f"({int((Counts == 0).sum())} missing and {int((Counts > 1).sum())} duplicate cell hours, {int(Missing_Values.sum())} with missing values, "
+              f"{int(np.count_nonzero(Invalid))} rows with an invalid date)")
+        print(f"Function: Get_Grid_Data() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+        print("*" * 100)
+        return {'File': File, 'Year': Year, 'Latitudes': Coordinates[:, 0], 'Longitudes': Coordinates[:, 1], 'Values': Values, 'Valid': Valid}
+
+    except Exception as error:
+        print(f"Function: Get_Grid_Data() Ended with ERROR: '{error}'")
+        print("*" * 100)
+        return None
+
+def Grid_Shear_Extrapolation(Grid_Data, Hub_Heights):
+    """
+    Convert the Pressure of every grid cell from kPa into atm and its Wind speed at 50m to every Hub Height with the
+    ALPHA value of the Cell, for all the Cells at once. The formulas are the ones of data_preprocessing
+    :param Grid_Data: (dict) The grid from Get_Grid_Data(), its Pressure is converted in place
+    :param Hub_Heights: (list) The values of 'Z'
+    :return: (dict) The grid with 'Uref' and 'Alpha' of every Cell and 'Wind_Speeds' of shape (Hub Height, Cell, 8760), None on ERROR
+    """
+
+    print(f"Function: Grid_Shear_Extrapolation() Started -> {time.strftime(TIME_FORMAT)}")
+
+    try:
+        if Grid_Data is not None:
+            Values = Grid_Data['Values']
+            Values[..., VARIABLES.index('PS')] = (Values[..., VARIABLES.index('PS')] * 1000) / 101325 # Conversion of the PS values to 'ATM' unit
+
+            Wind_Speed = Values[..., VARIABLES.index('WS50M')]
+            Uref = Wind_Speed.mean(axis=1) # NaN for the EXCLUDED Cells
+            with np.errstate(invalid='ignore', divide='ignore'):
+                Alpha = (0.37 - (0.088*np.log(Uref)))/(1 - (0.088*log(Zref/10)))
+            Wind_Speeds = (np.array(Hub_Heights, dtype=float)[:, np.newaxis, np.newaxis]/Zref) ** Alpha[:, np.newaxis] * Wind_Speed
+
+            print(f"Function: Grid_Shear_Extrapolation() {int(Grid_Data['Valid'].sum())} Cells converted to {len(Hub_Heights)} Hub Heights")
+            print(f"Function: Grid_Shear_Extrapolation() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+            print("*" * 100)
+            return {**Grid_Data, 'Uref': Uref, 'Alpha': Alpha, 'Wind_Speeds': Wind_Speeds}
+
+        else:
+            print("Function: Grid_Shear_Extrapolation() Ended -> 'Data is not loaded from Get_Grid_Data() function' Kindly check")
+            print("*" * 100)
+            return None
+
+    except Exception as error:
+        print(f"Function: Grid_Shear_Extrapolation() Ended with ERROR: '{error}'")
+        print("*" * 100)
+        return None
+
+def Grid_Summary_Tables(Grid_Data, Hub_Heights):
+    """
+    Get the SUMMARY_TABLES of data_conversion for every complete grid cell, with the same statistics as the tables of a
+    City. The Cells are reduced CELLS_PER_BATCH at a time, all the Cells of a batch with a single call per Resolution
+    :param Grid_Data: (dict) The grid from Grid_Shear_Extrapolation()
+    :param Hub_Heights: (list) The values of 'Z', in the order of 'Wind_Speeds'
+    :return: (dict) {Hub Height: {Table: DataFrame of LAT, LON, YEAR, Periods..., Annual}}, with the SHEAR_TABLE, None on ERROR
+    """
+
+    print(f"Function: Grid_Summary_Tables() Started -> {time.strftime(TIME_FORMAT)}")
+
+    try:
+        if Grid_Data is not None:
+            Cells = np.flatnonzero(Grid_Data['Valid'])
+            Coordinates = [[Grid_Data['Latitudes'][Cell], Grid_Data['Longitudes'][Cell]] for Cell in Cells]
+            Tables = {}
+
+            for Height_Index, Hub_Height in enumerate(Hub_Heights):
+                Summary_Dict = {Table: {Cell: [] for Cell in Cells} for Table in SUMMARY_TABLES}
+                Columns = {'T2M': Grid_Data['Values'][..., VARIABLES.index('T2M')], 'PS': Grid_Data['Values'][..., VARIABLES.index('PS')],
+                           'WS50M': Grid_Data['Wind_Speeds'][Height_Index]} # (Cell, 8760) of every REQUIRED_COLUMNS
+
+                for Start in range(0, len(Cells), CELLS_PER_BATCH):
+                    Batch = Cells[Start:Start + CELLS_PER_BATCH]
+                    #8760 Rows and the REQUIRED_COLUMNS of every Cell side by side, as the Files of a City in data_conversion
+                    Values = np.stack([Columns[Column][Batch] for Column in REQUIRED_COLUMNS], axis=-1).transpose(1, 0, 2).reshape(HOURS_PER_YEAR, -1)
+                    Append_Summary_Rows(Summary_Dict, [(Cell, Grid_Data['File']) for Cell in Batch], Values)
+
+                Tables[Hub_Height] = {Table: pd.DataFrame([Coordinate + Summary_Dict[Table][Cell][0] for Cell, Coordinate in zip(Cells, Coordinates)],
+                                                          columns=COORDINATE_COLUMNS + Summary_Table_Header(Table))
+                                      for Table in SUMMARY_TABLES}
+                Tables[Hub_Height][SHEAR_TABLE] = pd.DataFrame({'LAT': Grid_Data['Latitudes'][Cells], 'LON': Grid_Data['Longitudes'][Cells],
+                                                                'YEAR': Grid_Data['Year'], 'Uref m/s': Grid_Data['Uref'][Cells],
+                                                                'ALPHA': Grid_Data['Alpha'][Cells]})
+
+            print(f"Function: Grid_Summary_Tables() {len(SUMMARY_TABLES)} Tables of {len(Cells)} Cells summarized")
+            print(f"Function: Grid_Summary_Tables() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+            print("*" * 100)
+            return Tables
+
+        else:
+            print("Function: Grid_Summary_Tables() Ended -> 'Data is not converted from Grid_Shear_Extrapolation() function' Kindly check")
+            print("*" * 100)
+            return None
+
+    except Exception as error:
+        print(f"Function: Grid_Summary_Tables() Ended with ERROR: '{error}'")
+        print("*" * 100)
+        return None
+
+def Gridded_Data_Path(Hub_Height, Hub_Heights):
+    """
+    :param Hub_Height: (int) One of the Hub Heights of the run
+    :param Hub_Heights: (list) All the Hub Heights of the run, several are written to their own '{Hub_Height}m' sub-folder
+    :return: (string) The directory of the gridded tables of the Hub Height
+    """
+
+    return f"{FOLDER}/Gridded Data/" + (f"{Hub_Height}m/" if len(Hub_Heights) > 1 else "")
+
+def Export_Grid_Tables(Grid_Tables, Hub_Heights):
+    """
+    Export one table per SUMMARY_TABLES and the SHEAR_TABLE, with the rows of every grid cell and Year, in the FILE_FORMAT
+    instead of a folder per City
+    :param Grid_Tables: (dict) {Hub Height: {Table: [DataFrame of every Year]}} from Grid_Summary_Tables()
+    :param Hub_Heights: (list) The values of 'Z'
+    :return: None
+    """
+
+    print(f"Function: Export_Grid_Tables() Started -> {time.strftime(TIME_FORMAT)}")
+
+    try:
+        if len(Grid_Tables) > 0:
+            if FILE_FORMAT != 'CSV':
+                Check_Columnar_Support(FILE_FORMAT)
+
+            for Hub_Height in Grid_Tables:
+                Final_path = Gridded_Data_Path(Hub_Height, Hub_Heights)
+                os.makedirs(Final_path, exist_ok=True)  # Create the Gridded Data directory, if not exist
+
+                for Table, Year_Tables in Grid_Tables[Hub_Height].items():
+                    Span = Start_Span('Export_Grid_Table', 'file', Table = Table, Hub_Height = Hub_Height)
+                    df = pd.concat(Year_Tables).sort_values(['YEAR'] + COORDINATE_COLUMNS, kind='stable').reset_index(drop=True)
+                    if FILE_FORMAT == 'CSV':
+                        File_Name = f"{Table}.csv"
+                        Written_Bytes = Submit_Write(Final_path + File_Name, df.to_csv(index=False).encode('utf-8'))
+                    else:
+                        File_Name = Columnar_File_Name(f"{Table}.csv", FILE_FORMAT)
+                        Written_Bytes = Submit_Write(Final_path + File_Name, Columnar_File_Bytes(df, FILE_FORMAT))
+                    print(f"{Final_path + File_Name} Created Successfully with {len(df)} rows")
+                    Count(Span, Rows = len(df), Written_Bytes = Written_Bytes)
+                    End_Span(Span)
+
+            print(f"Function: Export_Grid_Tables() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+            print("*" * 100)
+
+        else:
+            print("Function: Export_Grid_Tables() Ended -> 'No grid is summarized by Grid_Summary_Tables() function' Kindly check")
+            print("*" * 100)
+
+    except Exception as error:
+        print(f"Function: Export_Grid_Tables() Ended with ERROR: '{error}'")
+        print("*" * 100)
+
+def Configure(Settings):
+    """
+    Override the Constants of this script, e.g. from the command line or a config file
+    :param Settings: (dict) Constant name -> Value, see pipeline.Load_Settings()
+    :return: None
+    """
+
+    Apply_Settings(globals(), Settings)
+
+def Main(Hub_Heights = None):
+    """
+    Process the regional Files one Year at a time: load the grid, extrapolate the Wind speed and summarize every Cell,
+    then export the gridded tables of all the Years
+    :param Hub_Heights: (list) The values of 'Z', None uses the global 'Z'
+    :return: None
+    """
+
+    print(f"EXECUTION STARTED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
+    Hub_Heights = [Z] if Hub_Heights is None else list(dict.fromkeys(Hub_Heights)) # Without the repeated Hub Heights
+    Grid_Tables = {}
+
+    for File in sorted(os.listdir(f"{FOLDER}/Extracted Data Sets")):
+        Grid_Data = Run_Stage(Get_Grid_Data, Folder_Name = FOLDER, File = File)
+        Grid_Data = Run_Stage(Grid_Shear_Extrapolation, Grid_Data = Grid_Data, Hub_Heights = Hub_Heights)
+        Tables = Run_Stage(Grid_Summary_Tables, Grid_Data = Grid_Data, Hub_Heights = Hub_Heights)
+        del Grid_Data # Only the tables of a Year are kept
+
+        for Hub_Height, Height_Tables in (Tables or {}).items():
+            for Table, df in Height_Tables.items():
+                Grid_Tables.setdefault(Hub_Height, {}).setdefault(Table, []).append(df)
+
+    Run_Stage(Export_Grid_Tables, Grid_Tables = Grid_Tables, Hub_Heights = Hub_Heights)
+    Flush_Writes()
+    Print_Memory_Report()
+
+    Export_Trace('regional_grid')
+    print(f"EXECUTION ENDED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
+
+if __name__ == '__main__':
+    Parser = argparse.ArgumentParser(description="Summarize every grid cell of the NASA POWER regional exports in FOLDER")
+    Parser.add_argument('--hub-heights', type=int, nargs='+', metavar='Z', help="The values of 'Z', e.g. --hub-heights 80 100 120. Asked when not given")
+    Parser.add_argument('--folder', help=f"The MAIN FOLDER of the regional exports (default: {FOLDER})")
+    Parser.add_argument('--format', choices=['CSV', 'PARQUET', 'ARROW'], help=f"The format of the gridded tables (default: {FILE_FORMAT})")
+    Parser.add_argument('--trace', action='store_true', help="Export the timing, CPU, memory, rows and bytes of every stage (see instrumentation.py)")
+    Parser.add_argument('--config', help="A JSON file of Constants of this script, e.g. {\"Z\": 80, \"FOLDER\": \"Regional\"}, the arguments take precedence")
+    Arguments = Parser.parse_args()
+    if Arguments.trace:
+        Enable_Trace()
+    Configure(Load_Settings(Arguments.config, FOLDER = Arguments.folder, FILE_FORMAT = Arguments.format))
+
+    if Arguments.hub_heights is None and Z is None:
+        Z = int(input("Enter the value of 'Z': "))
+    Main(Hub_Heights = Arguments.hub_heights)
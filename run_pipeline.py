@@ -0,0 +1,212 @@
+import os
+import copy
+import time
+import shutil
+import filecmp
+import argparse
+import pipeline
+import data_preprocessing, data_conversion, energy_production, statistical_analysis
+from pipeline import Run_Graph, Print_Memory_Report, Load_Settings
+from columnar_io import Columnar_File_Name
+from instrumentation import Enable_Trace, Export_Trace
+from manifest import Load_Manifest, Manifest_Lock
+from background_writer import Flush_Writes
+
+#Constants and Global Variables
+TIME_FORMAT_COMPLETE = '%d %B,%Y %I:%M:%S %p'
+TIME_FORMAT = '%I:%M:%S %p'
+SCRIPTS = { # Script name -> its Configure() function, the sections of the --config file
+    'data_preprocessing': data_preprocessing.Configure,
+    'data_conversion': data_conversion.Configure,
+    'energy_production': energy_production.Configure,
+    'statistical_analysis': statistical_analysis.configure,
+}
+STATISTICAL_TABLES = [ # Summarized Data table -> input table of statistical_analysis '{City}_{Table}.csv'. The Seasonal tables
+                       # are left out, statistical_analysis only plots and tests the months and the hours of the day
+    ('Monthly_Temperature_{CITY}.csv', 'Temperature'),
+    ('Monthly_WindSpeed_{CITY}.csv', 'WindSpeed'),
+    ('{MODEL}/{CITY}_Production.csv', 'Production'),
+    ('{MODEL}/{CITY}_Capacity_Factor.csv', 'Capacity_Factor'),
+    ('Diurnal_Temperature_{CITY}.csv', 'Diurnal_Temperature'), # Years x Hours, one RCOV and trend per hour of the day
+    ('Diurnal_WindSpeed_{CITY}.csv', 'Diurnal_WindSpeed'),
+]
+STATISTICAL_TARGETS = ['tables', 'rcov', 'trends', 'graphs', 'collages'] # The Nodes of statistical_analysis.statistics_graph()
+TARGETS = ['prepared', 'summary', 'production', 'published'] + STATISTICAL_TARGETS + ['record'] # The Nodes of Pipeline_Graph()
+MODEL = None # The Turbine Model of the Production and Capacity Factor tables analysed, None for the first of energy_production.TURBINES
+WORKERS = pipeline.GRAPH_WORKERS # Number of stages running at the same time
+INCREMENTAL = False # Skip the stages whose outputs are up to date, and only build the Files and Cities that changed (see manifest.py)
+
+def Statistical_Tables_To_Publish(Folder_Name, Statistics_Folder, Model):
+    """
+    Find the Summarized Data tables whose copy in the INPUT FOLDER of statistical_analysis is missing or different
+    :param Folder_Name: (string) The MAIN FOLDER of the Cities
+    :param Statistics_Folder: (string) The INPUT FOLDER of statistical_analysis
+    :param Model: (string) The Turbine Model of the Production and Capacity Factor tables of energy_production
+    :return: (list) The (Summarized Data path, INPUT FOLDER path) of the tables to copy
+    """
+
+    Tables = []
+    File_Name = (lambda File: File) if data_conversion.FILE_FORMAT == 'CSV' else (lambda File: Columnar_File_Name(File, data_conversion.FILE_FORMAT))
+    for City in sorted(os.listdir(Folder_Name)):
+        Summary_Path = f"{Folder_Name}/{City}/Summarized Data/" + data_conversion.Height_Folder()
+        for Source, Table in STATISTICAL_TABLES:
+            Source = Summary_Path + File_Name(Source.format(CITY = City, MODEL = Model))
+            Destination = f"{Statistics_Folder}/{City}/" + File_Name(f"{City}_{Table}.csv")
+            if os.path.exists(Source) and not (os.path.exists(Destination) and filecmp.cmp(Source, Destination, shallow=False)):
+                Tables.append((Source, Destination))
+
+    return Tables
+
+def Publish_Statistical_Tables(Folder_Name, Statistics_Folder, Model):
+    """
+    Copy the Summarized Data tables of every City that changed into the INPUT FOLDER of statistical_analysis, named
+    as its input tables. The tables are small, statistical_analysis reads them from its folder so its Manifest and
+    graphs stay next to them
+    :param Folder_Name: (string) The MAIN FOLDER of the Cities
+    :param Statistics_Folder: (string) The INPUT FOLDER of statistical_analysis
+    :param Model: (string) The Turbine Model of the Production and Capacity Factor tables of energy_production
+    :return: (list) The paths of the tables copied
+    """
+
+    print(f"Function: Publish_Statistical_Tables() Started -> {time.strftime(TIME_FORMAT)}")
+    Tables = Statistical_Tables_To_Publish(Folder_Name, Statistics_Folder, Model)
+    for Source, Destination in Tables:
+        os.makedirs(os.path.dirname(Destination), exist_ok=True)
+        shutil.copy(Source, Destination)
+
+    print(f"Function: Publish_Statistical_Tables() {len(Tables)} tables copied to '{Statistics_Folder}' Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+    print("*" * 100)
+    return [Destination for _, Destination in Tables]
+
+def Is_Current(Manifest, Select):
+    """
+    Check if a stage has nothing to build. The selection is made on a copy of the Manifest, as it may remove stale
+    Records the stage has to find again when it runs, only the content hashes computed are kept
+    :param Manifest: (dict) The Manifest from Load_Manifest(), None when every stage runs
+    :param Select: (function) Manifest -> the Files or Cities to build, e.g. data_conversion.Select_Cities_To_Summarize
+    :return: (bool) True when there is nothing to build
+    """
+
+    if Manifest is None:
+        return False
+
+    Copy = copy.deepcopy(Manifest)
+    Current = len(Select(Copy)) == 0
+    with Manifest_Lock:
+        Manifest['Hashes'].update(Copy.get('Hashes', {}))
+    return Current
+
+def Files_To_Prepare(Manifest, Hub_Heights):
+    """
+    :param Manifest: (dict) The Manifest from Load_Manifest()
+    :param Hub_Heights: (list) The values of 'Z'
+    :return: (list) The Files to prepare and the Cities whose Logs must be written again
+    """
+
+    Selected_Files, _, Removed_Cities = data_preprocessing.Select_Files_To_Prepare(data_preprocessing.FOLDER, Manifest, Hub_Heights)
+    return [f"{City}/{File}" for City in Selected_Files for File in Selected_Files[City]] + sorted(Removed_Cities)
+
+def Pipeline_Graph(Manifest = None, Compute_Only = False):
+    """
+    Declare the stages of the four scripts as one dependency graph for pipeline.Run_Graph(). The Prepared Data Sets
+    are handed in memory to data_conversion and energy_production, which run at the same time, then their tables are
+    published to statistical_analysis, whose RCOV and trends also run at the same time. Every Node that writes files
+    checks with the Manifest if its outputs are up to date, so a target is resumed without running the stages before it
+    :param Manifest: (dict) The Manifest from Load_Manifest(), None runs every stage on every File
+    :param Compute_Only: (bool) statistical_analysis exports no graph and no collage
+    :return: (dict) The graph, with the Nodes of TARGETS
+    """
+
+    Model = MODEL if MODEL is not None else next(iter(energy_production.TURBINES))
+    Hub_Heights = [data_preprocessing.Z]
+    Graph = {
+        'prepared': {'Stage': data_preprocessing.Prepare_Files, 'Arguments': {'Manifest': Manifest, 'Workers': data_preprocessing.WORKERS, 'Hub_Heights': Hub_Heights},
+                     'Current': lambda: Is_Current(Manifest, lambda Copy: Files_To_Prepare(Copy, Hub_Heights))},
+        'summary': {'Stage': data_conversion.Summarize_Cities, 'Inputs': {'Prepared_Data': 'prepared'}, 'Arguments': {'Manifest': Manifest},
+                    'Current': lambda: Is_Current(Manifest, lambda Copy: data_conversion.Select_Cities_To_Summarize(data_conversion.FOLDER, Copy))},
+        'production': {'Stage': energy_production.Compute_Cities, 'Inputs': {'Prepared_Data': 'prepared'}, 'Arguments': {'Manifest': Manifest},
+                       'Current': lambda: Is_Current(Manifest, lambda Copy: energy_production.Select_Cities_To_Compute(energy_production.FOLDER, Copy))},
+        'published': {'Stage': Publish_Statistical_Tables, 'After': ['summary', 'production'],
+                      'Arguments': {'Folder_Name': data_conversion.FOLDER, 'Statistics_Folder': statistical_analysis.FOLDER, 'Model': Model},
+                      'Current': lambda: len(Statistical_Tables_To_Publish(data_conversion.FOLDER, statistical_analysis.FOLDER, Model)) == 0},
+    }
+
+    Graph.update(statistical_analysis.statistics_graph(Manifest, Compute_Only))
+    Graph['tables']['After'] = ['published']
+    Tables_Current = lambda: Is_Current(Manifest, lambda Copy: [Table for Table_Dict in statistical_analysis.select_changed_tables(
+                                            Copy, [statistical_analysis.table_names()], Compute_Only) for Table in Table_Dict])
+    Graph['rcov']['Current'] = Tables_Current
+    if not Compute_Only:
+        Graph['graphs']['Current'] = Tables_Current
+        Graph['collages']['Current'] = lambda: Is_Current(Manifest, statistical_analysis.select_changed_collages)
+        Graph['collages']['Load'] = lambda: [] # No collage to record
+    return Graph
+
+def Configure(Settings):
+    """
+    Override the Constants of the scripts, e.g. from the command line or a config file
+    :param Settings: (dict) Script name -> {Constant name -> Value}, see pipeline.Load_Settings()
+    :return: None
+    """
+
+    Unknown = [Script for Script in Settings if Script not in SCRIPTS]
+    if len(Unknown) > 0:
+        raise ValueError(f"Unknown scripts {Unknown} in the Settings, expected {list(SCRIPTS)}")
+
+    for Script, Script_Settings in Settings.items():
+        SCRIPTS[Script](Script_Settings)
+
+def Main(Targets = None, Incremental = INCREMENTAL, Compute_Only = False, Workers = WORKERS):
+    """
+    :param Targets: (list) The Nodes of TARGETS to build, with the stages before them that are not up to date. None builds everything
+    :param Incremental: (bool) Skip what is up to date since the last run, otherwise every stage runs on every File
+    :param Compute_Only: (bool) statistical_analysis exports no graph and no collage
+    :param Workers: (int) The number of stages running at the same time
+    :return: (dict) Target -> value
+    """
+
+    print(f"EXECUTION STARTED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
+
+    Graph = Pipeline_Graph(Load_Manifest() if Incremental else None, Compute_Only)
+    if Targets is not None and 'record' in Graph and any(Target in STATISTICAL_TARGETS for Target in Targets):
+        Targets = list(Targets) + ['record'] # The exported files of statistical_analysis are recorded in the Manifest
+
+    Values = Run_Graph(Graph, Targets = Targets, Workers = Workers)
+    Flush_Writes()
+    Print_Memory_Report()
+
+    Export_Trace('run_pipeline')
+    print(f"EXECUTION ENDED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
+    return Values
+
+if __name__ == '__main__':
+    Parser = argparse.ArgumentParser(description="Run data_preprocessing, data_conversion, energy_production and statistical_analysis as one dependency graph")
+    Parser.add_argument('--target', nargs='+', choices=TARGETS, help="Only build these stages, and the stages before them that are not up to date (default: everything)")
+    Parser.add_argument('--folder', help="The MAIN FOLDER of the Cities")
+    Parser.add_argument('--statistics-folder', help="The INPUT FOLDER of statistical_analysis, the tables are published there")
+    Parser.add_argument('--format', choices=['CSV', 'PARQUET', 'ARROW'], help="The format of the Prepared Data Sets and of the tables")
+    Parser.add_argument('--hub-height', type=int, metavar='Z', help="The value of 'Z'. Asked when not given")
+    Parser.add_argument('--workers', type=int, default=WORKERS, help="The number of stages running at the same time (default: %(default)s)")
+    Parser.add_argument('--incremental', action='store_true', help="Skip what is up to date since the last run, recorded in the Manifest (see manifest.py)")
+    Parser.add_argument('--compute-only', action='store_true', help="statistical_analysis only exports the RCOV and the trends")
+    Parser.add_argument('--streaming', action='store_true', help="Prepare, summarize and compute one File or City at a time, with bounded memory")
+    Parser.add_argument('--shear-mode', choices=data_preprocessing.SHEAR_MODES, help="The ALPHA of the Wind speed conversion, one per File, per hour or per month and hour of the day")
+    Parser.add_argument('--trace', action='store_true', help="Export the timing, CPU, memory, rows and bytes of every stage (see instrumentation.py)")
+    Parser.add_argument('--config', help="A JSON file of the Constants of every script, e.g. {\"data_preprocessing\": {\"Z\": 80}}, the arguments take precedence")
+    Arguments = Parser.parse_args()
+    if Arguments.trace:
+        Enable_Trace()
+
+    Settings = Load_Settings(Arguments.config)
+    Streaming = True if Arguments.streaming else None
+    for Script, Script_Arguments in [('data_preprocessing', {'FOLDER': Arguments.folder, 'FILE_FORMAT': Arguments.format, 'Z': Arguments.hub_height,
+                                                             'STREAMING': Streaming, 'SHEAR_MODE': Arguments.shear_mode}),
+                                     ('data_conversion', {'FOLDER': Arguments.folder, 'FILE_FORMAT': Arguments.format, 'STREAMING': Streaming}),
+                                     ('energy_production', {'FOLDER': Arguments.folder, 'FILE_FORMAT': Arguments.format, 'STREAMING': Streaming}),
+                                     ('statistical_analysis', {'FOLDER': Arguments.statistics_folder})]:
+        Settings[Script] = Load_Settings(None, **{**Settings.get(Script, {}), **Script_Arguments})
+    Configure(Settings)
+
+    if data_preprocessing.Z is None:
+        data_preprocessing.Z = int(input("Enter the value of 'Z': "))
+    Main(Targets = Arguments.target, Incremental = Arguments.incremental or INCREMENTAL, Compute_Only = Arguments.compute_only, Workers = Arguments.workers)
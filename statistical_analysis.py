@@ -1,22 +1,40 @@
 import os
+import io
 import pandas as pd
-from PIL import Image
 import time
+import argparse
 import numpy as np
-from copy import deepcopy
-import matplotlib.pyplot as plt
-from sklearn.linear_model import LinearRegression
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pipeline import Run_Stage, Run_Graph, Print_Memory_Report, Load_Settings, Apply_Settings, Worker_Context
+from columnar_io import Is_Columnar_File, Read_Columnar_File
+from instrumentation import Enable_Trace, Start_Span, Count, End_Span, Collect_Trace_Records, Export_Trace, Trace_Records
+from manifest import Load_Manifest, Save_Manifest, Is_Up_To_Date, Record_Build
+from background_writer import Submit_Write, Flush_Writes, Mark_Failed
+from rcov import Robust_CoV, RCOV_DECIMALS
+from trend import Linear_Trend, Mann_Kendall, Sens_Slope
 
 TIME_FORMAT_COMPLETE = '%d %B,%Y %I:%M:%S %p'
 TIME_FORMAT = '%I:%M:%S %p'
 FOLDER = 'InputFiles'
 FILES_PATH = "{FOLDER_NAME}/{CITY_NAME}/"
 COLLAGE_PATH = "{FOLDER_NAME}/COLLAGE_IMGS/"
+RCOV_SUMMARY_FILE = 'RCOV_SUMMARY.csv' # Consolidated RCOV of every table, in the RCOV_DATA folder
+TREND_SUMMARY_FILE = 'TREND_SUMMARY.csv' # Mann-Kendall test and Sen's slope across the Years of every table and month, in the TREND_DATA folder
+OUTPUT_FOLDERS = ("RCOV_DATA", "COLLAGE_IMGS", "TREND_DATA") # Folders written in the INPUT FOLDER, they are not Cities
+RENDER_WORKERS = 1 # Number of processes rendering the graphs, more than 1 sends the chart jobs to a process pool
+COLLAGE_COLUMNS = 2 # Graphs per row of a collage, the rows are added as needed
+COLLAGE_WORKERS = 4 # Number of Cities whose collage is composed at the same time
+GRAPH_ORDER = {"Temperature": 0, "WindSpeed": 1, "Production": 2, "Capacity Factor": 3, "Diurnal Temperature": 4, "Diurnal WindSpeed": 5} # Order of the graph titles (the name without the City) in a collage, the others are placed after them by name
+figure_template = None # The figure and axes reused by every graph rendered in this process
+COMPUTE_ONLY = False # Only export the RCOV and the trends, the graphs and collages (and the matplotlib and PIL imports) are skipped
+SETTINGS = {} # The Constants overridden by configure(), given again to the rendering worker processes
+INCREMENTAL = False # Only export the RCOV, graphs and collages whose input tables changed since the last run (see manifest.py)
 
 def import_files():
     '''
-    It will find all the file present in the INPUT FOLDER and then save it with its data in a dictionary
-    :return: (dict) -> 1 for Excel files and 1 for CSV Files (Total 2 dictionary)
+    It will find all the file present in the INPUT FOLDER and then save it with its data in a dictionary.
+    The Parquet/Arrow tables written by data_conversion are kept along with the CSV files
+    :return: (dict) -> 1 for Excel files and 1 for CSV (and Parquet/Arrow) Files (Total 2 dictionary)
     '''
 
     print(f"Function: import_files() Started -> {time.strftime(TIME_FORMAT)}")
@@ -24,17 +42,26 @@ def import_files():
     csv_files = {}
     xlsx_files = {}
     try:
-        cities = os.listdir(FOLDER)
+        cities = [city for city in os.listdir(FOLDER) if city not in OUTPUT_FOLDERS] # Without the output folders
         if len(cities) > 0:
             for city in cities:
 
+                span = Start_Span('import_city_files', 'city', City = city)
                 Files = os.listdir(FILES_PATH.format(FOLDER_NAME = FOLDER, CITY_NAME = city))
                 csv_files.update({File:pd.read_csv(FILES_PATH.format(FOLDER_NAME = FOLDER, CITY_NAME = city) + File, engine = 'python', encoding = 'latin1') for File in Files if
                              File.split('.')[-1].lower() == "csv"})
 
+                csv_files.update({File:Read_Columnar_File(FILES_PATH.format(FOLDER_NAME = FOLDER, CITY_NAME = city) + File) for File in Files if
+                             Is_Columnar_File(File)})
+
                 xlsx_files.update({File:pd.read_excel(FILES_PATH.format(FOLDER_NAME = FOLDER, CITY_NAME = city) + File) for File in Files if
                              File.split('.')[-1].lower() == "xlsx"})
 
+                tables = [File for File in Files if File in csv_files or File in xlsx_files]
+                Count(span, Rows = sum(len(csv_files[File]) if File in csv_files else len(xlsx_files[File]) for File in tables),
+                      Read_Files = [FILES_PATH.format(FOLDER_NAME = FOLDER, CITY_NAME = city) + File for File in tables])
+                End_Span(span)
+
             print(f"Function: import_files() Total CSV Files Imported: {len(csv_files)}")
             print(f"Function: import_files() Total EXCEL Files Imported: {len(xlsx_files)}")
             print(f"Function: import_files() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
@@ -51,36 +78,57 @@ def import_files():
         print("*" * 100)
         return csv_files, xlsx_files
 
+def table_periods(file):
+    '''
+    It will find the period of every column of a table between YEAR and Annual, the months or the hours of the day
+    of a Diurnal table, whose columns are named '00:00' to '23:00'
+    :param file: (DataFrame) -> The table, Years x Months or Years x Hours
+    :return: (tuple) -> ('MONTH' or 'HOUR', [1 to 12 for the months, 0 to 23 for the hours])
+    '''
+
+    labels = [str(column).split()[0] for column in file.columns[1:-1]]
+    if len(labels) > 0 and all(':' in label for label in labels):
+        return 'HOUR', [int(label.split(':')[0]) for label in labels]
+    return 'MONTH', list(range(1, len(labels) + 1))
+
 def extract_rcov(data_list : list):
     '''
-    It will extract the RCOV data list from each file and return a dictionary
+    It will extract the RCOV data list from each file and return a dictionary. The tables with the same number of
+    Years and Months (or Hours) are stacked and their RCOV is computed in one batch with rcov.py, then every RCOV is
+    written to its own file and to the consolidated RCOV_SUMMARY table
     :param data_list: (list) -> Contains 2 dictionary, one for CSV files and one for Excel files
     :return: (dict) -> It will return a dictionary of RCOV Data with its file name
     '''
 
     print(f"Function: extract_rcov() Started -> {time.strftime(TIME_FORMAT)}")
-    data = deepcopy(data_list)
+    data = data_list # Only read by this function, so it is not copied
     rcov_data = {}
+    periods = {}
 
     try:
         os.makedirs(os.path.join(FOLDER,"RCOV_DATA"), exist_ok=True)  # Create the RCOV Data directory, if not exist
+        tables = {}
         for data_dict in data:
             if len(data_dict) > 0:
                 for file_name, file in data_dict.items():
-
-                    months = list(file.columns)[1:-1]
-                    months_data = [file[month] for month in months]
-                    rcov_data.update({file_name.split(".")[0]:
-                                [round(float((np.median(np.abs(data - np.median(data)))
-                                 / np.median(data)) * 100),3) for data in months_data]})
-
-                    with open(os.path.join(os.path.join(FOLDER,"RCOV_DATA"),file_name.split('.')[0] + ".txt"),'w') as rcov_file:
-                        print(f"Exporting RCOV File: '{file_name.split('.')[0] + '.txt'}'")
-                        rcov_file.write(str(rcov_data[file_name.split(".")[0]]).replace("[",'').replace("]",""))
+                    months_data = file.iloc[:, 1:-1].to_numpy(dtype=float) # Years x Months, without YEAR and Annual
+                    tables.setdefault(months_data.shape, []).append((file_name, months_data))
+                    periods[file_name.split(".")[0]] = table_periods(file)
 
             else:
                 print(f"Function: extract_rcov() Either CSV or XLSX file is empty -> kindly check import_files() function")
 
+        for shape_tables in tables.values():
+            rcov_values = Robust_CoV(np.stack([months_data for _, months_data in shape_tables]), Axis=1) # RCOV over the Years
+            for (file_name, _), values in zip(shape_tables, rcov_values):
+                rcov_data.update({file_name.split(".")[0]: [round(float(value), RCOV_DECIMALS) for value in values]})
+
+                print(f"Exporting RCOV File: '{file_name.split('.')[0] + '.txt'}'")
+                Submit_Write(os.path.join(os.path.join(FOLDER,"RCOV_DATA"),file_name.split('.')[0] + ".txt"),
+                             str(rcov_data[file_name.split(".")[0]]).replace("[",'').replace("]",""))
+
+        export_rcov_summary(rcov_data, periods)
+
         print(f"Function: extract_rcov() Total RCOV Exported are: {len(rcov_data)} Ended Successfully -> {time.strftime(TIME_FORMAT)}")
         print("*" * 100)
         return rcov_data
@@ -90,148 +138,329 @@ def extract_rcov(data_list : list):
         print("*" * 100)
         return rcov_data
 
-def export_plotted_graphs(data_list : list, rcov_data : dict):
+def export_rcov_summary(rcov_data : dict, periods : dict = None):
+    '''
+    It will update the consolidated RCOV_SUMMARY table with the RCOV of the exported files, one row per file and
+    month, or per file and hour of the day for the Diurnal tables, with the City of the file. The rows of the files
+    not exported again are kept
+    :param rcov_data: (dict) -> The RCOV Data with its file name from extract_rcov()
+    :param periods: (dict) -> The file name -> table_periods() of its table, None for monthly tables only
+    '''
 
-    print(f"Function: export_plotted_graphs() Started -> {time.strftime(TIME_FORMAT)}")
+    periods = periods or {}
+    rows = []
+    for table, values in rcov_data.items():
+        resolution, indexes = periods.get(table, ('MONTH', range(1, len(values) + 1)))
+        rows.extend([table, table.split("_")[0], index if resolution == 'MONTH' else None, index if resolution == 'HOUR' else None, value]
+                    for index, value in zip(indexes, values))
+    summary = pd.DataFrame(rows, columns=['TABLE', 'CITY', 'MONTH', 'HOUR', 'RCOV %'])
+
+    summary_path = os.path.join(os.path.join(FOLDER,"RCOV_DATA"), RCOV_SUMMARY_FILE)
+    if os.path.exists(summary_path):
+        previous = pd.read_csv(summary_path, encoding='latin1')
+        previous = previous.assign(CITY = previous['TABLE'].str.split("_").str[0]).reindex(columns=summary.columns) # Also a summary without CITY and HOUR
+        summary = pd.concat([previous[~previous['TABLE'].isin(rcov_data.keys())], summary])
+
+    summary = summary.astype({'MONTH': 'Int64', 'HOUR': 'Int64'}) # Empty for the other resolution, not a float column
+    Submit_Write(summary_path, summary.sort_values(['TABLE', 'MONTH', 'HOUR']).to_csv(index=False).encode('utf-8'))
+    print(f"Exporting RCOV Summary File: '{RCOV_SUMMARY_FILE}' with {summary['TABLE'].nunique()} tables")
+
+def extract_trends(data_list : list):
+    '''
+    It will test the trend across the Years of every month (or hour of a Diurnal table) of every table, all the tables
+    with the same number of Years and Months in one batch: Mann-Kendall test (with the tied values correction), Sen's slope and least-squares
+    slope per Year. The TREND_SUMMARY table is updated, the rows of the tables not tested again are kept
+    :param data_list: (list) -> Contains 2 dictionary, one for CSV files and one for Excel files
+    :return: (DataFrame) -> The trends of the tested tables, one row per table and month (or hour)
+    '''
+
+    print(f"Function: extract_trends() Started -> {time.strftime(TIME_FORMAT)}")
+    trends = pd.DataFrame()
 
     try:
-        for data in data_list:
-            if len(data) > 0:
-                for file_name, file in data.items():
+        os.makedirs(os.path.join(FOLDER,"TREND_DATA"), exist_ok=True)  # Create the Trend Data directory, if not exist
+        tables = {}
+        for data_dict in data_list:
+            for file_name, file in data_dict.items():
+                months_data = file.iloc[:, 1:-1].to_numpy(dtype=float) # Years x Months, without YEAR and Annual
+                tables.setdefault(months_data.shape, []).append((file_name.split(".")[0], file['YEAR'].to_numpy(dtype=float), months_data,
+                                                                 table_periods(file)))
+
+        rows = []
+        for shape_tables in tables.values():
+            values = np.stack([months_data for _, _, months_data, _ in shape_tables]) # Tables x Years x Months
+            years = np.stack([years for _, years, _, _ in shape_tables])[:, :, np.newaxis]
+            mann_kendall = Mann_Kendall(values, X=years, Axis=1)
+            sens_slope = Sens_Slope(values, X=years, Axis=1)
+            ols_slope, _ = Linear_Trend(values, X=years, Axis=1)
+
+            for index, (table, _, _, (resolution, periods)) in enumerate(shape_tables):
+                rows.extend([table, period if resolution == 'MONTH' else None, period if resolution == 'HOUR' else None,
+                             mann_kendall['S'][index, month], mann_kendall['Z'][index, month], mann_kendall['P'][index, month],
+                             mann_kendall['Trend'][index, month], sens_slope[index, month], ols_slope[index, month]]
+                            for month, period in enumerate(periods))
+
+        trends = pd.DataFrame(rows, columns=['TABLE', 'MONTH', 'HOUR', 'MK S', 'MK Z', 'MK P', 'TREND', 'SEN SLOPE', 'OLS SLOPE'])
+        summary_path = os.path.join(os.path.join(FOLDER,"TREND_DATA"), TREND_SUMMARY_FILE)
+        summary = trends
+        if os.path.exists(summary_path):
+            previous = pd.read_csv(summary_path, encoding='latin1').reindex(columns=trends.columns) # Also a summary without HOUR
+            summary = pd.concat([previous[~previous['TABLE'].isin(trends['TABLE'])], trends])
+
+        summary = summary.astype({'MONTH': 'Int64', 'HOUR': 'Int64'}) # Empty for the other resolution, not a float column
+        Submit_Write(summary_path, summary.sort_values(['TABLE', 'MONTH', 'HOUR']).to_csv(index=False).encode('utf-8'))
+        print(f"Exporting Trend Summary File: '{TREND_SUMMARY_FILE}' with {summary['TABLE'].nunique()} tables")
+
+        print(f"Function: extract_trends() Total Trends Exported are: {trends['TABLE'].nunique()} Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+        print("*" * 100)
+        return trends
 
-                    file_values = file.iloc[:, 1:-1]
-                    rcov = rcov_data[file_name.split('.')[0]]
-                    Years = list(file['YEAR'])
-                    Months = [x.split()[0] for x in list(file.columns[1:-1])]
-                    Month_Indexes = np.array(range(0, 12))
+    except Exception as Error:
+        print(f"Function: extract_trends() Ended with an Error -> {Error}")
+        print("*" * 100)
+        return trends
 
-                    fig, ax1 = plt.subplots(figsize=(12, 6)) # Create the plot
-                    ax2 = ax1.twinx() # Create secondary axis for RCOV
-                    bar_width = 1 / len(Months)  # Adjust the bar width
+def render_worker_initializer(settings : dict):
+    '''
+    It will set the non-interactive Agg backend in a rendering worker process, the graphs are only saved to files,
+    and the Constants overridden in the main process
+    :param settings: (dict) -> Constant name -> Value, see configure()
+    '''
 
-                    trend_x = np.array(range(1, 13)).reshape(-1, 1)
-                    trend_y = np.mean(file_values.values, axis=0)
-                    model = LinearRegression().fit(trend_x, trend_y)
-                    trend = model.predict(trend_x)
+    import matplotlib
+    matplotlib.use('Agg')
+    configure(settings)
+    Collect_Trace_Records() # Only the Trace Records made by this worker are returned to the main process
 
-                    if "production" in file_name.lower():
-                        # Create a bar chart for Production
-                        for i, value in enumerate(file_values.values):
-                            ax1.bar(Month_Indexes + i * bar_width, value, bar_width, label=Years[i])
+def get_figure_template():
+    '''
+    It will give the figure of this process, cleared for the next graph. The figure and its axes are created once
+    and reused by every graph rendered in the process
+    :return: (tuple) -> (figure, primary axis, secondary axis for RCOV)
+    '''
 
-                        ax1.plot(Months, trend, color='black', linewidth='2.5', linestyle='--', label='Overall Trend')
+    global figure_template
 
-                    else:
-                        # Create a plot for WindSpeed, Temperature, and Capacity Factor
-                        for i, data in enumerate(file_values.values):
-                            ax1.plot(Months, data, label=f'{Years[i]}', marker='o', linestyle='-',
-                                     linewidth=1, markersize=6)
-
-                        # Plotting overall trend line
-                        ax1.plot(Months, trend, color='black', linewidth='2.5', linestyle='--', label='Overall Trend')
-
-                    # Plotting RCOV Line
-                    ax2.plot(Months, rcov, color='green', linewidth='4', linestyle=':', label='RCoV')
-
-                    # Add labels and title
-                    ax1.set_xlabel('Month')
-                    if 'speed' in file_name.lower():
-                        ax1.set_ylabel('Wind Speed (m/s)')
-                        plt.title('Wind Speed')
-                    elif 'temperature' in file_name.lower():
-                        ax1.set_ylabel('Temperature (°C)')
-                        plt.title('Temperature')
-                    elif 'factor' in file_name.lower():
-                        ax1.set_ylabel('Capacity Factor (%)')
-                        plt.title('Capacity Factor')
-                    elif 'production' in file_name.lower():
-                        ax1.set_ylabel('Production (GWh)')
-                        plt.title('Production')
-
-                    file_name_exact = file_name.split('.')[0].replace("_"," ")
-
-                    #Setting Secondary Axis label
-                    ax2.set_ylabel('RCoV (%)', color='g')
-
-                    # Show legend
-                    lines1, labels1 = ax1.get_legend_handles_labels()
-                    lines2, labels2 = ax2.get_legend_handles_labels()
-                    plt.legend(lines1 + lines2, labels1 + labels2, loc='upper right', prop={'size': 6})
-
-                    # Add gridlines
-                    ax1.grid(True)
-
-                    print(f'Exporting Graph: "{file_name_exact + ".png"}"')
-                    plt.savefig(FILES_PATH.format(FOLDER_NAME = FOLDER,CITY_NAME = file_name.split("_")[0]) + file_name_exact + ".png")
-                    plt.close()
+    if figure_template is None:
+        import matplotlib # Imported with the first graph, the compute-only runs never load matplotlib
+        matplotlib.use('Agg') # The graphs are rendered in a Run_Graph() thread, an interactive backend needs the main thread
+        import matplotlib.pyplot as plt
+        fig, ax1 = plt.subplots(figsize=(12, 6)) # Create the plot
+        ax2 = ax1.twinx() # Create secondary axis for RCOV
+        figure_template = (fig, ax1, ax2)
+
+    fig, ax1, ax2 = figure_template
+    ax1.clear()
+    ax2.clear()
+    ax2.yaxis.tick_right() # The secondary axis is cleared back to the left side
+    ax2.yaxis.set_label_position('right')
+    return figure_template
+
+def render_graph(file_name : str, file, rcov : list, trend : list):
+    '''
+    It will plot the graph of one table with its RCOV and save it in the City folder, the PNG is encoded here and
+    written by the background writer
+    :param file_name: (str) -> The name of the table, e.g. 'Gharo_WindSpeed.csv'
+    :param file: (DataFrame) -> The table, Years x Months, or Years x Hours for a Diurnal table
+    :param rcov: (list) -> The RCOV of every month (or hour) from extract_rcov()
+    :param trend: (list) -> The least-squares line through the monthly (or hourly) means of the Years
+    :return: (tuple) -> (name of the exported graph, (array) its RGBA pixels of shape (height, width, 4))
+    '''
+
+    span = Start_Span('render_graph', 'file', Table = file_name)
+    file_values = file.iloc[:, 1:-1]
+    Years = list(file['YEAR'])
+    Months = [x.split()[0] for x in list(file.columns[1:-1])]
+    Month_Indexes = np.array(range(0, len(Months)))
+    resolution, _ = table_periods(file)
+
+    fig, ax1, ax2 = get_figure_template()
+    bar_width = 1 / len(Months)  # Adjust the bar width
+
+    if "production" in file_name.lower():
+        # Create a bar chart for Production
+        for i, value in enumerate(file_values.values):
+            ax1.bar(Month_Indexes + i * bar_width, value, bar_width, label=Years[i])
+
+        ax1.plot(Months, trend, color='black', linewidth='2.5', linestyle='--', label='Overall Trend')
+
+    else:
+        # Create a plot for WindSpeed, Temperature, and Capacity Factor
+        for i, data in enumerate(file_values.values):
+            ax1.plot(Months, data, label=f'{Years[i]}', marker='o', linestyle='-',
+                     linewidth=1, markersize=6)
+
+        # Plotting overall trend line
+        ax1.plot(Months, trend, color='black', linewidth='2.5', linestyle='--', label='Overall Trend')
+
+    # Plotting RCOV Line
+    ax2.plot(Months, rcov, color='green', linewidth='4', linestyle=':', label='RCoV')
+
+    # Add labels and title
+    ax1.set_xlabel('Hour' if resolution == 'HOUR' else 'Month')
+    if 'speed' in file_name.lower():
+        ax1.set_ylabel('Wind Speed (m/s)')
+        ax2.set_title('Wind Speed')
+    elif 'temperature' in file_name.lower():
+        ax1.set_ylabel('Temperature (°C)')
+        ax2.set_title('Temperature')
+    elif 'factor' in file_name.lower():
+        ax1.set_ylabel('Capacity Factor (%)')
+        ax2.set_title('Capacity Factor')
+    elif 'production' in file_name.lower():
+        ax1.set_ylabel('Production (GWh)')
+        ax2.set_title('Production')
+    if resolution == 'HOUR':
+        ax2.set_title('Diurnal ' + ax2.get_title())
+
+    file_name_exact = file_name.split('.')[0].replace("_"," ")
+
+    #Setting Secondary Axis label
+    ax2.set_ylabel('RCoV (%)', color='g')
+
+    # Show legend
+    lines1, labels1 = ax1.get_legend_handles_labels()
+    lines2, labels2 = ax2.get_legend_handles_labels()
+    ax2.legend(lines1 + lines2, labels1 + labels2, loc='upper right', prop={'size': 6})
+
+    # Add gridlines
+    ax1.grid(True)
+
+    png = io.BytesIO()
+    fig.savefig(png, format='png')
+    written_bytes = Submit_Write(FILES_PATH.format(FOLDER_NAME = FOLDER,CITY_NAME = file_name.split("_")[0]) + file_name_exact + ".png", png.getvalue())
+    Count(span, Rows = len(file), Written_Bytes = written_bytes)
+    End_Span(span)
+    return file_name_exact + ".png", np.asarray(fig.canvas.buffer_rgba()).copy() # The pixels just saved, for the collage
+
+def render_graph_job(file_name : str, file, rcov : list, trend : list):
+    '''
+    It will render a graph in a worker process, see render_graph(), its file is written before the worker returns
+    :return: (tuple) -> (the result of render_graph(), the Trace Records of the worker process, empty when the Trace is disabled,
+             the paths of the files whose write failed)
+    '''
+
+    result = render_graph(file_name, file, rcov, trend)
+    failed = Flush_Writes()
+    return result, Collect_Trace_Records(), failed
+
+def export_plotted_graphs(data_list : list, rcov_data : dict, workers : int = RENDER_WORKERS):
+    '''
+    It will export the graph of every table. With more than 1 worker the graphs are rendered by a process pool with
+    the Agg backend, the graphs are exported and reported in the same order as with 1 worker
+    :param data_list: (list) -> Contains 2 dictionary, one for CSV files and one for Excel files
+    :param rcov_data: (dict) -> The RCOV Data with its file name from extract_rcov()
+    :param workers: (int) -> The number of rendering processes
+    :return: (dict) -> City -> {graph name: RGBA pixels}, the graphs rendered in memory for the collages
+    '''
+
+    print(f"Function: export_plotted_graphs() Started -> {time.strftime(TIME_FORMAT)}")
+
+    graphs = {}
+    try:
+        jobs = []
+        for data in data_list:
+            if len(data) > 0:
+                jobs.extend((file_name, file, rcov_data[file_name.split('.')[0]]) for file_name, file in data.items())
             else:
                 print(f"Function: export_plotted_graphs() Either CSV or XLSX file is empty -> kindly check import_files() function")
 
+        trends = {} # Overall trend line of every graph, fitted through the monthly (or hourly) means, one batch per number of columns
+        for columns in sorted({file.shape[1] - 2 for _, file, _ in jobs}):
+            indexes = [index for index, (_, file, _) in enumerate(jobs) if file.shape[1] - 2 == columns]
+            slopes, intercepts = Linear_Trend(np.stack([np.mean(jobs[index][1].iloc[:, 1:-1].values, axis=0) for index in indexes]))
+            trends.update({index: intercept + slope * np.array(range(1, columns + 1)) for index, slope, intercept in zip(indexes, slopes, intercepts)})
+        jobs = [job + (trends[index],) for index, job in enumerate(jobs)]
+
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=Worker_Context(), initializer=render_worker_initializer,
+                                     initargs=(SETTINGS,)) as executor:
+                for job, ((graph, pixels), records, failed) in zip(jobs, executor.map(render_graph_job, *zip(*jobs))):
+                    Trace_Records.extend(records)
+                    Mark_Failed(failed)
+                    print(f'Exporting Graph: "{graph}"')
+                    graphs.setdefault(job[0].split("_")[0], {})[graph] = pixels
+        else:
+            for job in jobs:
+                graph, pixels = render_graph(*job)
+                print(f'Exporting Graph: "{graph}"')
+                graphs.setdefault(job[0].split("_")[0], {})[graph] = pixels
+
         print(f"Function: export_plotted_graphs() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
         print("*" * 100)
+        return graphs
 
     except Exception as Error:
         print(f"Function: export_plotted_graphs() Ended with an Error -> {Error}")
         print("*" * 100)
+        return graphs
 
-def export_final_plotted_graphs_collage():
+def compose_collage(city : str, graphs : dict = None, columns : int = COLLAGE_COLUMNS):
     '''
-    It will find all the graph.png files present in each City Folder and and then make a collage of them and export them
+    It will paste the graphs of a City in a grid of the given number of columns, as many rows as needed, and export
+    the collage. The graphs rendered in this run are taken from memory, only the others are read from the City folder
+    :param city: (str) -> The City name
+    :param graphs: (dict) -> Graph name -> RGBA pixels from export_plotted_graphs(), None reads every graph from the folder
+    :param columns: (int) -> The number of graphs per row of the collage
+    :return: (str) -> The path of the exported collage, None if the City has no graph
+    '''
+
+    from PIL import Image # Imported with the first collage, the compute-only runs never load PIL
+
+    span = Start_Span('compose_collage', 'city', City = city)
+    graphs = {} if graphs is None else graphs
+    city_path = FILES_PATH.format(FOLDER_NAME=FOLDER, CITY_NAME=city)
+    names = sorted(set(graphs) | {graph for graph in os.listdir(city_path) if str(graph).lower().endswith('.png')},
+                   key=lambda x: (GRAPH_ORDER.get(os.path.splitext(x)[0].removeprefix(city + " "), len(GRAPH_ORDER)), x))
+
+    if len(names) == 0:
+        End_Span(span)
+        return None
+
+    images = [graphs[name] if name in graphs else np.asarray(Image.open(city_path + name).convert('RGBA')) for name in names]
+    height = max(image.shape[0] for image in images)
+    width = max(image.shape[1] for image in images)
+    columns = min(columns, len(images))
+    rows = -(-len(images) // columns)
+
+    #Appending Images in the Collage image, row by row, the empty cells stay transparent
+    collage = np.zeros((rows * height, columns * width, 4), dtype=np.uint8)
+    for index, image in enumerate(images):
+        row, column = divmod(index, columns)
+        collage[row * height: row * height + image.shape[0], column * width: column * width + image.shape[1]] = image
+
+    #Saving Collage image
+    collage_path = f"{os.path.join(COLLAGE_PATH.format(FOLDER_NAME=FOLDER),city)}.png"
+    png = io.BytesIO()
+    Image.fromarray(collage, 'RGBA').save(png, format='PNG')
+    Count(span, Written_Bytes = Submit_Write(collage_path, png.getvalue()))
+    Flush_Writes() # Composed in a thread of export_final_plotted_graphs_collage(), the collage is complete when the thread returns
+    End_Span(span)
+    return collage_path
+
+def export_final_plotted_graphs_collage(cities : list = None, graphs : dict = None, workers : int = COLLAGE_WORKERS):
+    '''
+    It will make a collage of the graphs of each City and export them, the Cities are composed in parallel threads
+    :param cities: (list) -> Only make the collage of these Cities, None makes it for every City Folder
+    :param graphs: (dict) -> City -> {graph name: RGBA pixels} from export_plotted_graphs(), the graphs not given are read from the City Folder
+    :param workers: (int) -> The number of Cities composed at the same time
     '''
 
     print(f"Function: export_final_plotted_graphs_collage() Started -> {time.strftime(TIME_FORMAT)}")
 
     try:
         os.makedirs(COLLAGE_PATH.format(FOLDER_NAME=FOLDER), exist_ok=True)
-        cities = sorted(os.listdir(FOLDER))
-
-        if "RCOV_DATA" in cities:  # Remove the RCOV_DATA folder from list of Cities for finding graph images
-            cities.remove('RCOV_DATA')
-        elif "COLLAGE_IMGS" in cities: # Remove the COLLAGE_IMGS folder from list of Cities for finding graph images
-            cities.remove('COLLAGE_IMGS')
+        cities = sorted(os.listdir(FOLDER)) if cities is None else list(cities)
+        cities = [city for city in cities if city not in OUTPUT_FOLDERS] # Without the output folders
+        graphs = {} if graphs is None else graphs
 
         if len(cities) > 0:
-            for city in cities:
-                if "COLLAGE_IMGS" in cities: # Remove the COLLAGE_IMGS folder from list of Cities
-                    cities.remove('COLLAGE_IMGS')
-
-                #Getting graph files name
-                graphs = [graph for graph in os.listdir(FILES_PATH.format(FOLDER_NAME=FOLDER, CITY_NAME=city)) if str(graph).lower().endswith('.png')]
-
-                if len(graphs) > 0:
-
-                    # Define the custom sort order
-                    sort_order = {
-                        "Temperature": 0,
-                        "WindSpeed": 1,
-                        "Production": 2,
-                        "Capacity Factor": 3
-                    }
-
-                    # Sort the list using the custom order
-                    graphs = sorted(graphs, key=lambda x: sort_order[next((key for key in sort_order if key in x), -1)])
-
-                    #Getting the list of 4 images for each city
-                    images = [Image.open(os.path.join(os.path.join(FOLDER, city), graph)) for graph in graphs]
-                    width, height = images[0].size
-
-                    #Defining the Collage image width, height and object
-                    collage_width = width * 2
-                    collage_height = height * 2
-                    collage = Image.new('RGBA', (collage_width, collage_height))
-
-                    #Appending Images in the Collage image
-                    collage.paste(images[0], (0, 0))
-                    collage.paste(images[1], (width, 0))
-                    collage.paste(images[2], (0, height))
-                    collage.paste(images[3], (width, height))
-
-                    #Saving Collage image
-                    collage.save(f"{os.path.join(COLLAGE_PATH.format(FOLDER_NAME=FOLDER),city)}.png")
-                    print(f"Exporting Collage File: {os.path.join(COLLAGE_PATH.format(FOLDER_NAME=FOLDER),city)}.png")
-
-                else:
-                  print(f"Function: export_final_plotted_graphs_collage() Ended as there is no graph exported/present in {city} folder.")
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+                for city, collage_path in zip(cities, executor.map(lambda city: compose_collage(city, graphs.get(city), COLLAGE_COLUMNS), cities)):
+                    if collage_path is not None:
+                        print(f"Exporting Collage File: {collage_path}")
+                    else:
+                        print(f"Function: export_final_plotted_graphs_collage() Ended as there is no graph exported/present in {city} folder.")
             print(f"Function: export_final_plotted_graphs_collage() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
 
         else:
@@ -240,18 +469,206 @@ def export_final_plotted_graphs_collage():
     except Exception as Error:
         print(f"Function: export_final_plotted_graphs_collage() Ended with an Error -> {Error}")
 
-def run():
+def table_paths(file_name : str, compute_only : bool = False):
+    '''
+    It will give the path of an input table and of the graph and RCOV files exported from it
+    :param file_name: (str) -> The name of the table, e.g. 'Gharo_WindSpeed.csv'
+    :param compute_only: (bool) -> Only the RCOV file, the compute-only runs export no graph
+    :return: (tuple) -> (table path, [graph path, RCOV path])
+    '''
+
+    city_path = FILES_PATH.format(FOLDER_NAME = FOLDER, CITY_NAME = file_name.split("_")[0])
+    rcov_path = os.path.join(os.path.join(FOLDER,"RCOV_DATA"), file_name.split('.')[0] + ".txt")
+    return (city_path + file_name,
+            [rcov_path] if compute_only else [city_path + file_name.split('.')[0].replace("_"," ") + ".png", rcov_path])
+
+def table_key(file_name : str, compute_only : bool = False):
+    '''
+    It will give the Manifest record of a table, the compute-only runs have their own records as they export no graph
+    :param file_name: (str) -> The name of the table
+    :param compute_only: (bool) -> The record of the compute-only runs
+    :return: (str) -> The record key
+    '''
+
+    return f"COMPUTE/{file_name}" if compute_only else file_name
+
+def table_parameters(compute_only : bool = False):
+    '''
+    :param compute_only: (bool) -> The compute-only runs export no graph
+    :return: (dict) -> The settings the graph and RCOV file of a table depend on, recorded in the Manifest
+    '''
+
+    return {'RCOV_DECIMALS': RCOV_DECIMALS, 'COMPUTE_ONLY': compute_only}
+
+def collage_parameters():
+    '''
+    :return: (dict) -> The settings the collage of a City depends on, recorded in the Manifest
+    '''
+
+    return {'COLLAGE_COLUMNS': COLLAGE_COLUMNS, 'GRAPH_ORDER': GRAPH_ORDER}
+
+def collage_paths(city : str):
+    '''
+    It will give the paths of the graphs of a City and of its collage
+    :param city: (str) -> The City name
+    :return: (tuple) -> ([graph paths], collage path)
+    '''
+
+    city_path = FILES_PATH.format(FOLDER_NAME = FOLDER, CITY_NAME = city)
+    return ([city_path + graph for graph in sorted(os.listdir(city_path)) if graph.lower().endswith('.png')],
+            f"{os.path.join(COLLAGE_PATH.format(FOLDER_NAME=FOLDER),city)}.png")
+
+def table_names():
+    '''
+    It will find the names of the tables of the INPUT FOLDER, as import_files() imports them, without reading them
+    :return: (dict) -> table name -> None, for select_changed_tables()
+    '''
+
+    if not os.path.isdir(FOLDER):
+        return {}
+
+    cities = [city for city in os.listdir(FOLDER) if city not in OUTPUT_FOLDERS]
+    return {File: None for city in cities for File in os.listdir(FILES_PATH.format(FOLDER_NAME = FOLDER, CITY_NAME = city))
+            if File.split('.')[-1].lower() in ("csv", "xlsx") or Is_Columnar_File(File)}
+
+def import_changed_files(manifest : dict = None, compute_only : bool = False):
+    '''
+    It will import the tables of the INPUT FOLDER and keep the ones that changed since the last run
+    :param manifest: (dict) -> The Manifest from Load_Manifest(), None keeps every table
+    :param compute_only: (bool) -> Compare with the last compute-only run
+    :return: (list) -> The 2 dictionary of the tables to export, one for CSV files and one for Excel files
+    '''
+
+    csv_dict,xlsx_dict = import_files()
+    return [csv_dict, xlsx_dict] if manifest is None else select_changed_tables(manifest, [csv_dict, xlsx_dict], compute_only)
+
+def export_changed_collages(manifest : dict = None, graphs : dict = None, workers : int = COLLAGE_WORKERS):
+    '''
+    It will export the collages of the Cities whose graphs changed since the last run
+    :param manifest: (dict) -> The Manifest from Load_Manifest(), None exports the collage of every City
+    :param graphs: (dict) -> City -> {graph name: RGBA pixels} from export_plotted_graphs()
+    :param workers: (int) -> The number of Cities composed at the same time
+    :return: (list) -> The Cities whose collage was exported, None for every City. The graphs of this run are complete,
+             the graphs stage flushed its files when it returned (see pipeline.Run_Stage())
+    '''
+
+    cities = None if manifest is None else select_changed_collages(manifest)
+    export_final_plotted_graphs_collage(cities = cities, graphs = graphs, workers = workers)
+    return cities
+
+def statistics_graph(manifest : dict = None, compute_only : bool = False):
+    '''
+    It will declare the functions of this script as a dependency graph for pipeline.Run_Graph(), the RCOV and the
+    trends only read the tables, so they run at the same time
+    :param manifest: (dict) -> The Manifest from Load_Manifest(), None exports every table and collage
+    :param compute_only: (bool) -> Without the graphs and collages
+    :return: (dict) -> The graph, its 'record' node records the exported files in the Manifest when one is given
+    '''
+
+    graph = {
+        'tables': {'Stage': import_changed_files, 'Arguments': {'manifest': manifest, 'compute_only': compute_only}},
+        'rcov': {'Stage': extract_rcov, 'Inputs': {'data_list': 'tables'}},
+        'trends': {'Stage': extract_trends, 'Inputs': {'data_list': 'tables'}},
+    }
+
+    if not compute_only:
+        graph['graphs'] = {'Stage': export_plotted_graphs, 'Inputs': {'data_list': 'tables', 'rcov_data': 'rcov'}, 'Arguments': {'workers': RENDER_WORKERS}}
+        graph['collages'] = {'Stage': export_changed_collages, 'Inputs': {'graphs': 'graphs'}, 'Arguments': {'manifest': manifest, 'workers': COLLAGE_WORKERS}}
+
+    if manifest is not None:
+        graph['record'] = {'Stage': record_exported_files, 'Inputs': {'data_list': 'tables'}, 'After': [node for node in graph if node != 'tables'],
+                           'Arguments': {'manifest': manifest, 'cities': [], 'compute_only': compute_only}}
+        if not compute_only:
+            graph['record']['Inputs']['cities'] = 'collages'
+
+    return graph
+
+def select_changed_tables(manifest : dict, data_list : list, compute_only : bool = False):
+    '''
+    It will keep only the tables whose content or settings changed, or whose graph or RCOV file changed, since the last run
+    :param manifest: (dict) -> The Manifest from Load_Manifest()
+    :param data_list: (list) -> Contains 2 dictionary, one for CSV files and one for Excel files
+    :param compute_only: (bool) -> Compare with the last compute-only run
+    :return: (list) -> The same 2 dictionary with the changed tables only
+    '''
+
+    changed_list = [{file_name: file for file_name, file in data_dict.items()
+                     if not Is_Up_To_Date(manifest, 'statistical_analysis', table_key(file_name, compute_only), [table_paths(file_name)[0]], table_parameters(compute_only))}
+                    for data_dict in data_list]
+
+    print(f"Function: select_changed_tables() Tables to export: {sum(len(data_dict) for data_dict in changed_list)}, "
+          f"unchanged since the last run: {sum(len(data_dict) for data_dict in data_list) - sum(len(data_dict) for data_dict in changed_list)}")
+    return changed_list
+
+def select_changed_collages(manifest : dict):
+    '''
+    It will find the Cities whose graphs or collage settings changed, or whose collage changed, since the last run
+    :param manifest: (dict) -> The Manifest from Load_Manifest()
+    :return: (list) -> The Cities whose collage has to be exported
+    '''
+
+    cities = [city for city in sorted(os.listdir(FOLDER)) if city not in OUTPUT_FOLDERS]
+    return [city for city in cities if not Is_Up_To_Date(manifest, 'statistical_analysis', f"COLLAGE/{city}", collage_paths(city)[0], collage_parameters())]
+
+def record_exported_files(manifest : dict, data_list : list, cities : list, compute_only : bool = False):
+    '''
+    It will record the exported graphs, RCOV files and collages in the Manifest, a file which failed is not recorded
+    :param manifest: (dict) -> The Manifest from Load_Manifest()
+    :param data_list: (list) -> The 2 dictionary of the exported tables
+    :param cities: (list) -> The Cities whose collage was exported
+    :param compute_only: (bool) -> The run exported no graph and no collage
+    '''
+
+    Flush_Writes() # The files of this thread are complete before their hash is recorded, the other stages flushed theirs when they returned
+    for data_dict in data_list:
+        for file_name in data_dict:
+            table_path, output_paths = table_paths(file_name, compute_only)
+            Record_Build(manifest, 'statistical_analysis', table_key(file_name, compute_only), [table_path], table_parameters(compute_only), output_paths)
+
+    for city in cities:
+        graph_paths, collage_path = collage_paths(city)
+        Record_Build(manifest, 'statistical_analysis', f"COLLAGE/{city}", graph_paths, collage_parameters(), [collage_path])
+
+    Save_Manifest(manifest)
+
+def configure(settings : dict):
+    '''
+    It will override the Constants of this script, e.g. from the command line or a config file
+    :param settings: (dict) -> Constant name -> Value, see pipeline.Load_Settings()
+    '''
+
+    Apply_Settings(globals(), settings)
+    SETTINGS.update(settings)
+
+def run(incremental : bool = INCREMENTAL, compute_only : bool = COMPUTE_ONLY):
+    '''
+    :param incremental: (bool) -> Only export the tables that changed since the last run
+    :param compute_only: (bool) -> Only export the RCOV and the trends, without graphs and collages, so matplotlib and PIL are never imported
+    '''
 
     print(f"EXECUTION STARTED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
     print("*" * 100)
 
-    csv_dict,xlsx_dict = import_files()
-    rcov_dict = extract_rcov(data_list = [csv_dict, xlsx_dict])
-    export_plotted_graphs(data_list = [csv_dict,xlsx_dict], rcov_data = rcov_dict)
-    export_final_plotted_graphs_collage()
+    manifest = Load_Manifest() if incremental else None
+    Run_Graph(statistics_graph(manifest, compute_only))
+    Flush_Writes()
+    Print_Memory_Report()
 
+    Export_Trace('statistical_analysis')
     print("*" * 100)
     print(f"EXECUTION ENDED AT: {time.strftime(TIME_FORMAT_COMPLETE)}")
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Export the RCOV, trends, graphs and collages of the tables in FOLDER")
+    parser.add_argument('--compute-only', action='store_true', help="Only export the RCOV and the trends, without graphs and collages")
+    parser.add_argument('--folder', help=f"The INPUT FOLDER of the Cities (default: {FOLDER})")
+    parser.add_argument('--workers', type=int, help=f"The number of processes rendering the graphs (default: {RENDER_WORKERS})")
+    parser.add_argument('--incremental', action='store_true', help="Only export the tables changed since the last run, recorded in the Manifest (see manifest.py)")
+    parser.add_argument('--trace', action='store_true', help="Export the timing, CPU, memory, rows and bytes of every stage, City and graph (see instrumentation.py)")
+    parser.add_argument('--config', help="A JSON file of Constants of this script, e.g. {\"FOLDER\": \"InputFiles\"}, the arguments take precedence")
+    arguments = parser.parse_args()
+    if arguments.trace:
+        Enable_Trace()
+    configure(Load_Settings(arguments.config, FOLDER = arguments.folder, RENDER_WORKERS = arguments.workers,
+                            INCREMENTAL = True if arguments.incremental else None, COMPUTE_ONLY = True if arguments.compute_only else None))
+    run(incremental = INCREMENTAL, compute_only = COMPUTE_ONLY)
@@ -0,0 +1,152 @@
+import os
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+#Constants and Global Variables
+TIME_FORMAT = '%I:%M:%S %p'
+FOLDER = 'Input'
+FILES_PATH = "{FOLDER_NAME}/{CITY_NAME}/Extracted Data Sets/"
+FILE_NAME = "POWER_Point_Hourly_{CITY_NAME} ({YEAR}).csv"
+CITY_NAMES = ['Gharo', 'Jhimpir', 'Keti Bandar', 'Hyderabad', 'Thatta', 'Badin', 'Karachi', 'Sujawal'] # Then 'City 009', 'City 010', ...
+LATITUDE_RANGE = (24.0, 27.0) # The Cities are placed at random in the wind corridor of Sindh
+LONGITUDE_RANGE = (66.5, 69.5)
+MISSING_VALUE = -999 # The NASA POWER value of missing source data
+DEFECT_TYPES = ['Gap', 'Duplicates', 'Out_Of_Order', 'Missing_Values', 'Truncated'] # One of them is given to a defective File
+NASA_POWER_HEADER = """-BEGIN HEADER-
+NASA/POWER CERES/MERRA2 Native Resolution Hourly Data
+Dates (month/day/year): 01/01/{YEAR} through 12/31/{YEAR}
+Location: Latitude  {LATITUDE:.4f}   Longitude {LONGITUDE:.4f}
+Elevation from MERRA-2: Average for 0.5 x 0.625 degree lat/lon region = {ELEVATION:.1f} meters
+The value for missing source data that cannot be computed or is outside of the sources availability range: {MISSING_VALUE}
+Parameter(s):
+T2M     MERRA-2 Temperature at 2 Meters (C)
+PS      MERRA-2 Surface Pressure (kPa)
+WD50M   MERRA-2 Wind Direction at 50 Meters (Degrees)
+WS50M   MERRA-2 Wind Speed at 50 Meters (m/s)
+-END HEADER-
+"""
+
+def City_Name(Index):
+    """
+    :param Index: (int) The position of the City, from 0
+    :return: (string) The name of the City, from CITY_NAMES then numbered
+    """
+
+    return CITY_NAMES[Index] if Index < len(CITY_NAMES) else f"City {Index + 1:03d}"
+
+def Hourly_Values(Year, Rng):
+    """
+    Generate the hourly values of a Year with the seasonal and diurnal cycles of a coastal site: the temperature
+    peaks in June and in the afternoon, the pressure follows the opposite seasonal cycle, and the monsoon brings
+    south-westerly winds of higher Weibull scale in the summer
+    :param Year: (int) The Year, a Leap year has 8784 hours
+    :param Rng: (Generator) The random number generator
+    :return: (DataFrame) The YEAR, MO, DY, HR, T2M, PS, WD50M and WS50M columns
+    """
+
+    Hours = np.arange(f'{Year}-01-01T00', f'{Year + 1}-01-01T00', dtype='datetime64[h]')
+    Days = Hours.astype('datetime64[D]')
+    Months = Hours.astype('datetime64[M]')
+    Day_Of_Year = (Days - Days[0]).astype(int)
+    Hour = (Hours - Days).astype(int)
+
+    Season = np.cos(2 * np.pi * (Day_Of_Year - 172) / 365) # 1 at the end of June, -1 in December
+    Diurnal = np.cos(2 * np.pi * (Hour - 14) / 24) # 1 at 14:00
+
+    Temperature = 26 + 6 * Season + 4 * Diurnal + Rng.normal(0, 1.5, len(Hours))
+    Pressure = 101.0 - 0.6 * Season + Rng.normal(0, 0.15, len(Hours))
+    Direction = np.mod(np.where(Season > 0, 225, 45) + Rng.normal(0, 40, len(Hours)), 360)
+    Scale = 7 + 2.5 * np.clip(Season, 0, None) + 0.8 * Diurnal # Weibull scale c (m/s)
+    Speed = Scale * Rng.weibull(2.1, len(Hours))
+
+    return pd.DataFrame({
+        'YEAR': Year,
+        'MO': Months.astype(int) % 12 + 1,
+        'DY': (Days - Months.astype('datetime64[D]')).astype(int) + 1,
+        'HR': Hour,
+        'T2M': Temperature.round(2),
+        'PS': Pressure.round(2),
+        'WD50M': Direction.round(2),
+        'WS50M': Speed.round(2)
+    })
+
+def Add_Defect(df, Defect, Rng):
+    """
+    Damage the hourly rows of a File the way real downloads are damaged
+    :param df: (DataFrame) The hourly values from Hourly_Values()
+    :param Defect: (string) One of DEFECT_TYPES
+    :param Rng: (Generator) The random number generator
+    :return: (DataFrame) The damaged rows
+    """
+
+    Start = int(Rng.integers(0, len(df) - 200))
+    Length = int(Rng.integers(1, 49))
+
+    if Defect == 'Gap': # A run of missing hours
+        return df.drop(df.index[Start:Start + Length])
+    elif Defect == 'Duplicates': # A run of hours written twice
+        return pd.concat([df.iloc[:Start + Length], df.iloc[Start:]])
+    elif Defect == 'Out_Of_Order': # Two runs of hours swapped
+        return pd.concat([df.iloc[:Start], df.iloc[Start + Length:Start + 2*Length], df.iloc[Start:Start + Length], df.iloc[Start + 2*Length:]])
+    elif Defect == 'Missing_Values': # Values of the source data missing
+        df = df.copy()
+        Rows = Rng.choice(len(df), size=Length, replace=False)
+        df.iloc[Rows, df.columns.get_loc('WS50M')] = MISSING_VALUE
+        return df
+    elif Defect == 'Truncated': # The download ended before the end of the Year
+        return df.iloc[:len(df) - Length * 24]
+    else:
+        raise ValueError(f"Unknown Defect '{Defect}', expected one of {DEFECT_TYPES}")
+
+def Generate_Corpus(Folder_Name = FOLDER, Cities = 3, Years = (2019, 2020, 2021), Defect_Rate = 0.0, Seed = 0):
+    """
+    Write the NASA POWER hourly Files of every City and Year in '{Folder_Name}/{City}/Extracted Data Sets/', as
+    data_preprocessing reads them. The values are random but reproducible from the Seed
+    :param Folder_Name: (string) The name of MAIN FOLDER
+    :param Cities: (int) The number of Cities
+    :param Years: (iterable) The Years of every City
+    :param Defect_Rate: (float) The share of the Files given one of the DEFECT_TYPES
+    :param Seed: (int) The seed of the random number generator
+    :return: (DataFrame) The City, Year, Rows, Defect and path of every File written
+    """
+
+    print(f"Function: Generate_Corpus() Started -> {time.strftime(TIME_FORMAT)}")
+    Rng = np.random.default_rng(Seed)
+    Files = []
+
+    for Index in range(Cities):
+        City = City_Name(Index)
+        Latitude, Longitude = Rng.uniform(*LATITUDE_RANGE), Rng.uniform(*LONGITUDE_RANGE)
+        Elevation = Rng.uniform(0, 60)
+        os.makedirs(FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City), exist_ok=True)
+
+        for Year in Years:
+            df = Hourly_Values(int(Year), Rng)
+            Defect = str(Rng.choice(DEFECT_TYPES)) if Rng.random() < Defect_Rate else None
+            if Defect is not None:
+                df = Add_Defect(df, Defect, Rng)
+
+            File_Path = FILES_PATH.format(FOLDER_NAME = Folder_Name, CITY_NAME = City) + FILE_NAME.format(CITY_NAME = City, YEAR = Year)
+            with open(File_Path, 'w', newline='') as File:
+                File.write(NASA_POWER_HEADER.format(YEAR = Year, LATITUDE = Latitude, LONGITUDE = Longitude, ELEVATION = Elevation,
+                                                    MISSING_VALUE = MISSING_VALUE))
+                df.to_csv(File, index=False)
+
+            Files.append({'City': City, 'Year': int(Year), 'Rows': len(df), 'Defect': Defect, 'Path': File_Path})
+
+    print(f"Function: Generate_Corpus() {len(Files)} Files of {Cities} Cities written, {sum(File['Defect'] is not None for File in Files)} with a Defect")
+    print(f"Function: Generate_Corpus() Ended Successfully -> {time.strftime(TIME_FORMAT)}")
+    print("*" * 100)
+    return pd.DataFrame(Files)
+
+if __name__ == '__main__':
+    Parser = argparse.ArgumentParser(description="Write a synthetic NASA POWER corpus for data_preprocessing")
+    Parser.add_argument('--folder', default=FOLDER, help="The MAIN FOLDER of the Cities (default: %(default)s)")
+    Parser.add_argument('--cities', type=int, default=3, help="The number of Cities (default: %(default)s)")
+    Parser.add_argument('--years', type=int, nargs=2, default=[2019, 2021], metavar=('FIRST', 'LAST'), help="The first and last Year (default: 2019 2021)")
+    Parser.add_argument('--defect-rate', type=float, default=0.0, help="The share of the Files with a Defect, from 0 to 1 (default: %(default)s)")
+    Parser.add_argument('--seed', type=int, default=0, help="The seed of the random values (default: %(default)s)")
+    Arguments = Parser.parse_args()
+    Generate_Corpus(Arguments.folder, Arguments.cities, range(Arguments.years[0], Arguments.years[1] + 1), Arguments.defect_rate, Arguments.seed)
@@ -0,0 +1,93 @@
+import numpy as np
+from math import erfc, sqrt
+
+#Constants and Global Variables
+SIGNIFICANCE_LEVEL = 0.05 # A Mann-Kendall p-value below it is a significant trend
+
+def Linear_Trend(Values, X = None, Axis = -1):
+    """
+    Least-squares line of every series at once, in closed form: slope = cov(x, y) / var(x). Missing (NaN) values
+    are left out of their series
+    :param Values: (array) The series, of any shape
+    :param X: (array) The x of the values, broadcastable to Values, None for 1, 2, 3, ... along the Axis
+    :param Axis: (int) The axis of the series
+    :return: (tuple) (Slope, Intercept) with the Axis removed
+    """
+
+    Values = np.asarray(Values, dtype=float)
+    X = np.arange(1, Values.shape[Axis] + 1, dtype=float) if X is None else np.moveaxis(np.broadcast_to(np.asarray(X, dtype=float), Values.shape), Axis, -1)
+    Values = np.moveaxis(Values, Axis, -1)
+    Valid = ~np.isnan(Values)
+    X = np.where(Valid, X, 0)
+    Y = np.where(Valid, Values, 0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Count = Valid.sum(axis=-1)
+        Mean_X = X.sum(axis=-1) / Count
+        Mean_Y = Y.sum(axis=-1) / Count
+        Deviation_X = np.where(Valid, X - Mean_X[..., np.newaxis], 0)
+        Slope = (Deviation_X * (Y - Mean_Y[..., np.newaxis])).sum(axis=-1) / (Deviation_X**2).sum(axis=-1)
+        return Slope, Mean_Y - Slope * Mean_X
+
+def Pairwise_Differences(Values, X = None):
+    """
+    The differences of every pair (i, j) of a series, with i before j
+    :param Values: (array) The series along the last axis
+    :param X: (array) The x of the values, of the shape of Values, None for 1, 2, 3, ...
+    :return: (tuple) (Value differences, X differences, (array) True for the pairs with i before j) of shape (..., N, N)
+    """
+
+    X = np.arange(1, Values.shape[-1] + 1, dtype=float) if X is None else X
+    Upper = np.triu(np.ones((Values.shape[-1], Values.shape[-1]), dtype=bool), k=1)
+    return Values[..., np.newaxis, :] - Values[..., :, np.newaxis], X[..., np.newaxis, :] - X[..., :, np.newaxis], Upper
+
+def Mann_Kendall(Values, X = None, Axis = -1):
+    """
+    Mann-Kendall trend test of every series at once, with the variance of S corrected for the tied values:
+    Var(S) = (n(n-1)(2n+5) - sum t(t-1)(2t+5)) / 18 for the groups of t tied values. Missing (NaN) values are left out
+    :param Values: (array) The series, of any shape, e.g. Cities x Months x Years
+    :param X: (array) The time of the values, broadcastable to Values, None when the values are in time order
+    :param Axis: (int) The axis of the series (time)
+    :return: (dict) 'S', 'Z', 'P' (two-sided p-value) and 'Trend' (1 increasing, -1 decreasing, 0 no significant trend)
+             with the Axis removed
+    """
+
+    Values = np.asarray(Values, dtype=float)
+    X = None if X is None else np.moveaxis(np.broadcast_to(np.asarray(X, dtype=float), Values.shape), Axis, -1)
+    Values = np.moveaxis(Values, Axis, -1)
+    Difference, Time, Upper = Pairwise_Differences(Values, X)
+    Valid = ~np.isnan(Difference)
+
+    S = np.where(Valid & Upper, np.sign(Difference * np.sign(Time)), 0).sum(axis=(-2, -1)).astype(int)
+    N = (~np.isnan(Values)).sum(axis=-1)
+    Ties = np.where(Valid, Difference == 0, False).sum(axis=-1) # Tied values of every value, itself included
+    Tie_Term = np.where(Ties > 0, (Ties - 1) * (2*Ties + 5), 0).sum(axis=-1) # sum t(t-1)(2t+5), every member of a group of t adds (t-1)(2t+5)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Variance = (N * (N - 1) * (2*N + 5) - Tie_Term) / 18
+        Z = np.where(S > 0, (S - 1) / np.sqrt(Variance), np.where(S < 0, (S + 1) / np.sqrt(Variance), 0.0))
+        Z = np.where(Variance > 0, Z, np.nan)
+
+    P = np.vectorize(lambda Value: erfc(abs(Value) / sqrt(2)) if np.isfinite(Value) else np.nan, otypes=[float])(Z)
+    Trend = np.where(P < SIGNIFICANCE_LEVEL, np.sign(Z), 0).astype(int)
+    return {'S': S, 'Z': Z, 'P': P, 'Trend': Trend}
+
+def Sens_Slope(Values, X = None, Axis = -1):
+    """
+    Sen's slope of every series at once: the median of the slopes of all the pairs of values. Missing (NaN) values
+    are left out
+    :param Values: (array) The series, of any shape
+    :param X: (array) The time of the values, broadcastable to Values, None for 1, 2, 3, ... along the Axis
+    :param Axis: (int) The axis of the series (time)
+    :return: (array) The slope per unit of X with the Axis removed
+    """
+
+    Values = np.asarray(Values, dtype=float)
+    X = None if X is None else np.moveaxis(np.broadcast_to(np.asarray(X, dtype=float), Values.shape), Axis, -1)
+    Values = np.moveaxis(Values, Axis, -1)
+    Difference, Time, Upper = Pairwise_Differences(Values, X)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Slopes = np.where(Time[..., Upper] != 0, Difference[..., Upper] / Time[..., Upper], np.nan) # (..., Pairs)
+        Median_Function = np.nanmedian if np.isnan(Slopes).any() else np.median
+        return Median_Function(Slopes, axis=-1)
@@ -0,0 +1,58 @@
+import numpy as np
+from math import gamma
+
+#Constants and Global Variables
+WEIBULL_METHOD = 'MLE' # 'MLE' (Maximum Likelihood, Newton-Raphson) or 'MOMENTS' (empirical k = (std/mean)^-1.086 of Justus)
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-10 # Relative change of k at which the Newton-Raphson iterations stop
+
+def Fit_Weibull(Sorted, Starts, Method = WEIBULL_METHOD):
+    """
+    Fit the Weibull shape k and scale c of every segment of every column at once, so all the Cities, Years and
+    Months are estimated together: each Newton-Raphson iteration is a few segment sums over the whole array.
+    The calm hours (0 m/s) and missing (NaN) values are left out, the distribution is for positive Wind speeds
+    :param Sorted: (array) The Wind speeds of shape (Hours, Columns), every group is a contiguous segment of rows
+    :param Starts: (array) The position of the first row of every segment
+    :param Method: (string) 'MLE' or 'MOMENTS'
+    :return: (tuple) (k, c) of shape (Segments, Columns), NaN for a segment with less than 2 positive Wind speeds
+    """
+
+    if Method not in ('MLE', 'MOMENTS'):
+        raise ValueError(f"Unknown Weibull Method '{Method}', expected 'MLE' or 'MOMENTS'")
+
+    Sorted = np.asarray(Sorted, dtype=float)
+    Sizes = np.diff(np.append(Starts, len(Sorted)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        Valid = Sorted > 0 # False for the calm hours and NaN
+        Count = np.add.reduceat(Valid, Starts, axis=0)
+        Count = np.where(Count >= 2, Count, np.nan)
+        Mean = np.add.reduceat(np.where(Valid, Sorted, 0), Starts, axis=0) / Count
+
+        #Wind speeds divided by the Mean of their segment, the estimate of k does not depend on the scale and x^k stays small
+        Scaled = np.where(Valid, Sorted / np.repeat(Mean, Sizes, axis=0), 1)
+        Log = np.log(Scaled) # 0 for the values left out, they are also given no weight below
+
+        Deviation = np.add.reduceat(np.where(Valid, (Scaled - 1)**2, 0), Starts, axis=0) / (Count - 1)
+        K = np.sqrt(Deviation) ** -1.086 # Moments estimate, the start of the Newton-Raphson iterations
+
+        if Method == 'MLE':
+            Mean_Log = np.add.reduceat(Log, Starts, axis=0) / Count
+            for Iteration in range(MAX_ITERATIONS):
+                # f(k) = sum(x^k ln x)/sum(x^k) - 1/k - mean(ln x) = 0
+                Power = np.where(Valid, Scaled ** np.repeat(K, Sizes, axis=0), 0)
+                S0 = np.add.reduceat(Power, Starts, axis=0)
+                S1 = np.add.reduceat(Power * Log, Starts, axis=0)
+                S2 = np.add.reduceat(Power * Log**2, Starts, axis=0)
+
+                Step = (S1/S0 - 1/K - Mean_Log) / ((S2*S0 - S1**2)/S0**2 + 1/K**2)
+                K = np.where(K - Step > 0, K - Step, K / 2) # k stays positive
+                if not np.nanmax(np.abs(Step) / K, initial=0) > TOLERANCE:
+                    break
+
+            Power = np.where(Valid, Scaled ** np.repeat(K, Sizes, axis=0), 0)
+            C = Mean * (np.add.reduceat(Power, Starts, axis=0) / Count) ** (1/K)
+
+        else:
+            C = Mean / np.vectorize(lambda Shape: gamma(1 + 1/Shape) if np.isfinite(Shape) else np.nan, otypes=[float])(K)
+
+    return K, C